@@ -0,0 +1,271 @@
+# Anton Melnychuk & Oliver Li
+
+import mmap
+import struct
+import sys
+from collections.abc import Mapping
+from Bitboard import BitBoard, BITS, CELLS, POSITIONS, SYMBOLS
+from Board import Board
+from Memento import Caretaker, DeltaMemento, GameState, KeyframeMemento, Originator
+from Player import PlayerFactory
+from Position import Position
+from Record import GameRecord, RecordReader, WINNERS, UNFINISHED, decode_squares
+from cli import parse_options
+
+# File layout:
+#   header: MAGIC, number of games, keyframe interval, offset of the index
+#   games: the ply bytes of each game followed by its keyframes
+#   index: (offset, plies, result) of every game, so game G is found in O(1)
+MAGIC = b"SNTA\x01"
+_FILE_HEADER = struct.Struct("<5sQHQ")
+_INDEX_ENTRY = struct.Struct("<QHB")
+
+# Keyframe: the 25 levels and the squares of A, B, Y, Z, one byte each
+KEYFRAME_BYTES = CELLS + len(SYMBOLS)
+
+
+def _pack_keyframe(bitboard):
+    return bytes(bitboard.level(sq) for sq in range(CELLS)) + bytes(bitboard.workers)
+
+
+def _unpack_keyframe(data, plies):
+    planes = [0, 0, 0, 0]
+    for sq in range(CELLS):
+        for k in range(data[sq]):
+            planes[k] |= BITS[sq]
+    return BitBoard(planes, list(data[CELLS:KEYFRAME_BYTES]), plies % 2)
+
+
+class ArchiveWriter:
+    """
+    Writes GameRecords into an archive, storing a keyframe of the position
+    every `keyframe_interval` plies of each game. The index and the header
+    are written by close().
+
+    games (int): Games written so far.
+    """
+
+    def __init__(self, path, keyframe_interval=16):
+        self._file = open(path, "wb")
+        self._interval = max(1, int(keyframe_interval))
+        self._index = []
+        self.games = 0
+        self._file.write(bytes(_FILE_HEADER.size))
+
+    def write(self, record):
+        offset = self._file.tell()
+        keyframes = []
+
+        bitboard = BitBoard()
+        for turn, code in enumerate(record.plies, 1):
+            bitboard.make(decode_squares(code, bitboard.workers))
+            if turn % self._interval == 0:
+                keyframes.append(_pack_keyframe(bitboard))
+
+        self._file.write(record.plies + b"".join(keyframes))
+        self._index.append(_INDEX_ENTRY.pack(offset, len(record.plies), record.result))
+        self.games += 1
+
+    def close(self):
+        index = self._file.tell()
+        self._file.write(b"".join(self._index))
+        self._file.seek(0)
+        self._file.write(_FILE_HEADER.pack(MAGIC, len(self._index), self._interval, index))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class Archive:
+    """
+    Read-only, memory-mapped archive of games. Only the pages that are
+    touched get loaded, so games and turns can be reached directly in files
+    much larger than memory.
+
+    _mm (mmap): The mapped archive file.
+    _games (int): Number of games.
+    _interval (int): Plies between two stored keyframes.
+    _index (int): File offset of the index.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._games, self._interval, self._index = _FILE_HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError("Not a game archive")
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def __len__(self):
+        return self._games
+
+    def __getitem__(self, game):
+        if not 0 <= game < self._games:
+            raise IndexError("Game index out of range")
+        offset, plies, result = _INDEX_ENTRY.unpack_from(
+            self._mm, self._index + game * _INDEX_ENTRY.size
+        )
+        return ArchivedGame(self._mm, offset, plies, result, self._interval)
+
+    def __iter__(self):
+        for game in range(self._games):
+            yield self[game]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ArchivedGame:
+    """
+    Lazy view of one archived game, indexable like the Caretaker's list of
+    DeltaMementos: item i is the delta of the (i + 1)-th turn, decoded on
+    demand by replaying from the nearest keyframe.
+
+    _cache (tuple): (plies, BitBoard) of the last position reached, so
+                    consecutive turns only replay one ply each.
+    """
+
+    def __init__(self, mm, offset, plies, result, interval):
+        self._mm = mm
+        self._offset = offset
+        self._plies = plies
+        self._result = result
+        self._interval = interval
+        self._cache = (0, BitBoard())
+
+    def __len__(self):
+        return self._plies
+
+    @property
+    def winner(self):
+        return WINNERS[self._result] if self._result != UNFINISHED else None
+
+    def record(self):
+        return GameRecord(self._mm[self._offset : self._offset + self._plies], self._result)
+
+    def bitboard(self, turn):
+        """The position after `turn` plies of the game."""
+
+        turn = max(0, min(turn, self._plies))
+        keyframe = turn // self._interval * self._interval
+
+        plies, bitboard = self._cache
+        if not keyframe <= plies <= turn:
+            if keyframe:
+                start = self._offset + self._plies
+                start += (keyframe // self._interval - 1) * KEYFRAME_BYTES
+                bitboard = _unpack_keyframe(self._mm[start : start + KEYFRAME_BYTES], keyframe)
+            else:
+                bitboard = BitBoard()
+            plies = keyframe
+
+        bitboard = bitboard.copy()
+        for code in self._mm[self._offset + plies : self._offset + turn]:
+            bitboard.make(decode_squares(code, bitboard.workers))
+
+        self._cache = (turn, bitboard)
+        return bitboard
+
+    def memento(self, turn):
+        """KeyframeMemento of the position after `turn` plies, for Originator.restore."""
+        bitboard = self.bitboard(turn)
+        levels = [bitboard.level(sq) for sq in range(CELLS)]
+        workers = [POSITIONS[sq] for sq in bitboard.workers]
+        return KeyframeMemento(Position(levels, workers, min(turn, self._plies) + 1))
+
+    def _delta(self, index):
+        code = self._mm[self._offset + index]
+        w, frm, to, build = decode_squares(code, self.bitboard(index).workers)
+        return DeltaMemento(index + 1, SYMBOLS[w], POSITIONS[frm], POSITIONS[to], POSITIONS[build])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._delta(i) for i in range(*index.indices(self._plies))]
+        if index < 0:
+            index += self._plies
+        if not 0 <= index < self._plies:
+            raise IndexError("Turn index out of range")
+        return self._delta(index)
+
+    def keyframes(self):
+        return _ArchivedKeyframes(self)
+
+
+class _ArchivedKeyframes(Mapping):
+    """The keyframes of an ArchivedGame as the Caretaker's {turn index: KeyframeMemento}."""
+
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, index):
+        if index not in self:
+            raise KeyError(index)
+        return self._game.memento(index)
+
+    def __contains__(self, index):
+        return 0 <= index <= len(self._game) and index % self._game._interval == 0
+
+    def __iter__(self):
+        return iter(range(0, len(self._game) + 1, self._game._interval))
+
+    def __len__(self):
+        return len(self._game) // self._game._interval + 1
+
+
+def build(records, path, keyframe_interval=16):
+    """Writes the games of a record file into an archive, returns the number of games."""
+    with ArchiveWriter(path, keyframe_interval) as writer:
+        for record in RecordReader(records):
+            writer.write(record)
+        return writer.games
+
+
+def main():
+    """
+    Command line: python Archive.py build <records> <archive> [--keyframes=16]
+    or python Archive.py show <archive> <game> [turn] to print a position.
+    """
+
+    args, options = parse_options(sys.argv[1:])
+
+    if args[0] == "build":
+        games = build(args[1], args[2], options.get("keyframes", 16))
+        print(f"{games} games archived")
+        return
+
+    with Archive(args[1]) as archive:
+        game = archive[int(args[2])]
+        turn = int(args[3]) if len(args) > 3 else len(game)
+
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+
+        caretaker = Caretaker.browse(Originator(state), game)
+        caretaker.goto(turn)
+
+        print(board)
+        print(f"Turn: {state.turn}, {len(game)} plies, winner: {game.winner}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import random
+import sys
+import time
+from Bitboard import BitBoard, BITS, CELLS, CENTER, DISTANCE, NEIGHBOURS, RINGS, SIDE_WORKERS, squares
+from cli import parse_options
+from Record import GameRecord, RecordWriter, encode_squares
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the games are stepped one by one
+    np = None
+
+START = (16, 8, 6, 18)
+
+# Square CELLS is a padding sentinel: always domed and never occupied
+PAD = CELLS
+
+
+def _tables():
+    neighbours = np.full((CELLS + 1, 8), PAD, dtype=np.intp)
+    for sq, ring in enumerate(RINGS):
+        neighbours[sq, : len(ring)] = ring
+
+    center = np.zeros(CELLS + 1, dtype=np.int64)
+    center[:CELLS] = CENTER
+
+    distance = np.full((CELLS + 1, CELLS + 1), 99, dtype=np.int64)
+    distance[:CELLS, :CELLS] = DISTANCE
+
+    return neighbours, center, distance
+
+
+def _pick_ply(bitboard, heuristic, rng):
+    """
+    One ply of the random or heuristic policy on a single bitboard.
+    Returns (ply, won), or None when the side to move is stuck.
+
+    The heuristic policy weighs moves 3 * height + 2 * center + distance
+    like HeuristicStrategy, but scores the worker's square after the move
+    and the distance from its own side, where HeuristicStrategy scores the
+    square it leaves. A step up to level 3 is taken outright.
+    """
+
+    side = bitboard.side
+    top = bitboard.planes[2]
+    best_score = None
+    best = []
+
+    for w in SIDE_WORKERS[side]:
+        mask = bitboard.move_mask(w)
+        if mask & top:
+            best_score, best = True, [(w, to) for to in squares(mask & top)]
+            break
+        for to in squares(mask):
+            score = 0
+            if heuristic:
+                frm = bitboard.step(w, to)
+                height, center, distance = bitboard.score(side)
+                bitboard.step(w, frm)
+                score = 3 * height + 2 * center + distance
+            if best_score is None or score > best_score:
+                best_score, best = score, [(w, to)]
+            elif score == best_score:
+                best.append((w, to))
+
+    if not best:
+        return None
+
+    w, to = rng.choice(best)
+    frm = bitboard.workers[w]
+    builds = NEIGHBOURS[to] & ~((bitboard.occupied & ~BITS[frm]) | bitboard.planes[3])
+    return (w, frm, to, rng.choice(list(squares(builds)))), best_score is True
+
+
+class BatchEngine:
+    """
+    Lockstep engine advancing K games together, one ply of every running
+    game per step(). The rules are those of Strategy.update_possibilities
+    (a side without a legal ply loses) and Board.check_win (stepping up to
+    level 3 wins); a winning move is always taken.
+
+    With NumPy every game is a row of the arrays below and a step is a
+    handful of vectorized operations over all of them. Without it the same
+    interface steps a list of BitBoards one game at a time. NumPy pays off
+    for the heuristic policy, whose scoring dominates a step (about 4x the
+    plies per minute over 4096 games); random play runs at about the same
+    rate either way.
+
+    heights (ndarray): (K, 26) building levels, column 25 is a domed sentinel.
+    workers (ndarray): (K, 4) squares of A, B, Y, Z.
+    side (ndarray): (K,) side to move, 0 white and 1 blue.
+    winner (ndarray): (K,) winning side, -1 while the game is running.
+    plies (ndarray): (K,) plies played in each game.
+    _boards (list): The BitBoards of the games when NumPy is missing.
+    """
+
+    POLICIES = ("random", "heuristic")
+
+    def __init__(self, games, white="random", blue="random", seed=0):
+        for policy in (white, blue):
+            if policy not in self.POLICIES:
+                raise ValueError("Invalid player type")
+
+        self._policies = (white, blue)
+        if np is not None:
+            self._neighbours, self._center, self._distance = _tables()
+            self._heuristic = np.array([p == "heuristic" for p in self._policies])
+            self._rng = np.random.default_rng(seed)
+        else:
+            self._rng = random.Random(seed)
+        self.reset(games)
+
+    def reset(self, games):
+        """Starts `games` new games from the initial position."""
+        if np is None:
+            self._boards = [BitBoard() for _ in range(games)]
+            self.winner = [-1] * games
+            self.plies = [0] * games
+            return
+
+        self.heights = np.zeros((games, CELLS + 1), dtype=np.int64)
+        self.heights[:, PAD] = 4
+        self.workers = np.tile(np.array(START, dtype=np.intp), (games, 1))
+        self.side = np.zeros(games, dtype=np.intp)
+        self.winner = np.full(games, -1, dtype=np.intp)
+        self.plies = np.zeros(games, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.winner)
+
+    def running(self):
+        """Number of games still in progress."""
+        if np is None:
+            return self.winner.count(-1)
+        return int((self.winner < 0).sum())
+
+    def _legal(self, rows, own):
+        """Destinations and legal moves (n, 2, 8), build squares and legal builds (n, 2, 8, 8)."""
+        heights = self.heights[rows]
+        workers = self.workers[rows]
+        index = np.arange(len(rows))
+
+        dest = self._neighbours[own]
+        h_own = heights[index[:, None], own]
+        h_dest = heights[index[:, None, None], dest]
+        occupied = (dest[..., None] == workers[:, None, None, :]).any(-1)
+        moves = (h_dest <= h_own[..., None] + 1) & (h_dest < 4) & ~occupied
+
+        build = self._neighbours[dest]
+        h_build = heights[index[:, None, None, None], build]
+        taken = (build[..., None] == workers[:, None, None, None, :]).any(-1)
+        vacated = build == own[:, :, None, None]
+        builds = moves[..., None] & (h_build < 4) & (~taken | vacated)
+
+        return dest, h_dest, build, builds
+
+    def _move_scores(self, rows, own, dest, h_dest):
+        """
+        3 * height + 2 * center + distance of both workers after every move,
+        as _pick_ply scores them (not exactly HeuristicStrategy, see there).
+        """
+        index = np.arange(len(rows))
+        other = own[:, ::-1]
+        workers = self.workers[rows]
+
+        height = h_dest + self.heights[rows][index[:, None], other][..., None]
+        center = self._center[dest] + self._center[other][..., None]
+
+        opponents = np.where(self.side[rows][:, None] == 0, workers[:, 2:], workers[:, :2])
+        to_dest = self._distance[opponents[:, None, None, :], dest[..., None]]
+        to_other = self._distance[opponents[:, None, None, :], other[:, :, None, None]]
+        distance = 8 - np.minimum(to_dest, to_other).sum(-1)
+
+        return 3 * height + 2 * center + distance
+
+    def _step_python(self):
+        played = [None] * len(self._boards)
+        for i, bitboard in enumerate(self._boards):
+            if self.winner[i] >= 0:
+                continue
+
+            side = bitboard.side
+            picked = _pick_ply(bitboard, self._policies[side] == "heuristic", self._rng)
+            if picked is None:
+                self.winner[i] = side ^ 1
+                continue
+
+            ply, won = picked
+            bitboard.make(ply)
+            self.plies[i] += 1
+            played[i] = ply
+            if won:
+                self.winner[i] = side
+
+        return played
+
+    def step(self):
+        """
+        Plays one ply in every running game.
+
+        Returns:
+            ndarray: (K, 4) plies as (worker index, from, to, build), -1 for games
+                     that were over or lost without a move. Without NumPy, a list
+                     of ply tuples with None for those games.
+        """
+
+        if np is None:
+            return self._step_python()
+
+        played = np.full((len(self.winner), 4), -1, dtype=np.intp)
+        rows = np.flatnonzero(self.winner < 0)
+        if not len(rows):
+            return played
+
+        n = len(rows)
+        index = np.arange(n)
+        side = self.side[rows]
+        slots = np.stack([2 * side, 2 * side + 1], axis=1)
+        own = self.workers[rows[:, None], slots]
+
+        dest, h_dest, build, builds = self._legal(rows, own)
+        movable = builds.any(-1)
+        wins = movable & (h_dest == 3)
+
+        # A side without any legal ply loses
+        stuck = ~movable.any((1, 2))
+        self.winner[rows[stuck]] = side[stuck] ^ 1
+
+        # Random policy, as RandomStrategy: a worker that can move, then one of its moves
+        keys = self._rng.random((n, 2, 8))
+        worker = np.where(movable.any(-1), self._rng.random((n, 2)), -1.0).argmax(1)
+        scores = np.where(movable & (np.arange(2)[None, :, None] == worker[:, None, None]), keys, -1.0)
+
+        # Heuristic policy: best weighted move, random keys break the ties
+        greedy = self._heuristic[side]
+        if greedy.any():
+            heuristic = self._move_scores(rows, own, dest, h_dest) + keys * 0.5
+            heuristic = np.where(movable, heuristic, -np.inf)
+            scores = np.where(greedy[:, None, None], heuristic, scores)
+
+        # Always step up to level 3 when possible
+        scores = np.where(wins.any((1, 2))[:, None, None], np.where(wins, keys, -1.0), scores)
+
+        flat = scores.reshape(n, 16).argmax(1)
+        w, d = flat // 8, flat % 8
+        b = np.where(builds[index, w, d], self._rng.random((n, 8)), -1.0).argmax(1)
+
+        go = ~stuck
+        rows, index, side = rows[go], index[go], side[go]
+        w, d, b = w[go], d[go], b[go]
+
+        slot = 2 * side + w
+        frm = own[index, w]
+        to = dest[index, w, d]
+        target = build[index, w, d, b]
+
+        self.workers[rows, slot] = to
+        self.heights[rows, target] += 1
+        self.side[rows] ^= 1
+        self.plies[rows] += 1
+
+        won = h_dest[index, w, d] == 3
+        self.winner[rows[won]] = side[won]
+
+        played[rows] = np.stack([slot, frm, to, target], axis=1)
+        return played
+
+    def run(self, writer=None):
+        """
+        Steps until every game is over, returns the number of plies played.
+        With a RecordWriter, every game is recorded and written once all are over.
+        """
+
+        start = sum(self.plies)
+        records = [bytearray() for _ in range(len(self))] if writer else None
+
+        while self.running():
+            played = self.step()
+            if records is None:
+                continue
+            for record, ply in zip(records, played):
+                if ply is not None and ply[0] >= 0:
+                    record.append(encode_squares(*(int(x) for x in ply)))
+
+        if writer:
+            for record, winner in zip(records, self.winner):
+                writer.write(GameRecord(record, int(winner)))
+
+        return int(sum(self.plies) - start)
+
+
+def main():
+    """
+    Command line: python Batch.py [white policy] [blue policy] [--games=K] [--seed=N]
+    [--record=file]
+    """
+
+    args, options = parse_options(sys.argv[1:])
+    white = args[0] if args else "random"
+    blue = args[1] if len(args) > 1 else "random"
+
+    engine = BatchEngine(options.get("games", 4096), white, blue, options.get("seed", 0))
+    path = options.get("record")
+    writer = RecordWriter(path) if isinstance(path, str) else None
+
+    start = time.perf_counter()
+    plies = engine.run(writer)
+    elapsed = time.perf_counter() - start
+
+    if writer:
+        writer.close()
+
+    games = len(engine)
+    white_wins = sum(1 for winner in engine.winner if winner == 0)
+    print(f"{games} games, {plies} plies in {elapsed:.2f}s ({plies / elapsed * 60:.0f} plies/min)")
+    print(f"white ({white}) wins {white_wins / games:.1%}, mean length {plies / games:.1f} plies")
+
+
+if __name__ == "__main__":
+    main()
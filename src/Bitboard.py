@@ -0,0 +1,401 @@
+import random
+
+SIZE = 5
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+# Worker order used throughout the bitboard engine: white (A, B), blue (Y, Z)
+SYMBOLS = ("A", "B", "Y", "Z")
+WHITE, BLUE = 0, 1
+SIDE_WORKERS = ((0, 1), (2, 3))
+
+
+def square(position):
+    """Converts a (row, column) position into a square index 0..24."""
+    return position[0] * SIZE + position[1]
+
+
+def _ring(sq):
+    row, col = divmod(sq, SIZE)
+    ans = []
+
+    # Same row-major order as Board.get_ring
+    for y in range(max(0, row - 1), min(SIZE, row + 2)):
+        for x in range(max(0, col - 1), min(SIZE, col + 2)):
+            if (y, x) == (row, col):
+                continue
+            ans.append(y * SIZE + x)
+
+    return tuple(ans)
+
+
+BITS = tuple(1 << sq for sq in range(CELLS))
+POSITIONS = tuple(divmod(sq, SIZE) for sq in range(CELLS))
+RINGS = tuple(_ring(sq) for sq in range(CELLS))
+NEIGHBOURS = tuple(sum(BITS[n] for n in RINGS[sq]) for sq in range(CELLS))
+
+
+def _ring_subsets(sq):
+    # Every subset of the ring, keyed by its mask, listed in ring order
+    ring = RINGS[sq]
+    subsets = {}
+    for i in range(1 << len(ring)):
+        chosen = tuple(n for k, n in enumerate(ring) if i >> k & 1)
+        subsets[sum(BITS[n] for n in chosen)] = chosen
+    return subsets
+
+
+# RING_SQUARES[sq][mask] lists the squares of a mask within the ring of sq in ring order
+RING_SQUARES = tuple(_ring_subsets(sq) for sq in range(CELLS))
+
+# The plies of one (worker, from, to) and build mask, shared by every plies() list that
+# holds them (plies are immutable tuples). Cleared when it grows past PLY_RUNS_SIZE runs.
+PLY_RUNS_SIZE = 1 << 14
+_PLY_RUNS = {}
+
+# ScoreCalculator features: height_score per square and Chebyshev distances
+CENTER = tuple(2 - max(abs(r - 2), abs(c - 2)) for r, c in POSITIONS)
+DISTANCE = tuple(
+    tuple(max(abs(r1 - r2), abs(c1 - c2)) for r2, c2 in POSITIONS)
+    for r1, c1 in POSITIONS
+)
+
+
+def _zobrist_keys(seed=0x5A4E):
+    """Fixed-seed random keys so hashes agree across processes and runs."""
+    rng = random.Random(seed)
+    # Level 0 keys are zero so an empty board hashes to the worker keys only
+    levels = tuple(
+        (0,) + tuple(rng.getrandbits(64) for _ in range(4)) for _ in range(CELLS)
+    )
+    workers = tuple(
+        tuple(rng.getrandbits(64) for _ in range(CELLS)) for _ in SYMBOLS
+    )
+    return levels, workers, rng.getrandbits(64)
+
+
+ZOBRIST_LEVEL, ZOBRIST_WORKER, ZOBRIST_SIDE = _zobrist_keys()
+
+
+def squares(mask):
+    """Yields the square indices of the set bits of a mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoard:
+    """
+    Compact Santorini position packed into integers.
+
+    _planes (list): _planes[k] masks the cells built to at least level k + 1.
+    _workers (list): Square index of every worker, ordered as SYMBOLS.
+    _occupied (int): Mask of the squares holding a worker.
+    _side (int): WHITE or BLUE, the player to move.
+    _hash (int): Zobrist key of the position, updated incrementally.
+
+    A ply is a tuple (worker index, from square, to square, build square).
+    """
+
+    __slots__ = ("_planes", "_workers", "_occupied", "_side", "_hash")
+
+    def __init__(self, planes=None, workers=None, side=WHITE):
+        self._planes = list(planes) if planes else [0, 0, 0, 0]
+        self._workers = list(workers) if workers else [16, 8, 6, 18]
+        self._occupied = 0
+        for sq in self._workers:
+            self._occupied |= BITS[sq]
+        self._side = side
+        self._hash = self._compute_hash()
+
+    def _compute_hash(self):
+        key = ZOBRIST_SIDE if self._side else 0
+        for sq in range(CELLS):
+            key ^= ZOBRIST_LEVEL[sq][self.level(sq)]
+        for w, sq in enumerate(self._workers):
+            key ^= ZOBRIST_WORKER[w][sq]
+        return key
+
+    @classmethod
+    def from_grid(cls, grid, white_workers, blue_workers, turn=1):
+        """Packs a Grid and the two worker lists into a BitBoard."""
+
+        planes = [0, 0, 0, 0]
+        for sq, level in enumerate(grid.levels):
+            bit = BITS[sq]
+            for k in range(min(level, 4)):
+                planes[k] |= bit
+
+        workers = [0, 0, 0, 0]
+        for worker in list(white_workers) + list(blue_workers):
+            workers[SYMBOLS.index(worker.symbol)] = square(worker.position)
+
+        return cls(planes, workers, WHITE if turn % 2 else BLUE)
+
+    @property
+    def side(self):
+        return self._side
+
+    @side.setter
+    def side(self, side):
+        if side != self._side:
+            self._hash ^= ZOBRIST_SIDE
+        self._side = side
+
+    @property
+    def hash(self):
+        return self._hash
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def occupied(self):
+        return self._occupied
+
+    @property
+    def planes(self):
+        return self._planes
+
+    def copy(self):
+        clone = BitBoard.__new__(BitBoard)
+        clone._planes = list(self._planes)
+        clone._workers = list(self._workers)
+        clone._occupied = self._occupied
+        clone._side = self._side
+        clone._hash = self._hash
+        return clone
+
+    def pack(self):
+        """Flat tuple of ints for cheap pickling between processes."""
+        return (*self._planes, *self._workers, self._side)
+
+    @classmethod
+    def unpack(cls, packed):
+        return cls(packed[:4], packed[4:8], packed[8])
+
+    def level(self, sq):
+        """Returns the building level of a square."""
+        p = self._planes
+        return (p[0] >> sq & 1) + (p[1] >> sq & 1) + (p[2] >> sq & 1) + (p[3] >> sq & 1)
+
+    def move_mask(self, w):
+        """Mask of the squares worker w can step onto."""
+        frm = self._workers[w]
+        h = self.level(frm)
+        # Cells at least two levels higher (or domed) are unreachable
+        blocked = self._planes[h + 1 if h < 3 else 3]
+        return NEIGHBOURS[frm] & ~(self._occupied | blocked)
+
+    def build_mask(self, w, to):
+        """Mask of the squares worker w can build on after moving to `to`."""
+        frm = self._workers[w]
+        return NEIGHBOURS[to] & ~((self._occupied & ~BITS[frm]) | self._planes[3])
+
+    def plies(self, side=None):
+        """Returns every legal (worker, from, to, build) ply of a side."""
+        side = self._side if side is None else side
+        ans = []
+        occupied = self._occupied
+        planes = self._planes
+        domes = planes[3]
+        runs = _PLY_RUNS
+        if len(runs) > PLY_RUNS_SIZE:
+            runs.clear()
+
+        # move_mask and build_mask inlined: a worker stands on level 3 at most, or on a dome
+        for w in SIDE_WORKERS[side]:
+            frm = self._workers[w]
+            bit = BITS[frm]
+            h = (planes[0] & bit and 1) + (planes[1] & bit and 1) + (planes[2] & bit and 1)
+            moves = NEIGHBOURS[frm] & ~(occupied | (planes[h + 1] if h < 3 else domes))
+            free = ~(occupied & ~bit | domes)
+            for to in RING_SQUARES[frm][moves]:
+                builds = NEIGHBOURS[to] & free
+                key = ((w * CELLS + frm) * CELLS + to) << CELLS | builds
+                run = runs.get(key)
+                if run is None:
+                    run = runs[key] = tuple((w, frm, to, build) for build in RING_SQUARES[to][builds])
+                ans += run
+
+        return ans
+
+    def iter_plies(self, side=None, order=None):
+        """
+        Yields the legal (worker, from, to, build) plies of a side one at a time.
+
+        `order` (e.g. a shuffle, or sorted with a key) receives the list of
+        workers, then each worker's destinations and each destination's
+        builds (a fresh list it may reorder in place) and returns them in the
+        order they should be tried, so the caller's preferred plies come
+        first. The board must not change while the generator is in use.
+        """
+        side = self._side if side is None else side
+        workers = list(SIDE_WORKERS[side])
+
+        for w in order(workers) if order else workers:
+            frm = self._workers[w]
+            moves = self.move_mask(w)
+            destinations = [to for to in RINGS[frm] if moves & BITS[to]]
+            for to in order(destinations) if order else destinations:
+                mask = self.build_mask(w, to)
+                builds = [build for build in RINGS[to] if mask & BITS[build]]
+                for build in order(builds) if order else builds:
+                    yield w, frm, to, build
+
+    def count_plies(self, side=None):
+        """Number of legal plies of a side, counted from the masks without listing them."""
+        side = self._side if side is None else side
+        count = 0
+        for w in SIDE_WORKERS[side]:
+            for to in squares(self.move_mask(w)):
+                count += self.build_mask(w, to).bit_count()
+        return count
+
+    def score(self, side):
+        """(cell score, heuristic position score, distance score) as in ScoreCalculator."""
+        workers = self._workers
+        own = [workers[w] for w in SIDE_WORKERS[side]]
+        height = self.level(own[0]) + self.level(own[1])
+        center = CENTER[own[0]] + CENTER[own[1]]
+
+        distance = 8
+        for w in SIDE_WORKERS[side ^ 1]:
+            row = DISTANCE[workers[w]]
+            distance -= min(row[own[0]], row[own[1]])
+
+        return (height, center, distance)
+
+    def evaluate(self, side=None):
+        """Weighted score (3 * height + 2 * center + distance) of a side minus its opponent."""
+        side = self._side if side is None else side
+        height, center, distance = self.score(side)
+        o_height, o_center, o_distance = self.score(side ^ 1)
+
+        return (
+            3 * (height - o_height) + 2 * (center - o_center) + distance - o_distance
+        )
+
+    def reach(self, side):
+        """Mask of every square the side's workers can step onto."""
+        w1, w2 = SIDE_WORKERS[side]
+        return self.move_mask(w1) | self.move_mask(w2)
+
+    def step(self, w, to):
+        """Moves worker w to `to` without building or passing the turn, returns its old square."""
+        frm = self._workers[w]
+        self._workers[w] = to
+        self._occupied ^= BITS[frm] | BITS[to]
+        self._hash ^= ZOBRIST_WORKER[w][frm] ^ ZOBRIST_WORKER[w][to]
+        return frm
+
+    def set_level(self, sq, level):
+        """Sets the building level of a square in place, keeping the hash up to date."""
+        bit = BITS[sq]
+        p = self._planes
+        self._hash ^= ZOBRIST_LEVEL[sq][self.level(sq)] ^ ZOBRIST_LEVEL[sq][level]
+        for k in range(4):
+            if k < level:
+                p[k] |= bit
+            else:
+                p[k] &= ~bit
+
+    def has_moves(self, side=None):
+        """Whether a side has any legal move (a player without one has lost)."""
+        side = self._side if side is None else side
+        return any(self.move_mask(w) for w in SIDE_WORKERS[side])
+
+    def has_won(self, side):
+        """Whether one of the side's workers stands on level 3."""
+        top = self._planes[2]
+        return any(top & BITS[self._workers[w]] for w in SIDE_WORKERS[side])
+
+    def is_winning_move(self, to):
+        return self.level(to) == 3
+
+    def make(self, ply):
+        """Applies a ply in place and passes the turn."""
+        w, frm, to, build = ply
+        self._workers[w] = to
+        self._occupied ^= BITS[frm] | BITS[to]
+
+        bit = BITS[build]
+        p = self._planes
+        if not p[0] & bit:
+            p[0] |= bit
+            level = 0
+        elif not p[1] & bit:
+            p[1] |= bit
+            level = 1
+        elif not p[2] & bit:
+            p[2] |= bit
+            level = 2
+        else:
+            p[3] |= bit
+            level = 3
+
+        keys = ZOBRIST_LEVEL[build]
+        self._hash ^= (
+            ZOBRIST_WORKER[w][frm]
+            ^ ZOBRIST_WORKER[w][to]
+            ^ keys[level]
+            ^ keys[level + 1]
+            ^ ZOBRIST_SIDE
+        )
+        self._side ^= 1
+
+    def unmake(self, ply):
+        """Reverts a ply previously applied with make()."""
+        w, frm, to, build = ply
+        self._side ^= 1
+
+        bit = BITS[build]
+        p = self._planes
+        if p[3] & bit:
+            p[3] ^= bit
+            level = 4
+        elif p[2] & bit:
+            p[2] ^= bit
+            level = 3
+        elif p[1] & bit:
+            p[1] ^= bit
+            level = 2
+        else:
+            p[0] ^= bit
+            level = 1
+
+        self._workers[w] = frm
+        self._occupied ^= BITS[frm] | BITS[to]
+
+        keys = ZOBRIST_LEVEL[build]
+        self._hash ^= (
+            ZOBRIST_WORKER[w][frm]
+            ^ ZOBRIST_WORKER[w][to]
+            ^ keys[level]
+            ^ keys[level - 1]
+            ^ ZOBRIST_SIDE
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, BitBoard)
+            and self._planes == other._planes
+            and self._workers == other._workers
+            and self._side == other._side
+        )
+
+    def __repr__(self):
+        output = ""
+        for row in range(SIZE):
+            output += "+--" * SIZE + "+\n"
+            for col in range(SIZE):
+                sq = row * SIZE + col
+                symbol = " "
+                if self._occupied & BITS[sq]:
+                    symbol = SYMBOLS[self._workers.index(sq)]
+                output += f"|{self.level(sq)}{symbol}"
+            output += "|\n"
+        output += "+--" * SIZE + "+"
+        return output
@@ -1,4 +1,10 @@
 from exceptions import MoveError, Win
+from Bitboard import CENTER, DISTANCE, POSITIONS, SYMBOLS, square
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batched scoring falls back to lookup tables
+    np = None
 
 
 class GridIterator:
@@ -41,11 +47,11 @@ class Board:
     def state(self):
         return self._state
 
-    def _update_state(self, memento):
-        # Uses and Supplies (Score Class) Deep Copy of the Workers
-        self._state = memento.get_state()
+    def _update_state(self, state):
+        # Uses and Supplies (Score Class) the live GameState
+        self._state = state
+        self._grid = state.grid
         self._score = ScoreCalculator(self._state, self._grid)
-        self._grid = memento.get_grid()
 
     def check_win(self, player):
         """Checks if a player has won. Input: player"""
@@ -57,6 +63,42 @@ class Board:
                 raise Win
         return False
 
+    def bitboard(self):
+        """Returns the current state packed into a BitBoard."""
+        return self._state.to_bitboard()
+
+    def key(self):
+        """Zobrist key of the current position."""
+        return self._state.key()
+
+    def moves(self, workers, order=None):
+        """
+        Yields the (worker, move, build) triples of the player owning `workers`
+        one at a time, trying workers, moves and builds in the order given by
+        `order` (see BitBoard.iter_plies). Input: workers, optional order
+        """
+
+        by_symbol = {worker.symbol: worker for worker in workers}
+        side = SYMBOLS.index(workers[0].symbol) // 2
+
+        for w, _, move, build in self.bitboard().iter_plies(side, order):
+            yield by_symbol[SYMBOLS[w]], POSITIONS[move], POSITIONS[build]
+
+    def has_any_move(self, workers):
+        """Whether the player owning `workers` can move (a worker that moves can always build)."""
+        return self._state.moves.has_moves(SYMBOLS.index(workers[0].symbol) // 2)
+
+    def count_moves(self, workers):
+        """Number of (worker, move, build) triples of the player owning `workers`."""
+        return self._state.moves.count(SYMBOLS.index(workers[0].symbol) // 2)
+
+    def possibilities(self, worker):
+        """
+        {move: set(builds)} of a worker, kept up to date incrementally by the
+        state's MoveSet. Shared with later calls, so it must not be modified.
+        """
+        return self._state.moves.possibilities(SYMBOLS.index(worker.symbol))
+
     def occupied(self, position):
         worker = self._state.get_worker_by_position(position)
         return worker.symbol if worker else None
@@ -90,6 +132,7 @@ class Board:
         
         cell = self._grid.get_cell(position)
         cell.upgrade()
+        self._state.built(position)
 
     def score(self, workers_positions, color):
         """Calculates the score (cell score, heuristic position score, distance score)."""
@@ -101,15 +144,11 @@ class Board:
 
     def check_score(self, symbol, color, new_positions):
         """Check score by moving worker to calculate heuristic optimal moves."""
-        workers_positions = self._state.get_workers_pos_by_symbol(symbol)
-        curr_worker = self._state.get_worker_by_symbol(symbol)
-        previous_position = curr_worker.position
-        curr_worker.position = new_positions
+        return self._score.check_score(symbol, color, new_positions)
 
-        try:
-            return self._score.score(workers_positions, color)
-        finally:
-            curr_worker.position = previous_position
+    def check_scores(self, candidates, color):
+        """Batched check_score over a list of (symbol, new position) candidates."""
+        return self._score.check_scores(candidates, color)
 
     def get_cell(self, pos):
         """Get the cell at the specified position."""
@@ -143,6 +182,9 @@ class Board:
 class ScoreCalculator:
     """Class for calculating scores based on board and player information."""
 
+    # Below this many candidates the NumPy call overhead outweighs batching
+    NUMPY_MIN_BATCH = 32
+
     def __init__(self, state, grid):
         self._state = state
         self._grid = grid
@@ -205,46 +247,167 @@ class ScoreCalculator:
         return (curr_cell_score, curr_pos_score, total_distance)
 
     def check_score(self, symbol, color, new_positions):
-        """Check score by moving worker to calculate heuristic optimal moves."""
-        workers_positions = self._state.get_workers_pos_by_symbol(symbol)
-        curr_worker = self._state.get_worker_by_symbol(symbol)
-        previous_position = curr_worker.position
-        curr_worker.position = new_positions
+        """
+        Check score by moving worker to calculate heuristic optimal moves.
+        The move is only scored, the live worker stays where it is.
+        """
+        return self.check_scores([(symbol, new_positions)], color)[0]
+
+    def check_scores(self, candidates, color):
+        """
+        Scores every (symbol, new position) candidate at once, with the same
+        (cell score, heuristic position score, distance score) as check_score
+        but from precomputed center and Chebyshev distance tables and without
+        moving any worker. Large batches use a single vectorized NumPy pass
+        when NumPy is installed.
+        """
+
+        if color == "white":
+            workers1 = self._state.blue_workers
+            workers2 = self._state.white_workers
+        else:
+            workers1 = self._state.white_workers
+            workers2 = self._state.blue_workers
 
-        try:
-            return self.score(workers_positions, color)
-        finally:
-            curr_worker.position = previous_position
+        squares1 = [square(worker.position) for worker in workers1]
+        squares2 = [square(worker.position) for worker in workers2]
+        index1 = {worker.symbol: i for i, worker in enumerate(workers1)}
+        index2 = {worker.symbol: i for i, worker in enumerate(workers2)}
+
+        # Cell and position scores use the worker's square before the move
+        origins = [
+            square(self._state.get_worker_by_symbol(symbol).position)
+            for symbol, _ in candidates
+        ]
+        targets = [square(position) for _, position in candidates]
+        levels = self._grid.levels
+
+        if np is not None and len(candidates) >= self.NUMPY_MIN_BATCH:
+            return self._check_scores_numpy(
+                candidates, origins, targets, levels, squares1, squares2, index1, index2
+            )
+
+        scores = []
+        for (symbol, _), origin, target in zip(candidates, origins, targets):
+            moved1 = list(squares1)
+            moved2 = list(squares2)
+            if symbol in index1:
+                moved1[index1[symbol]] = target
+            if symbol in index2:
+                moved2[index2[symbol]] = target
+
+            result = 0
+            for sq1 in moved1:
+                row = DISTANCE[sq1]
+                result += min([row[sq2] for sq2 in moved2], default=99)
+
+            scores.append((levels[origin], CENTER[origin], 8 - result))
+
+        return scores
+
+    def _check_scores_numpy(
+        self, candidates, origins, targets, levels, squares1, squares2, index1, index2
+    ):
+        count = len(candidates)
+        rows = np.arange(count)
+        targets = np.array(targets)
+        origins = np.array(origins)
+
+        # One row of worker squares per candidate, with the moved worker replaced
+        moved1 = np.tile(np.array(squares1, dtype=np.intp), (count, 1))
+        moved2 = np.tile(np.array(squares2, dtype=np.intp), (count, 1))
+        for moved, index in ((moved1, index1), (moved2, index2)):
+            columns = np.array([index.get(symbol, -1) for symbol, _ in candidates])
+            hit = columns >= 0
+            moved[rows[hit], columns[hit]] = targets[hit]
+
+        distances = _DISTANCE_TABLE[moved1[:, :, None], moved2[:, None, :]]
+        distance = 8 - distances.min(axis=2).sum(axis=1)
+        height = np.array(levels)[origins]
+        center = _CENTER_TABLE[origins]
+
+        return [
+            (int(h), int(c), int(d)) for h, c, d in zip(height, center, distance)
+        ]
 
 
 class Grid:
-    def __init__(self):
-        self._grid = [[Cell() for _ in range(Board.SIZE)] for _ in range(Board.SIZE)]
+    """
+    The building levels of the board, one byte per cell in row-major order.
+
+    _levels (bytearray): Level of every cell, indexed by row * SIZE + col.
+    _rows (list): Rows of Cell views over _levels, made on first use.
+    """
+
+    __slots__ = ("_levels", "_rows")
+
+    def __init__(self, levels=None):
+        self._levels = bytearray(levels) if levels else bytearray(Board.SIZE * Board.SIZE)
+        self._rows = None
+
+    @property
+    def levels(self):
+        return self._levels
+
+    def copy(self):
+        """An independent Grid: a single copy of the level buffer."""
+        return Grid(self._levels)
+
+    def _views(self):
+        if self._rows is None:
+            self._rows = [
+                [Cell(levels=self._levels, index=row * Board.SIZE + col) for col in range(Board.SIZE)]
+                for row in range(Board.SIZE)
+            ]
+        return self._rows
 
     def get_cell(self, pos):
         """Get the cell at the specified position."""
-        return self._grid[pos[0]][pos[1]]
+        return self._views()[pos[0]][pos[1]]
+
+    def __getitem__(self, row):
+        return self._views()[row]
 
     def __iter__(self):
-        return iter(self._grid)
+        return iter(self._views())
 
 
 class Cell:
     """
-    Board Cell holding a buildings.
+    Board Cell holding a buildings: a view of one byte of a Grid's levels
+    (or of its own byte when made on its own).
 
-    _level (int): The level of the cell.
+    _levels (bytearray): The buffer holding the level.
+    _index (int): Position of the level in the buffer.
     """
 
-    def __init__(self, level=0) -> None:
-        self._level = level
+    __slots__ = ("_levels", "_index")
+
+    def __init__(self, level=0, levels=None, index=0) -> None:
+        self._levels = bytearray([level]) if levels is None else levels
+        self._index = index
 
     def upgrade(self):
         """Upgrades the cell level if it is below the maximum."""
 
-        if self._level < 4:
-            self._level += 1
+        if self._levels[self._index] < 4:
+            self._levels[self._index] += 1
+
+    def downgrade(self):
+        """Removes the top level of the cell (used to undo a build)."""
+
+        if self._levels[self._index] > 0:
+            self._levels[self._index] -= 1
 
     @property
     def level(self):
-        return self._level
+        return self._levels[self._index]
+
+    @level.setter
+    def level(self, level):
+        self._levels[self._index] = level
+
+
+if np is not None:
+    _DISTANCE_TABLE = np.array(DISTANCE)
+    _CENTER_TABLE = np.array(CENTER)
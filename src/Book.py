@@ -0,0 +1,209 @@
+# Anton Melnychuk & Oliver Li
+
+import mmap
+import struct
+import sys
+import time
+from Bitboard import BitBoard, BITS
+from Record import RecordReader, decode_squares
+from Search import AlphaBeta
+from Transposition import TranspositionTable, pack_ply, unpack_ply
+from cli import parse_options
+from symmetry import canonical, restore_ply, transform_ply
+
+# File layout: header (MAGIC, entries, deepest ply count), then entries sorted by key
+MAGIC = b"SNTB\x01"
+_HEADER = struct.Struct("<5sIH")
+
+# Entry: canonical key (16 bytes, big-endian so byte order is key order),
+# packed canonical ply, search score, games played and won through the move
+_ENTRY = struct.Struct("<16sIiII")
+KEY_BYTES = 16
+
+
+def _plies_played(bitboard):
+    # Every ply builds exactly one level
+    return sum(plane.bit_count() for plane in bitboard.planes)
+
+
+class BookBuilder:
+    """
+    Collects book moves from self-play records or searches and writes the book.
+
+    _moves (dict): Canonical key -> {canonical ply: [games, wins, score, searched]}.
+    _depth (int): Most plies from the start of any stored position.
+    """
+
+    def __init__(self):
+        self._moves = {}
+        self._depth = 0
+
+    def __len__(self):
+        return len(self._moves)
+
+    def _entry(self, bitboard, ply):
+        key, t = canonical(bitboard)
+        self._depth = max(self._depth, _plies_played(bitboard))
+        moves = self._moves.setdefault(key, {})
+        return moves.setdefault(pack_ply(transform_ply(t, ply)), [0, 0, 0, False])
+
+    def add_record(self, record, plies=8):
+        """Counts the first `plies` moves of a recorded game and whether the mover won."""
+        bitboard = BitBoard()
+        for code in record.plies[:plies]:
+            ply = decode_squares(code, bitboard.workers)
+            entry = self._entry(bitboard, ply)
+            entry[0] += 1
+            entry[1] += record.result == bitboard.side
+            bitboard.make(ply)
+
+    def add_search(self, bitboard, depth=4, table=None):
+        """Stores the best ply of a depth-limited AlphaBeta search of the position."""
+        ply, score = AlphaBeta(depth, table).search(bitboard)
+        if ply is not None:
+            entry = self._entry(bitboard, ply)
+            entry[2], entry[3] = score, True
+
+    def search_openings(self, plies=2, depth=4, tt_mb=64):
+        """Searches every position up to `plies` plies from the start, once per symmetry class."""
+
+        table = TranspositionTable(tt_mb) if tt_mb else None
+        frontier = {canonical(BitBoard())[0]: BitBoard()}
+
+        for ply_count in range(plies + 1):
+            following = {}
+            for bitboard in frontier.values():
+                self.add_search(bitboard, depth, table)
+                if ply_count == plies:
+                    continue
+
+                top = bitboard.planes[2]
+                for ply in bitboard.plies():
+                    if top & BITS[ply[2]]:
+                        continue
+                    child = bitboard.copy()
+                    child.make(ply)
+                    following.setdefault(canonical(child)[0], child)
+            frontier = following
+
+    def write(self, path, min_games=1):
+        """
+        Writes one move per position: the searched ply when there is one,
+        otherwise the self-play move with the best win rate over at least
+        `min_games` games. Returns the number of entries.
+        """
+
+        entries = []
+        for key, moves in self._moves.items():
+            searched = [item for item in moves.items() if item[1][3]]
+            played = [item for item in moves.items() if item[1][0] >= min_games]
+            if searched:
+                ply, (games, wins, score, _) = searched[0]
+            elif played:
+                ply, (games, wins, score, _) = max(
+                    played, key=lambda item: ((item[1][1] + 1) / (item[1][0] + 2), item[1][0])
+                )
+            else:
+                continue
+            entries.append(_ENTRY.pack(key.to_bytes(KEY_BYTES, "big"), ply, score, games, wins))
+
+        entries.sort()
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, len(entries), self._depth))
+            file.write(b"".join(entries))
+
+        return len(entries)
+
+
+class OpeningBook:
+    """
+    Read-only opening book, memory-mapped on the first probe so loading a
+    player costs nothing until a move is asked for.
+
+    _path (str): The book file.
+    _mm (mmap): The mapped file, None until the first probe.
+    _entries (int): Number of entries.
+    _depth (int): Positions further from the start are never in the book.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._mm = None
+        self._entries = 0
+        self._depth = 0
+
+    def _open(self):
+        with open(self._path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._entries, self._depth = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError("Not an opening book")
+
+    def __len__(self):
+        if self._mm is None:
+            self._open()
+        return self._entries
+
+    def lookup(self, bitboard):
+        """(ply, score, games, wins) stored for the position, or None if it is not in the book."""
+
+        if self._mm is None:
+            self._open()
+        if _plies_played(bitboard) > self._depth:
+            return None
+
+        key, t = canonical(bitboard)
+        target = key.to_bytes(KEY_BYTES, "big")
+
+        # Binary search over the sorted fixed-size entries
+        mm = self._mm
+        low, high = 0, self._entries
+        while low < high:
+            middle = (low + high) // 2
+            offset = _HEADER.size + middle * _ENTRY.size
+            found = mm[offset : offset + KEY_BYTES]
+            if found < target:
+                low = middle + 1
+            elif found > target:
+                high = middle
+            else:
+                _, ply, score, games, wins = _ENTRY.unpack_from(mm, offset)
+                return restore_ply(bitboard, t, unpack_ply(ply)), score, games, wins
+
+        return None
+
+    def probe(self, bitboard):
+        """The book ply of the position, or None."""
+        entry = self.lookup(bitboard)
+        return entry[0] if entry else None
+
+
+def main():
+    """
+    Command line: python Book.py search <book> [--plies=2] [--depth=4] [--tt-mb=64]
+    or python Book.py games <records> <book> [--plies=8] [--min-games=1]
+    """
+
+    args, options = parse_options(sys.argv[1:])
+    builder = BookBuilder()
+    start = time.perf_counter()
+
+    if args[0] == "search":
+        path = args[1]
+        builder.search_openings(
+            options.get("plies", 2), options.get("depth", 4), options.get("tt_mb", 64)
+        )
+        entries = builder.write(path)
+    else:
+        path = args[2]
+        plies = options.get("plies", 8)
+        for record in RecordReader(args[1]):
+            builder.add_record(record, plies)
+        entries = builder.write(path, options.get("min_games", 1))
+
+    print(f"{entries} positions written to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 class DirectionUtils:
+    # Fixed order of the directions, also used as their 3-bit code in game records
+    DIRECTIONS = ("n", "ne", "e", "se", "s", "sw", "w", "nw")
+
     @staticmethod
     def get_direction_delta(direction):
         direction_deltas = {
@@ -0,0 +1,220 @@
+import math
+import random
+import time
+from Bitboard import BITS, NEIGHBOURS, SIDE_WORKERS, squares
+from threats import forced_win, safe_plies
+
+
+class Node:
+    """
+    Node of the UCT tree.
+
+    ply (tuple): The ply leading to the node (None for the root).
+    side (int): The side to move in the node.
+    wins (float): Playouts won by the side that played `ply`.
+    untried (list): Plies not expanded yet, None until the node is first reached.
+    winner (int): Side that has won in this position, or None when it is not terminal.
+    """
+
+    __slots__ = ("ply", "parent", "side", "children", "untried", "visits", "wins", "winner")
+
+    def __init__(self, ply, parent, side):
+        self.ply = ply
+        self.parent = parent
+        self.side = side
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+        self.winner = None
+
+    def expand(self, bitboard):
+        """
+        Lists the plies of the node, detecting a won or lost position. Plies
+        letting the opponent step up to level 3 next move are left out, and
+        a node where every ply does is lost.
+        """
+        plies = bitboard.plies()
+        top = bitboard.planes[2]
+
+        if not plies:
+            self.winner = self.side ^ 1
+        elif any(top & BITS[ply[2]] for ply in plies):
+            self.winner = self.side
+        else:
+            plies = safe_plies(bitboard, plies)
+            if not plies:
+                self.winner = self.side ^ 1
+
+        random.shuffle(plies)
+        self.untried = [] if self.winner is not None else plies
+
+    def select(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+
+def random_rollout(bitboard):
+    """
+    Plays random plies on the bitboard until a side wins, straight from the
+    move masks instead of building a possibility map every step.
+    Takes a winning move whenever there is one. Returns the winning side.
+    """
+
+    while True:
+        side = bitboard.side
+        top = bitboard.planes[2]
+        moves = []
+
+        for w in SIDE_WORKERS[side]:
+            mask = bitboard.move_mask(w)
+            if mask & top:
+                return side
+            for to in squares(mask):
+                moves.append((w, to))
+
+        if not moves:
+            return side ^ 1
+
+        w, to = random.choice(moves)
+        frm = bitboard.workers[w]
+        builds = NEIGHBOURS[to] & ~((bitboard.occupied & ~BITS[frm]) | bitboard.planes[3])
+        bitboard.make((w, frm, to, random.choice(list(squares(builds)))))
+
+
+def heuristic_rollout(bitboard):
+    """
+    Like random_rollout, but moves are picked greedily by the weights of
+    HeuristicStrategy (3 * height + 2 * center + distance) with random tie
+    breaks. Unlike HeuristicStrategy, the height and center are those of the
+    square moved to and the distance is the mover's own, and a step up to
+    level 3 ends the rollout instead of being scored.
+    """
+
+    while True:
+        side = bitboard.side
+        top = bitboard.planes[2]
+        best_score = None
+        best = []
+
+        for w in SIDE_WORKERS[side]:
+            mask = bitboard.move_mask(w)
+            if mask & top:
+                return side
+            for to in squares(mask):
+                frm = bitboard.step(w, to)
+                height, center, distance = bitboard.score(side)
+                bitboard.step(w, frm)
+
+                score = 3 * height + 2 * center + distance
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best = [(w, to)]
+                elif score == best_score:
+                    best.append((w, to))
+
+        if not best:
+            return side ^ 1
+
+        w, to = random.choice(best)
+        frm = bitboard.workers[w]
+        builds = NEIGHBOURS[to] & ~((bitboard.occupied & ~BITS[frm]) | bitboard.planes[3])
+        bitboard.make((w, frm, to, random.choice(list(squares(builds)))))
+
+
+ROLLOUTS = {"random": random_rollout, "heuristic": heuristic_rollout}
+
+
+class MonteCarlo:
+    """
+    UCT Monte Carlo tree search bounded by a wall-clock budget per move.
+
+    _budget (float): Seconds spent per search.
+    _rollout (function): Playout policy from ROLLOUTS.
+    playouts (int): Playouts run by the last search.
+    seconds (float): Time spent by the last search.
+    """
+
+    EXPLORATION = 1.4
+
+    def __init__(self, budget=1.0, rollout="random"):
+        self._budget = float(budget)
+        self._rollout = ROLLOUTS[rollout]
+        self.playouts = 0
+        self.seconds = 0.0
+
+    def playouts_per_second(self):
+        return self.playouts / self.seconds if self.seconds else 0.0
+
+    @staticmethod
+    def decided(bitboard):
+        """Returns a ply forcing a win within 3 plies when there is one, so no search is needed."""
+        return forced_win(bitboard, 3)
+
+    def search(self, bitboard, budget=None):
+        """
+        Returns the most visited ply of the side to move, or None if it cannot
+        move. `budget` overrides the seconds spent on this search.
+        """
+        decided = self.decided(bitboard)
+        if decided or not bitboard.has_moves():
+            self.playouts, self.seconds = 0, 0.0
+            return decided
+
+        root = self.grow(bitboard, budget)
+        if not root.children:
+            # Every ply lets the opponent win: the root is lost and never expanded
+            return random.choice(bitboard.plies())
+        return max(root.children, key=lambda child: child.visits).ply
+
+    def grow(self, bitboard, budget=None):
+        """Runs playouts from an undecided position for the budget, returns the root node."""
+        start = time.perf_counter()
+        deadline = start + (self._budget if budget is None else budget)
+
+        root = Node(None, None, bitboard.side)
+        root.expand(bitboard)
+
+        playouts = 0
+        while time.perf_counter() < deadline or not playouts:
+            board = bitboard.copy()
+            node = root
+
+            # Selection
+            while not node.untried and node.children:
+                node = node.select(self.EXPLORATION)
+                board.make(node.ply)
+
+            # Expansion
+            if node.untried is None:
+                node.expand(board)
+            if node.untried:
+                ply = node.untried.pop()
+                board.make(ply)
+                child = Node(ply, node, board.side)
+                node.children.append(child)
+                node = child
+                node.expand(board)
+
+            # Simulation
+            winner = node.winner
+            if winner is None:
+                winner = self._rollout(board)
+
+            # Backpropagation
+            while node is not None:
+                node.visits += 1
+                if node.side != winner:
+                    node.wins += 1
+                node = node.parent
+
+            playouts += 1
+
+        self.playouts = playouts
+        self.seconds = time.perf_counter() - start
+
+        return root
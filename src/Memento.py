@@ -1,11 +1,78 @@
+import copy
+import sys
+import time
+import tracemalloc
 from abc import ABC, abstractmethod
+from Bitboard import BitBoard, SYMBOLS
+from MoveSet import MoveSet
+from Position import Position
+from cli import parse_options
 
 class GameState:
+    """
+    Turn, workers and grid of a game.
+
+    _by_symbol (dict): Symbol -> worker index.
+    _by_position (dict): Position -> worker occupancy index, kept up to date
+        by the workers themselves whenever their position is assigned.
+    _moves (MoveSet): Legal moves, updated on every worker move and build
+        reported to the state once they have been asked for.
+    """
+
+    __slots__ = ("_turn", "_white_workers", "_blue_workers", "_grid", "_by_symbol", "_by_position", "_moves")
+
     def __init__(self, turn, white_workers, blue_workers, grid):
         self._turn = turn
         self._white_workers = white_workers
         self._blue_workers = blue_workers
         self._grid = grid
+        self._moves = None
+        self._reindex()
+
+    def _reindex(self):
+        self._by_symbol = {}
+        self._by_position = {}
+        for worker in self._white_workers + self._blue_workers:
+            worker.state = self
+            self._by_symbol[worker.symbol] = worker
+            self._by_position[worker.position] = worker
+        self.rebuild_moves()
+
+    def moved(self, worker, old_position, new_position):
+        """Updates the occupancy index after a worker's position was assigned."""
+        if self._by_position.get(old_position) is worker:
+            del self._by_position[old_position]
+        self._by_position[new_position] = worker
+        if self._moves is not None:
+            self._moves.moved(worker.symbol, old_position, new_position)
+
+    def built(self, position):
+        """Updates the legal moves after the level of a cell was changed."""
+        if self._moves is not None:
+            self._moves.built(position, self._grid.get_cell(position).level)
+
+    def rebuild_moves(self):
+        """Lists the legal moves again after the grid was changed as a whole."""
+        if self._moves is not None:
+            self._moves.rebuild()
+
+    @property
+    def moves(self):
+        if self._moves is None:
+            self._moves = MoveSet(self)
+        return self._moves
+
+    def copy(self):
+        """
+        An independent state on new workers: the grid is one buffer copy and
+        the legal moves are only packed again if the copy is asked for them.
+        """
+        return GameState(
+            self._turn,
+            [worker.copy() for worker in self._white_workers],
+            [worker.copy() for worker in self._blue_workers],
+            self._grid.copy(),
+        )
     
     @property
     def turn(self):
@@ -30,51 +97,39 @@ class GameState:
     @white_workers.setter
     def white_workers(self, white_workers):
         self._white_workers = white_workers
+        self._reindex()
     
     @blue_workers.setter
     def blue_workers(self, blue_workers):
         self._blue_workers = blue_workers
+        self._reindex()
 
     @grid.setter
     def grid(self, grid):
         self._grid = grid
+        self.rebuild_moves()
 
-    ############################################
-    ## Deep Copy for Memento & Possible Moves ##
-    ############################################
+    #############################################
+    ## Live State for Memento & Possible Moves ##
+    #############################################
     
     def get_worker_by_symbol(self, symbol):
-        for worker in self._white_workers:
-            if worker.symbol == symbol:
-                return worker
-        for worker in self._blue_workers:
-            if worker.symbol == symbol:
-                return worker
-
-        return None 
+        return self._by_symbol.get(symbol)
     
     def get_workers_pos_by_symbol(self, symbol):
-        matching_workers = []
-        
-        for worker in self._white_workers:
-            if worker.symbol == symbol:
-                matching_workers.append(worker.position)
-        
-        for worker in self._blue_workers:
-            if worker.symbol == symbol:
-                matching_workers.append(worker.position)
-
-        return matching_workers
+        worker = self._by_symbol.get(symbol)
+        return [worker.position] if worker else []
     
     def get_worker_by_position(self, position):
-        for worker in self._white_workers:
-            if worker.position == position:
-                return worker
-        for worker in self._blue_workers:
-            if worker.position == position:
-                return worker
+        return self._by_position.get(position)
 
-        return None
+    def to_bitboard(self):
+        """A BitBoard of the state for fast move generation, copied from the MoveSet."""
+        return self.moves.bitboard(self._turn)
+
+    def key(self):
+        """Zobrist key of the position (heights, workers and side to move)."""
+        return self.to_bitboard().hash
 
 class Memento(ABC):
     """
@@ -87,140 +142,277 @@ class Memento(ABC):
     def get_turn(self) -> int:
         pass
 
-    @abstractmethod
-    def get_grid(self) -> int:
-        pass
 
-    @abstractmethod
-    def get_white_workers(self) -> list:
-        pass
+class DeltaMemento(Memento):
+    """
+    Compact record of a single turn: which worker moved where and what it built.
+    The Originator applies it for redo and reverts it for undo.
+    """
+
+    __slots__ = ("_turn", "_symbol", "_origin", "_target", "_build")
+
+    def __init__(self, turn, symbol, origin, target, build) -> None:
+        self._turn = turn
+        self._symbol = symbol
+        self._origin = origin
+        self._target = target
+        self._build = build
+
+    def get_turn(self) -> int:
+        return self._turn
+
+    def get_symbol(self) -> str:
+        return self._symbol
+
+    def get_origin(self) -> tuple:
+        return self._origin
+
+    def get_target(self) -> tuple:
+        return self._target
+
+    def get_build(self) -> tuple:
+        return self._build
+
+    def __repr__(self) -> str:
+        return f"{self._turn}: {self._symbol} {self._origin}->{self._target} +{self._build}"
+
+
+class KeyframeMemento(Memento):
+    """
+    Full snapshot of a position, held as an immutable Position that is
+    shared as it is rather than copied. Lets the Caretaker jump to a turn
+    without replaying the whole history.
+    """
+
+    __slots__ = ("_position",)
+
+    def __init__(self, position) -> None:
+        self._position = position
+
+    def get_turn(self) -> int:
+        return self._position.turn
+
+    def get_position(self) -> Position:
+        return self._position
 
-    @abstractmethod
-    def get_blue_workers(self) -> list:
-        pass
 
 class Originator:
-    # here create a functional to save the game state maybe dictionary
     """
-    The Originator holds some important state that may change over time. It also
-    defines a method for saving the state inside a memento and another method
-    for restoring the state from it.
+    The Originator holds the live game state. It records each turn as a delta
+    memento and moves the state backwards or forwards by reverting or applying
+    them, and can also save and restore full keyframes.
     """
 
     _state = None
     """
-    For the sake of simplicity, the originator's state is stored inside a single
-    variable.
+    The live GameState shared with the board and the players.
     """
 
-    def __init__(self, state: object) -> None:
+    def __init__(self, state: GameState) -> None:
         self._state = state
 
-    def generate(self, game_state) -> GameState:
+    @property
+    def state(self) -> GameState:
+        return self._state
+
+    def record(self, symbol, origin, target, build) -> DeltaMemento:
         """
-        The Originator's business logic may affect its internal state.
-        Therefore, the client should backup the state before launching methods
-        of the business logic via the save() method.
+        Records the turn that has just been played on the state and moves the
+        state on to the next turn, as apply() does.
         """
 
-        self._state = game_state
-        return self.save()
+        memento = DeltaMemento(self._state.turn, symbol, origin, target, build)
+        self._state.turn = memento.get_turn() + 1
+        return memento
 
-    def save(self) -> Memento:
+    def apply(self, memento: DeltaMemento) -> None:
         """
-        Saves the current state inside a memento.
+        Replays a recorded turn on the state (redo).
         """
 
-        return ConcreteMemento(self._state)
+        worker = self._state.get_worker_by_symbol(memento.get_symbol())
+        worker.position = memento.get_target()
+        self._state.grid.get_cell(memento.get_build()).upgrade()
+        self._state.built(memento.get_build())
+        self._state.turn = memento.get_turn() + 1
 
-    def restore(self, memento: Memento) -> None:
+    def revert(self, memento: DeltaMemento) -> None:
         """
-        Restores the Originator's state from a memento object.
+        Takes a recorded turn back on the state (undo).
         """
 
-        self._state = memento.get_state()
+        self._state.grid.get_cell(memento.get_build()).downgrade()
+        self._state.built(memento.get_build())
+        worker = self._state.get_worker_by_symbol(memento.get_symbol())
+        worker.position = memento.get_origin()
+        self._state.turn = memento.get_turn()
 
+    def save(self) -> KeyframeMemento:
+        """
+        Saves the current state inside a keyframe memento.
+        """
 
-class ConcreteMemento(Memento):
-    def __init__(self, state: GameState) -> None:
-        self._state = state
+        return KeyframeMemento(Position.from_state(self._state))
 
-    def get_state(self) -> GameState:
-        return self._state
-    
-    def get_turn(self) -> int:
-        return int(self._state.turn)
-    
-    def get_grid(self) -> list:
-        return self._state.grid
+    def restore(self, memento: KeyframeMemento) -> None:
+        """
+        Restores the state from a keyframe memento.
+        """
+
+        position = memento.get_position()
+        self._state.grid.levels[:] = bytes(position.levels)
 
-    def get_white_workers(self) -> list:
-        return self._state.white_workers
+        for symbol, worker_position in zip(SYMBOLS, position.workers):
+            self._state.get_worker_by_symbol(symbol).position = worker_position
+
+        self._state.turn = position.turn
+        self._state.rebuild_moves()
 
-    def get_blue_workers(self) -> list:
-        return self._state.blue_workers
 
 class Caretaker:
     """
-    The Caretaker doesn't depend on the Concrete Memento class. Therefore, it
-    doesn't have access to the originator's state, stored inside the memento. It
-    works with all mementos via the base Memento interface.
+    The Caretaker keeps the played turns as delta mementos and a cursor into
+    them, so memory grows with the number of moves only. Every
+    `keyframe_interval` turns (0 disables it) a keyframe is stored as well,
+    which goto() uses to reach any turn with a bounded number of deltas.
     """
 
-    def __init__(self, originator: Originator) -> None:
-        self._mementos = []
-        self._undone_mementos = []
+    def __init__(self, originator: Originator, keyframe_interval=0) -> None:
+        self._history = []
+        self._cursor = 0
         self._originator = originator
+        self._interval = keyframe_interval
+        self._keyframes = {0: originator.save()}
+
+    @classmethod
+    def browse(cls, originator: Originator, game) -> "Caretaker":
+        """
+        Caretaker over an ArchivedGame: its deltas and keyframes are read
+        from the archive on demand, starting from the initial position.
+        """
 
-    def backup(self) -> None:
+        caretaker = cls(originator)
+        caretaker._history = game
+        caretaker._keyframes = game.keyframes()
+        caretaker._interval = 0
+        originator.restore(caretaker._keyframes[0])
+        return caretaker
 
-        # Save Current Originator State
-        current_state = self._originator.save()
-        # If not yet appended, then append and update
-        if current_state not in self._mementos:
-            self._mementos.append(current_state)
-            self._undone_mementos = []
+    def __len__(self) -> int:
+        return len(self._history)
+
+    @property
+    def cursor(self) -> int:
+        return self._cursor
+
+    def played(self) -> list:
+        """The deltas of the turns up to the cursor, in the order they were played."""
+        return self._history[: self._cursor]
+
+    def backup(self, memento: DeltaMemento) -> None:
+
+        # Playing on from a browsed game continues in memory
+        if not isinstance(self._history, list):
+            self._history = self._history[: self._cursor]
+            self._keyframes = {0: self._keyframes[0]}
+
+        # A new turn discards the undone ones
+        del self._history[self._cursor :]
+        for index in [i for i in self._keyframes if i > self._cursor]:
+            del self._keyframes[index]
+
+        self._history.append(memento)
+        self._cursor += 1
+
+        # The keyframe is played on from the previous one and shares its untouched rows
+        if self._interval and self._cursor % self._interval == 0:
+            position = self._keyframes[self._cursor - self._interval].get_position()
+            for delta in self._history[self._cursor - self._interval : self._cursor]:
+                position = position.play(delta.get_symbol(), delta.get_target(), delta.get_build())
+            self._keyframes[self._cursor] = KeyframeMemento(position)
 
     def undo(self) -> None:
 
-        if not len(self._mementos) - 1:
+        if not self._cursor:
             return
 
-        # Obtain Latest Momento from the list
-        originator_state = self._originator.save()
-        memento = self._mementos.pop()
-        # Impornt: check after pop()
-        if not len(self._mementos) - 1:
-            self._undone_mementos.append(originator_state)
-            self._originator.restore(memento)
-            return
-        
-        # First preserve the current originator state
-        self._undone_mementos.append(self._originator.save())
-        # Restore to the originator to display it
-        self._originator.restore(memento)
+        self._cursor -= 1
+        self._originator.revert(self._history[self._cursor])
 
     def redo(self) -> None:
-        
-        if not len(self._undone_mementos):
-            return
-        
-        originator_state = self._originator.save()
-        memento = self._undone_mementos.pop()
-        if not self._undone_mementos:
-            self._mementos.append(originator_state)
-            self._originator.restore(memento)
+
+        if self._cursor == len(self._history):
             return
-        
-        # First preserve the current originator state
-        self._mementos.append(self._originator.save())
-        # Restore to the originator to display it
-        self._originator.restore(memento)
 
+        self._originator.apply(self._history[self._cursor])
+        self._cursor += 1
+
+    def goto(self, index) -> None:
+        """Moves the state to the position after `index` recorded turns."""
+
+        index = max(0, min(index, len(self._history)))
+
+        # Restart from the nearest keyframe when it is closer than the cursor
+        keyframe = max(i for i in self._keyframes if i <= index)
+        if abs(index - self._cursor) > index - keyframe:
+            self._originator.restore(self._keyframes[keyframe])
+            self._cursor = keyframe
+
+        while self._cursor < index:
+            self.redo()
+        while self._cursor > index:
+            self.undo()
 
     def show_history(self) -> None:
         print("Caretaker: Here's the list of mementos:")
-        for memento in self._mementos:
-            print("Blue Workers:", memento.get_blue_workers())
-            print("White Workers:", memento.get_white_workers())
+        for memento in self._history[: self._cursor]:
+            print(memento)
+
+
+def main():
+    """
+    Command line: python Memento.py [--states=2000]
+    Times a snapshot and measures the memory each one holds: a deep copy of
+    the live state, GameState.copy() and a keyframe memento.
+    """
 
+    # Imported here: the game objects are only needed by the benchmark
+    from Board import Board
+    from Player import PlayerFactory
+
+    _, options = parse_options(sys.argv[1:])
+    count = options.get("states", 2000)
+
+    board = Board()
+    white = PlayerFactory.get_factory("white", "random", board)
+    blue = PlayerFactory.get_factory("blue", "random", board)
+    state = GameState(1, white.workers, blue.workers, board.grid)
+    board._update_state(state)
+    # Built through the board, so the state's legal moves follow every level
+    for i in range(Board.SIZE):
+        for j in range(Board.SIZE):
+            for _ in range((i + j) % 4):
+                board.build((i, j))
+    originator = Originator(state)
+
+    for name, snapshot in (
+        ("copy.deepcopy(state)", lambda: copy.deepcopy(state)),
+        ("state.copy()", state.copy),
+        ("grid.copy()", state.grid.copy),
+        ("originator.save()", originator.save),
+    ):
+        start = time.perf_counter()
+        for _ in range(count):
+            snapshot()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        kept = [snapshot() for _ in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name}: {elapsed / count * 1e6:.2f}us, {size / len(kept):.0f} bytes per snapshot")
+
+
+if __name__ == "__main__":
+    main()
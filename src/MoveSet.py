@@ -0,0 +1,196 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import sys
+import time
+from Bitboard import BitBoard, BITS, CELLS, NEIGHBOURS, POSITIONS, SYMBOLS, BLUE, WHITE
+from Bitboard import square, squares
+from cli import parse_options
+
+
+def _reach(sq):
+    mask = BITS[sq] | NEIGHBOURS[sq]
+    for n in squares(NEIGHBOURS[sq]):
+        mask |= NEIGHBOURS[n]
+    return mask
+
+
+# REACH[sq]: the squares within two steps of sq. The moves and builds of a
+# worker only depend on the levels and workers this close to it, so a change
+# on sq only touches the workers standing in REACH[sq].
+REACH = tuple(_reach(sq) for sq in range(CELLS))
+
+
+class MoveSet:
+    """
+    Legal moves of a GameState kept up to date as the state changes, instead
+    of being listed from scratch every turn.
+
+    The state reports every worker move (moved), level change (built) and
+    wholesale change such as a keyframe restore (rebuild). A change only
+    drops the cached possibilities of the workers within REACH of it, and
+    those are listed again the next time they are asked for.
+
+    _state (GameState): The state mirrored.
+    _bitboard (BitBoard): Levels and workers of the state, updated in place.
+    _possibilities (list): For each worker (SYMBOLS order) a {move: set(builds)}
+        dictionary of positions, None when it has to be listed again.
+    updates (int): Number of times a worker's possibilities were listed.
+    rebuilds (int): Number of full rebuilds.
+    """
+
+    def __init__(self, state):
+        self._state = state
+        self._bitboard = None
+        self._possibilities = [None] * len(SYMBOLS)
+        self.updates = 0
+        self.rebuilds = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Packs the whole state again and drops every cached possibility."""
+        state = self._state
+        self._bitboard = BitBoard.from_grid(
+            state.grid, state.white_workers, state.blue_workers, state.turn
+        )
+        self._possibilities = [None] * len(SYMBOLS)
+        self.rebuilds += 1
+
+    def _changed(self, sq):
+        reach = REACH[sq]
+        for w, at in enumerate(self._bitboard.workers):
+            if reach & BITS[at]:
+                self._possibilities[w] = None
+
+    def moved(self, symbol, old_position, new_position):
+        """A worker's position was assigned."""
+        frm, to = square(old_position), square(new_position)
+        if frm == to:
+            return
+        self._bitboard.step(SYMBOLS.index(symbol), to)
+        self._changed(frm)
+        self._changed(to)
+
+    def built(self, position, level):
+        """The level of a cell was raised or lowered to `level`."""
+        sq = square(position)
+        self._bitboard.set_level(sq, level)
+        self._changed(sq)
+
+    def bitboard(self, turn):
+        """A BitBoard copy of the position with the side to move of `turn`."""
+        bitboard = self._bitboard.copy()
+        bitboard.side = WHITE if turn % 2 else BLUE
+        return bitboard
+
+    def possibilities(self, w):
+        """
+        {move: set(builds)} of worker w in board positions, empty when it
+        cannot move. The dictionary is shared with later calls until the
+        worker's neighbourhood changes, so it must not be modified.
+        """
+        cached = self._possibilities[w]
+        if cached is None:
+            bitboard = self._bitboard
+            cached = {
+                POSITIONS[to]: {POSITIONS[build] for build in squares(bitboard.build_mask(w, to))}
+                for to in squares(bitboard.move_mask(w))
+            }
+            self._possibilities[w] = cached
+            self.updates += 1
+        return cached
+
+    def has_moves(self, side):
+        return self._bitboard.has_moves(side)
+
+    def count(self, side):
+        return self._bitboard.count_plies(side)
+
+
+def _full(state, w):
+    # Reference: the possibilities listed from a freshly packed state
+    bitboard = BitBoard.from_grid(state.grid, state.white_workers, state.blue_workers)
+    return {
+        POSITIONS[to]: {POSITIONS[build] for build in squares(bitboard.build_mask(w, to))}
+        for to in squares(bitboard.move_mask(w))
+    }
+
+
+def main():
+    """
+    Command line: python MoveSet.py [--games=200] [--seed=0] [--undo=0.2]
+    Plays random games through GameState and the Originator, undoing,
+    redoing or jumping back through keyframes now and then, and times the
+    incremental possibilities against a full rebuild every turn
+    (tests/test_moveset.py checks that both agree).
+    """
+
+    # Imported here: the game objects are only needed by the benchmark
+    from Board import Board
+    from Memento import Caretaker, GameState, Originator
+    from Player import PlayerFactory
+
+    _, options = parse_options(sys.argv[1:])
+    rng = random.Random(options.get("seed", 0))
+    undo = options.get("undo", 0.2)
+
+    turns = 0
+    incremental = full = 0.0
+    for _ in range(options.get("games", 200)):
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+        originator = Originator(state)
+        caretaker = Caretaker(originator, keyframe_interval=8)
+        moves = state.moves
+
+        while True:
+            side = 0 if state.turn % 2 else 1
+
+            start = time.perf_counter()
+            found = [moves.possibilities(w) for w in (2 * side, 2 * side + 1)]
+            incremental += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = [_full(state, w) for w in (2 * side, 2 * side + 1)]
+            full += time.perf_counter() - start
+
+            turns += 1
+            if not any(found) or board.bitboard().has_won(side ^ 1):
+                break
+
+            # Step back, back and forth again, or jump through a keyframe
+            if caretaker.cursor and rng.random() < undo:
+                chance = rng.random()
+                if chance < 0.2:
+                    caretaker.goto(rng.randrange(caretaker.cursor))
+                else:
+                    caretaker.undo()
+                    if chance < 0.6:
+                        caretaker.redo()
+                continue
+
+            w = 2 * side + rng.randrange(2)
+            if not found[w % 2]:
+                w ^= 1
+            worker = state.get_worker_by_symbol(SYMBOLS[w])
+            origin = worker.position
+            move = rng.choice(list(found[w % 2]))
+            build = rng.choice(list(found[w % 2][move]))
+
+            worker.position = move
+            board.build(build)
+            caretaker.backup(originator.record(SYMBOLS[w], origin, move, build))
+
+    print(f"{turns} turns")
+    print(
+        f"possibilities: incremental {incremental / turns * 1e6:.2f}us, "
+        f"full {full / turns * 1e6:.2f}us per turn "
+        f"({moves.updates} worker updates, {moves.rebuilds} rebuilds in the last game)"
+    )
+
+
+if __name__ == "__main__":
+    main()
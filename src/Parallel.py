@@ -0,0 +1,200 @@
+import atexit
+import random
+from multiprocessing import Pool, Value, current_process
+from Bitboard import BitBoard, BITS
+from Search import AlphaBeta
+from Mcts import MonteCarlo
+from Transposition import TranspositionTable
+from threats import safe_plies
+
+# Per-process state of the pool workers, set up by the initializers
+_searcher = None
+_alpha = None
+
+
+def can_start_pool():
+    """
+    Whether this process may start a pool: the daemonic workers of another
+    pool (simulate.py, tournament.py) cannot have children of their own.
+    """
+    return not current_process().daemon
+
+
+def _init_alpha_beta(alpha, depth, tt_mb):
+    global _searcher, _alpha
+    _alpha = alpha
+    _searcher = AlphaBeta(depth, TranspositionTable(tt_mb) if tt_mb else None)
+
+
+def _search_root_ply(task):
+    """Scores one root ply, starting from the best score found by any process so far."""
+    packed, ply = task
+    bitboard = BitBoard.unpack(packed)
+
+    alpha = _alpha.value
+    bitboard.make(ply)
+    score = -_searcher.score(
+        bitboard, _searcher.depth - 1, -AlphaBeta.WIN - _searcher.depth - 1, -alpha
+    )
+
+    # Share the bound so the remaining root plies are searched with a narrower window
+    if score > alpha:
+        with _alpha.get_lock():
+            if score > _alpha.value:
+                _alpha.value = score
+
+    return ply, score, alpha, _searcher.nodes
+
+
+def _init_monte_carlo(budget, rollout):
+    global _searcher
+    _searcher = MonteCarlo(budget, rollout)
+
+
+def _grow_tree(task):
+    """Grows an independent UCT tree and returns its root statistics."""
+    packed, seed, budget = task
+    random.seed(seed)
+    root = _searcher.grow(BitBoard.unpack(packed), budget)
+    return [(child.ply, child.visits, child.wins) for child in root.children], _searcher.playouts
+
+
+class ParallelAlphaBeta:
+    """
+    Root-split alpha-beta search across a process pool.
+
+    The root plies (best candidates first) are handed to the pool one by one
+    as packed bitboards. Every process keeps its own transposition table
+    across moves and reads a shared alpha bound before each root ply, so
+    plies searched later get narrower windows from the best score any
+    process has found.
+
+    _jobs (int): Number of worker processes, started by the first search
+        and kept until close().
+    nodes (int): Positions visited by all processes in the last search.
+    """
+
+    def __init__(self, depth=3, jobs=2, tt_mb=16):
+        self._depth = max(1, int(depth))
+        self._jobs = jobs
+        self._tt_mb = tt_mb
+        self._pool = None
+        self._alpha = None
+        self._ordering = AlphaBeta(depth)
+        self.nodes = 0
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def table(self):
+        return None
+
+    def _start(self):
+        self._alpha = Value("i", 0)
+        self._pool = Pool(
+            self._jobs,
+            initializer=_init_alpha_beta,
+            initargs=(self._alpha, self._depth, self._tt_mb),
+        )
+        atexit.register(self._pool.terminate)
+
+    def close(self):
+        """Stops the worker processes, the next search starts new ones."""
+        if self._pool is not None:
+            self._pool.terminate()
+            atexit.unregister(self._pool.terminate)
+            self._pool = None
+
+    def search(self, bitboard):
+        """Returns (best ply, score) for the side to move, like AlphaBeta.search."""
+        self.nodes = 1
+
+        plies = self._ordering.ordered(bitboard)
+        if not plies:
+            return None, -AlphaBeta.WIN
+
+        top = bitboard.planes[2]
+        for ply in plies:
+            if top & BITS[ply[2]]:
+                return ply, AlphaBeta.WIN + self._depth
+
+        # Plies handing the opponent a win are dropped unless all of them do
+        plies = safe_plies(bitboard, plies) or plies
+
+        if self._depth == 1 or len(plies) == 1:
+            return AlphaBeta(self._depth).search(bitboard)
+
+        if self._pool is None:
+            self._start()
+
+        self._alpha.value = -AlphaBeta.WIN - self._depth - 1
+        packed = bitboard.pack()
+        tasks = [(packed, ply) for ply in plies]
+
+        best_ply, best = None, None
+        for ply, score, alpha, nodes in self._pool.imap_unordered(_search_root_ply, tasks):
+            self.nodes += nodes
+            # Scores at or below the window they were searched with are only bounds
+            if score > alpha and (best is None or score > best):
+                best_ply, best = ply, score
+
+        return best_ply, best
+
+
+class ParallelMonteCarlo:
+    """
+    Root-parallel UCT: every process grows its own tree from the same position
+    for the whole budget with a different seed, and the root visit counts are
+    summed to pick the move. The pool is started by the first search and
+    kept until close().
+
+    playouts (int): Playouts of all processes in the last search.
+    seconds (float): The budget spent by the last search.
+    """
+
+    def __init__(self, budget=1.0, rollout="random", jobs=2):
+        self._budget = float(budget)
+        self._rollout = rollout
+        self._jobs = jobs
+        self._pool = None
+        self.playouts = 0
+        self.seconds = 0.0
+
+    def close(self):
+        """Stops the worker processes, the next search starts new ones."""
+        if self._pool is not None:
+            self._pool.terminate()
+            atexit.unregister(self._pool.terminate)
+            self._pool = None
+
+    def search(self, bitboard, budget=None):
+        decided = MonteCarlo.decided(bitboard)
+        if decided or not bitboard.has_moves():
+            self.playouts, self.seconds = 0, 0.0
+            return decided
+
+        if self._pool is None:
+            self._pool = Pool(
+                self._jobs,
+                initializer=_init_monte_carlo,
+                initargs=(self._budget, self._rollout),
+            )
+            atexit.register(self._pool.terminate)
+
+        budget = self._budget if budget is None else budget
+        packed = bitboard.pack()
+        tasks = [(packed, random.getrandbits(32), budget) for _ in range(self._jobs)]
+
+        visits = {}
+        self.playouts = 0
+        for children, playouts in self._pool.map(_grow_tree, tasks):
+            self.playouts += playouts
+            for ply, count, _ in children:
+                visits[ply] = visits.get(ply, 0) + count
+        self.seconds = budget
+
+        if not visits:
+            return random.choice(bitboard.plies())
+        return max(visits, key=visits.get)
@@ -1,6 +1,12 @@
 import copy
 from exceptions import *
-from Strategy import HumanStrategy, HeuristicStrategy, RandomStrategy
+from Strategy import (
+    HumanStrategy,
+    HeuristicStrategy,
+    RandomStrategy,
+    MinimaxStrategy,
+    MctsStrategy,
+)
 
 
 class Worker:
@@ -9,13 +15,18 @@ class Worker:
 
     _symbol (str): The symbol representing the worker.
     _position (tuple): The current position of the worker on the board.
-    _board (Board): The game board.
+    _state (GameState): The state indexing the worker by position, if any.
+
+    The board argument is kept for the factories, the worker reaches the
+    board through its state.
     """
 
+    __slots__ = ("_symbol", "_position", "_state")
+
     def __init__(self, board, symbol, default_position):
         self._symbol = symbol
         self._position = default_position
-        self._board = board
+        self._state = None
 
     @property
     def symbol(self):
@@ -27,13 +38,28 @@ class Worker:
 
     @position.setter
     def position(self, new_position):
+        old_position = self._position
         self._position = new_position
+        if self._state is not None:
+            self._state.moved(self, old_position, new_position)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
 
     def __repr__(self) -> str:
         return self.symbol
 
+    def copy(self):
+        """A worker on the same square, not attached to any state."""
+        return Worker(None, self._symbol, self._position)
+
     def __deepcopy__(self, memo):
-        new_worker = Worker(self._board, self._symbol, self._position)
+        new_worker = self.copy()
         memo[id(self)] = new_worker
         return new_worker
 
@@ -142,7 +168,16 @@ class Player:
 
         self._strategy.update_possibilities(self._workers)
 
+    def close(self):
+        """Releases the strategy's resources (e.g. search processes) after the game."""
+
+        self._strategy.close()
+
     # Getters & Setters
+    @property
+    def strategy(self):
+        return self._strategy
+
     @property
     def workers(self):
         return self._workers
@@ -164,8 +199,11 @@ class PlayerFactory:
     """Factory Method Pattern for creating player instances."""
 
     @staticmethod
-    def get_factory(color, player_type, board):
-        """Returns a player instance based on the specified parameters."""
+    def get_factory(color, player_type, board, **options):
+        """
+        Returns a player instance based on the specified parameters.
+        Extra options (e.g. depth) are passed on to the strategy.
+        """
 
         worker_factory = WorkerFactory.get_factory(color)
         workers = worker_factory.create_workers(board)
@@ -174,9 +212,11 @@ class PlayerFactory:
             "human": HumanStrategy,
             "heuristic": HeuristicStrategy,
             "random": RandomStrategy,
+            "minimax": MinimaxStrategy,
+            "mcts": MctsStrategy,
         }
         strategy = strategies[player_type]
         if not strategy:
             raise ValueError("Invalid player type")
 
-        return Player(color, workers, strategy(board, workers, player_type))
+        return Player(color, workers, strategy(board, workers, player_type, **options))
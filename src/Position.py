@@ -0,0 +1,251 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import sys
+import time
+from Bitboard import BITS, BitBoard, SIZE, SYMBOLS, ZOBRIST_LEVEL, ZOBRIST_SIDE, ZOBRIST_WORKER
+from Bitboard import square
+from Board import Grid
+from Player import Worker
+from cli import parse_options
+
+# Positions bypass their own __setattr__, which refuses every write
+_new = object.__new__
+_set = object.__setattr__
+
+
+class Position:
+    """
+    Immutable snapshot of a game: levels, worker positions and turn.
+
+    A position is never changed once made. play() derives the position after
+    a turn and shares everything the turn does not touch with its parent:
+    the rows of levels other than the built one and the level tuples of the
+    rows themselves, so a child costs one row and four worker positions
+    instead of a copy of the board. Positions can therefore be kept in the
+    history, used as dict keys and handed to other threads as they are.
+
+    Two positions are equal when their levels, workers and side to move are,
+    whatever their turn numbers. Their key is the Zobrist key of the BitBoard
+    of the same position, as Board.key() returns, and their hash is taken
+    from it.
+
+    _rows (tuple): SIZE tuples of SIZE levels, shared between positions.
+    _workers (tuple): Position of every worker, ordered as SYMBOLS.
+    _turn (int): Turn number, odd when white is to move.
+    _hash (int): Zobrist key, derived incrementally by play().
+    """
+
+    __slots__ = ("_rows", "_workers", "_turn", "_hash")
+
+    def __init__(self, levels, workers, turn=1):
+        rows = tuple(tuple(levels[row * SIZE : (row + 1) * SIZE]) for row in range(SIZE))
+        workers = tuple(tuple(position) for position in workers)
+
+        key = 0 if turn % 2 else ZOBRIST_SIDE
+        for sq, level in enumerate(levels):
+            key ^= ZOBRIST_LEVEL[sq][level]
+        for w, position in enumerate(workers):
+            key ^= ZOBRIST_WORKER[w][square(position)]
+
+        self._init(rows, workers, turn, key)
+
+    def _init(self, rows, workers, turn, key):
+        # The only writes a position ever gets, right after it is made
+        _set(self, "_rows", rows)
+        _set(self, "_workers", workers)
+        _set(self, "_turn", turn)
+        _set(self, "_hash", key)
+
+    @classmethod
+    def _make(cls, rows, workers, turn, key):
+        position = _new(cls)
+        position._init(rows, workers, turn, key)
+        return position
+
+    @classmethod
+    def from_state(cls, state):
+        """The position of a GameState, which is left untouched."""
+        workers = [state.get_worker_by_symbol(symbol).position for symbol in SYMBOLS]
+        return cls(state.grid.levels, workers, state.turn)
+
+    def to_state(self):
+        """A new GameState on new workers and a new grid, set up as this position."""
+        # Imported here: Memento keeps its keyframes as Positions
+        from Memento import GameState
+
+        workers = [Worker(None, symbol, position) for symbol, position in zip(SYMBOLS, self._workers)]
+        return GameState(self._turn, workers[:2], workers[2:], Grid(self.levels))
+
+    def to_bitboard(self):
+        planes = [0, 0, 0, 0]
+        for sq, level in enumerate(self.levels):
+            for k in range(min(level, 4)):
+                planes[k] |= BITS[sq]
+        return BitBoard(planes, [square(position) for position in self._workers], self.side)
+
+    def play(self, symbol, move, build):
+        """
+        The position after worker `symbol` moves to `move` and builds on
+        `build`, with the turn passed. The move is not validated.
+        """
+
+        w = SYMBOLS.index(symbol)
+        origin = self._workers[w]
+        workers = self._workers[:w] + (tuple(move),) + self._workers[w + 1 :]
+
+        row, col = build
+        levels = self._rows[row]
+        level = levels[col]
+        rows = list(self._rows)
+        rows[row] = levels[:col] + (level + 1,) + levels[col + 1 :]
+
+        keys = ZOBRIST_LEVEL[row * SIZE + col]
+        worker_keys = ZOBRIST_WORKER[w]
+        key = (
+            self._hash
+            ^ worker_keys[origin[0] * SIZE + origin[1]]
+            ^ worker_keys[move[0] * SIZE + move[1]]
+            ^ keys[level]
+            ^ keys[level + 1]
+            ^ ZOBRIST_SIDE
+        )
+
+        child = _new(Position)
+        _set(child, "_rows", tuple(rows))
+        _set(child, "_workers", workers)
+        _set(child, "_turn", self._turn + 1)
+        _set(child, "_hash", key)
+        return child
+
+    @property
+    def key(self):
+        return self._hash
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def levels(self):
+        """The 25 levels in row-major order, as Grid.levels holds them."""
+        return sum(self._rows, ())
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def turn(self):
+        return self._turn
+
+    @property
+    def side(self):
+        """0 (white) or 1 (blue), the player to move, as in BitBoard."""
+        return 0 if self._turn % 2 else 1
+
+    def level(self, position):
+        return self._rows[position[0]][position[1]]
+
+    def worker(self, symbol):
+        """The position of worker `symbol`."""
+        return self._workers[SYMBOLS.index(symbol)]
+
+    def occupied(self, position):
+        return tuple(position) in self._workers
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self._workers == other._workers
+            and self._turn % 2 == other._turn % 2
+            and self._rows == other._rows
+        )
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return Position._make, (self._rows, self._workers, self._turn, self._hash)
+
+    def __repr__(self):
+        workers = ", ".join(f"{symbol}{position}" for symbol, position in zip(SYMBOLS, self._workers))
+        return f"Position(turn {self._turn}, {workers}, levels {self._rows})"
+
+
+def main():
+    """
+    Command line: python Position.py [--games=200] [--seed=0]
+    Plays random games on a live GameState alongside a chain of positions
+    derived with play() and times deriving a child against copying the
+    state (tests/test_position.py checks that both agree).
+    """
+
+    # Imported here: the game objects are only needed by the benchmark
+    from Board import Board
+    from Memento import GameState
+    from Player import PlayerFactory
+
+    _, options = parse_options(sys.argv[1:])
+    rng = random.Random(options.get("seed", 0))
+
+    turns = 0
+    derive = snapshot = 0.0
+    seen = {}
+    for _ in range(options.get("games", 200)):
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+        position = Position.from_state(state)
+
+        while True:
+            side = 0 if state.turn % 2 else 1
+            plies = board.bitboard().plies(side)
+            if not plies or board.bitboard().has_won(side ^ 1):
+                break
+
+            w, _, to, build = rng.choice(plies)
+            symbol = SYMBOLS[w]
+            move, build = divmod(to, SIZE), divmod(build, SIZE)
+
+            start = time.perf_counter()
+            child = position.play(symbol, move, build)
+            derive += time.perf_counter() - start
+
+            start = time.perf_counter()
+            state.copy()
+            snapshot += time.perf_counter() - start
+
+            state.get_worker_by_symbol(symbol).position = move
+            board.build(build)
+            state.turn += 1
+
+            turns += 1
+            seen[child] = seen.get(child, 0) + 1
+            position = child
+
+    print(f"{turns} turns, {len(seen)} distinct positions")
+    print(
+        f"play() {derive / turns * 1e6:.2f}us, "
+        f"GameState.copy() {snapshot / turns * 1e6:.2f}us per turn"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# Anton Melnychuk & Oliver Li
+
+import struct
+from Bitboard import POSITIONS, SYMBOLS
+from DirectionUtils import DirectionUtils
+
+# File layout: MAGIC, then for every game a header (plies, winner) and one byte per ply
+MAGIC = b"SNTR\x01"
+_HEADER = struct.Struct("<HB")
+
+WINNERS = ("white", "blue")
+UNFINISHED = 0xFF
+
+_SYMBOL_CODES = {symbol: i for i, symbol in enumerate(SYMBOLS)}
+_DIRECTION_CODES = {direction: i for i, direction in enumerate(DirectionUtils.DIRECTIONS)}
+
+# byte -> (symbol, move direction, build direction)
+_DECODED = tuple(
+    (
+        SYMBOLS[code >> 6],
+        DirectionUtils.DIRECTIONS[code >> 3 & 7],
+        DirectionUtils.DIRECTIONS[code & 7],
+    )
+    for code in range(256)
+)
+
+_SQUARES = {position: sq for sq, position in enumerate(POSITIONS)}
+
+# _SQUARE_DIRECTIONS[frm][to] is the direction code of a step between neighbours
+_SQUARE_DIRECTIONS = tuple(
+    tuple(
+        _DIRECTION_CODES.get(
+            DirectionUtils.get_direction((r2 - r1, c2 - c1))
+            if max(abs(r2 - r1), abs(c2 - c1)) == 1
+            else None
+        )
+        for r2, c2 in POSITIONS
+    )
+    for r1, c1 in POSITIONS
+)
+
+# _DIRECTION_STEPS[sq][code] is the square one step from sq in that direction, None off the board
+_DIRECTION_STEPS = tuple(
+    tuple(
+        _SQUARES.get(DirectionUtils.move_result(position, direction))
+        for direction in DirectionUtils.DIRECTIONS
+    )
+    for position in POSITIONS
+)
+
+
+def encode_ply(symbol, move, build):
+    """
+    Packs a turn into one byte: worker symbol (2 bits), move direction
+    (3 bits) and build direction (3 bits) in DirectionUtils.DIRECTIONS order.
+    """
+    return _SYMBOL_CODES[symbol] << 6 | _DIRECTION_CODES[move] << 3 | _DIRECTION_CODES[build]
+
+
+def encode_squares(w, frm, to, build):
+    """encode_ply for a bitboard ply (worker index, from, to, build square)."""
+    return w << 6 | _SQUARE_DIRECTIONS[frm][to] << 3 | _SQUARE_DIRECTIONS[to][build]
+
+
+def decode_ply(code):
+    """Returns the (symbol, move, build) turn of a ply byte."""
+    return _DECODED[code]
+
+
+def decode_squares(code, workers):
+    """The bitboard ply of a ply byte, given the worker squares before it."""
+    w = code >> 6
+    frm = workers[w]
+    to = _DIRECTION_STEPS[frm][code >> 3 & 7]
+    return w, frm, to, _DIRECTION_STEPS[to][code & 7]
+
+
+class GameRecord:
+    """
+    One recorded game from the initial position.
+
+    plies (bytes): One encode_ply() byte per turn played.
+    result (int): 0 white won, 1 blue won, UNFINISHED otherwise.
+    """
+
+    __slots__ = ("plies", "result")
+
+    def __init__(self, plies, result=UNFINISHED):
+        self.plies = bytes(plies)
+        self.result = result
+
+    @classmethod
+    def from_winner(cls, plies, winner=None):
+        return cls(plies, WINNERS.index(winner) if winner else UNFINISHED)
+
+    @property
+    def winner(self):
+        """The winning color, or None for an unfinished game."""
+        return WINNERS[self.result] if self.result != UNFINISHED else None
+
+    def __len__(self):
+        return len(self.plies)
+
+    def __iter__(self):
+        """Yields the (symbol, move, build) turns in the order they were played."""
+        for code in self.plies:
+            yield _DECODED[code]
+
+    def to_bytes(self):
+        return _HEADER.pack(len(self.plies), self.result) + self.plies
+
+    def __repr__(self):
+        return f"GameRecord({len(self.plies)} plies, winner={self.winner})"
+
+
+class RecordWriter:
+    """
+    Streaming writer appending games to a record file, one write per game.
+
+    _file (file): The record file opened for appending.
+    games (int): Games written through this writer.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.games = 0
+
+    def write(self, record):
+        self._file.write(record.to_bytes())
+        self.games += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class RecordReader:
+    """
+    Streaming reader yielding the GameRecords of a record file one by one,
+    reading through a fixed-size buffer instead of loading the whole file.
+    """
+
+    def __init__(self, path, buffer_size=1 << 20):
+        self._path = path
+        self._buffer_size = buffer_size
+
+    def __iter__(self):
+        with open(self._path, "rb", buffering=self._buffer_size) as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a game record file")
+
+            read = file.read
+            size = _HEADER.size
+            unpack = _HEADER.unpack
+            while True:
+                header = read(size)
+                if not header:
+                    return
+                if len(header) < size:
+                    raise ValueError("Truncated game record")
+
+                count, result = unpack(header)
+                plies = read(count)
+                if len(plies) < count:
+                    raise ValueError("Truncated game record")
+                yield GameRecord(plies, result)
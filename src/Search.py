@@ -0,0 +1,310 @@
+import time
+from Bitboard import BITS, CENTER, NEIGHBOURS, SIDE_WORKERS, squares
+from exceptions import SearchTimeout
+from Transposition import EXACT, LOWER, UPPER
+from threats import climbing, safe_builds, safe_plies
+
+
+class AlphaBeta:
+    """
+    Negamax alpha-beta search over (worker, move, build) plies of a BitBoard.
+
+    The board is searched in place with make()/unmake(), so no position is
+    copied during the search. Leaves are scored with BitBoard.evaluate.
+    Plies that hand the opponent a winning move are pruned, and at the
+    frontier they are scored as losses instead of being evaluated.
+
+    _depth (int): Number of plies searched ahead.
+    _table (TranspositionTable): Optional cache of searched positions.
+    _deadline (float): perf_counter() time at which a timed search gives up.
+    nodes (int): Number of positions visited by the last search.
+    completed (int): Deepest iteration finished by the last deepen().
+    """
+
+    WIN = 100000
+
+    def __init__(self, depth=3, table=None):
+        self._depth = max(1, int(depth))
+        self._table = table
+        self._deadline = None
+        self.nodes = 0
+        self.completed = 0
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def table(self):
+        return self._table
+
+    def _ordered(self, bitboard, plies, first=None):
+        """Tries the cached best ply, then climbing moves, then builds next to the mover's own level."""
+        level = bitboard.level
+        ordered = sorted(plies, key=lambda ply: -level(ply[2]) * 8 + level(ply[3]) % 4)
+        if first in plies:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def _frontier(self, bitboard, alpha, beta):
+        """
+        Depth 1 node: the leaf score does not depend on the build unless the
+        build leaves the opponent without a move, so each (worker, move) is
+        scored once and builds are only tried when the opponent is nearly stuck.
+        A move after which every build lets the opponent climb to level 3 is
+        scored as the loss it is one ply beyond the horizon.
+        """
+        table = self._table
+        if table is not None:
+            entry = table.probe(bitboard.hash)
+            if entry and (entry[1] == EXACT or (entry[1] == LOWER and entry[2] >= beta)):
+                return entry[2]
+
+        side = bitboard.side
+        top = bitboard.planes[2]
+        moves = []
+        for w in SIDE_WORKERS[side]:
+            for to in squares(bitboard.move_mask(w)):
+                if top & BITS[to]:
+                    return self.WIN + 1
+                moves.append((w, to))
+
+        if not moves:
+            return -self.WIN - 1
+
+        # Higher and more central squares score best, so they are tried first for a cutoff
+        level = bitboard.level
+        moves.sort(key=lambda move: -3 * level(move[1]) - 2 * CENTER[move[1]])
+
+        best = -self.WIN - 1
+        threatened = climbing(bitboard, side ^ 1)
+        for w, to in moves:
+            self.nodes += 1
+            frm = bitboard.step(w, to)
+            if threatened:
+                builds = safe_builds(bitboard, w)
+            else:
+                builds = NEIGHBOURS[to] & ~(bitboard.occupied | bitboard.planes[3])
+            reach = bitboard.reach(side ^ 1)
+
+            if not builds:
+                # Every build lets the opponent step up to level 3
+                score = -self.WIN
+                bitboard.step(w, frm)
+            elif reach & (reach - 1):
+                # Two or more reachable squares, a single build cannot trap
+                score = bitboard.evaluate(side)
+                bitboard.step(w, frm)
+            else:
+                bitboard.step(w, frm)
+                score = -self.WIN
+                for build in squares(builds):
+                    ply = (w, frm, to, build)
+                    bitboard.make(ply)
+                    trapped = not bitboard.has_moves()
+                    value = self.WIN if trapped else -bitboard.evaluate()
+                    bitboard.unmake(ply)
+                    if value > score:
+                        score = value
+                    if trapped:
+                        break
+
+            if score > best:
+                best = score
+                if best >= beta:
+                    break
+
+        # Nothing below the frontier depends on alpha: the score is exact unless cut off
+        if table is not None:
+            table.store(bitboard.hash, 1, LOWER if best >= beta else EXACT, best)
+        return best
+
+    def _negamax(self, bitboard, depth, alpha, beta):
+        self.nodes += 1
+
+        if depth == 1:
+            return self._frontier(bitboard, alpha, beta)
+
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout
+
+        if depth == 0:
+            if not bitboard.has_moves():
+                return -self.WIN
+            return bitboard.evaluate()
+
+        # Probed before listing the plies, which a cutoff makes unnecessary
+        table = self._table
+        cached = None
+        if table is not None:
+            entry = table.probe(bitboard.hash)
+            if entry:
+                cached_depth, flag, value, cached = entry
+                if cached_depth >= depth and (
+                    flag == EXACT
+                    or (flag == LOWER and value >= beta)
+                    or (flag == UPPER and value <= alpha)
+                ):
+                    return value
+
+        plies = bitboard.plies()
+        if not plies:
+            return -self.WIN - depth
+
+        # Stepping up to level 3 ends the game, prefer the quickest win
+        top = bitboard.planes[2]
+        for ply in plies:
+            if top & BITS[ply[2]]:
+                return self.WIN + depth
+
+        # Only plies that stop the opponent from winning next move are worth searching
+        plies = safe_plies(bitboard, plies)
+        if not plies:
+            return -self.WIN - depth + 1
+
+        original_alpha = alpha
+        best = -self.WIN - depth - 1
+        best_ply = None
+        for ply in self._ordered(bitboard, plies, cached):
+            bitboard.make(ply)
+            score = -self._negamax(bitboard, depth - 1, -beta, -alpha)
+            bitboard.unmake(ply)
+
+            if score > best:
+                best = score
+                best_ply = ply
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if table is not None:
+            if best <= original_alpha:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(bitboard.hash, depth, flag, best, best_ply)
+
+        return best
+
+    def score(self, bitboard, depth, alpha, beta):
+        """Searches a position to `depth` plies within an (alpha, beta) window."""
+        self.nodes = 0
+        if depth <= 0:
+            return bitboard.evaluate()
+        return self._negamax(bitboard, depth, alpha, beta)
+
+    def ordered(self, bitboard):
+        """Root plies of the side to move, best candidates first."""
+        cached = None
+        if self._table is not None:
+            entry = self._table.probe(bitboard.hash)
+            cached = entry[3] if entry else None
+        return self._ordered(bitboard, bitboard.plies(), cached)
+
+    def search(self, bitboard):
+        """
+        Returns (best ply, score) for the side to move, or (None, -WIN) if it
+        cannot move. The full depth is reached by deepening without a time
+        limit: the shallow iterations cost little and fill the transposition
+        table and the root order that make the last one cut off early.
+
+        Deepening stops at the first iteration that proves a win or a loss, so
+        such a score (abs(score) >= WIN) gives the distance found at that
+        depth, which can differ from score() searching the full depth at once.
+        Any other score is the one of the full depth.
+        """
+        return self.deepen(bitboard, None, self._depth)
+
+    def _root(self, bitboard, depth, plies):
+        """
+        Searches the root plies in the given order.
+
+        Returns:
+            tuple: The best ply, its score and the (score, ply) of every root ply
+                   (scores of plies that did not raise alpha are upper bounds).
+        """
+
+        alpha, beta = -self.WIN - depth - 1, self.WIN + depth + 1
+        best_ply = None
+        scored = []
+        for ply in plies:
+            bitboard.make(ply)
+            score = -self._negamax(bitboard, depth - 1, -beta, -alpha)
+            bitboard.unmake(ply)
+            scored.append((score, ply))
+
+            if best_ply is None or score > alpha:
+                alpha = score
+                best_ply = ply
+
+        if self._table is not None:
+            self._table.store(bitboard.hash, depth, EXACT, alpha, best_ply)
+
+        return best_ply, alpha, scored
+
+    def deepen(self, bitboard, seconds, max_depth=None):
+        """
+        Iterative deepening: searches depth 1, 2, ... until `seconds` have
+        passed (None for no limit) or max_depth is done, each iteration trying
+        the root plies in the order of the previous one's scores (the
+        transposition table keeps the best plies below the root). Depth 1
+        always completes.
+
+        Returns:
+            tuple: (best ply, score) of the last completed depth, like search().
+        """
+
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        self.nodes = 1
+        self.completed = 0
+
+        plies = bitboard.plies()
+        if not plies:
+            return None, -self.WIN
+
+        top = bitboard.planes[2]
+        for ply in plies:
+            if top & BITS[ply[2]]:
+                return ply, self.WIN + self._depth
+
+        plies = safe_plies(bitboard, plies) or plies
+        cached = None
+        if self._table is not None:
+            self._table.new_search()
+            entry = self._table.probe(bitboard.hash)
+            cached = entry[3] if entry else None
+        plies = self._ordered(bitboard, plies, cached)
+
+        # The root counts as one node, like in _negamax, and each iteration adds its own
+        best, nodes = (plies[0], None), 1
+        self.nodes = 0
+        depth = 1
+        while max_depth is None or depth <= max_depth:
+            # An aborted iteration leaves its copy half searched
+            self._deadline = deadline if depth > 1 else None
+            board = bitboard if deadline is None else bitboard.copy()
+            try:
+                ply, score, scored = self._root(board, depth, plies)
+            except SearchTimeout:
+                break
+            finally:
+                nodes += self.nodes
+                self.nodes = 0
+                self._deadline = None
+
+            best = (ply, score)
+            self.completed = depth
+            scored.sort(key=lambda item: -item[0])
+            plies = [ply for _, ply in scored]
+
+            # A proven win or loss does not change with more depth
+            if abs(score) >= self.WIN or (deadline is not None and time.perf_counter() >= deadline):
+                break
+            depth += 1
+
+        self.nodes = nodes
+        return best
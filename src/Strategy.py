@@ -1,7 +1,23 @@
 from cli import s_cli
 from exceptions import WorkerError, MoveError, Loss
 from DirectionUtils import DirectionUtils
+from Bitboard import SYMBOLS, POSITIONS
+from Search import AlphaBeta
+from Book import OpeningBook
+from Transposition import TranspositionTable
+from Mcts import MonteCarlo
+from Parallel import ParallelAlphaBeta, ParallelMonteCarlo, can_start_pool
+from profiler import s_profiler
+from threats import safe_plies
+import os
 import random
+import time
+
+
+def _shuffled(items):
+    # BitBoard.iter_plies hands over fresh lists, so they are shuffled in place
+    random.shuffle(items)
+    return items
 
 
 class Strategy:
@@ -10,6 +26,11 @@ class Strategy:
 
     Attributes:
         _p (dict): Dictionary storing possible moves and builds for each worker.
+            Strategies with _LAZY set only check that a move exists and leave
+            it empty (see Board.moves for enumerating moves lazily).
+        _workers (list): The workers given to the last update_possibilities.
+        _type (str): The player type, e.g. "minimax".
+        _color (str): "white" or "blue", the side the strategy plays.
         _selected_worker (Worker): The currently selected worker for the strategy.
         _selected_move (tuple): The selected move coordinates.
         _move_direction (str): The direction of the selected move.
@@ -17,10 +38,14 @@ class Strategy:
         _build_direction (str): The direction of the selected build.
     """
 
-    def __init__(self, board, workers, player_type):
+    _LAZY = False
+
+    def __init__(self, board, workers, player_type, **options):
         self._board = board
         self._p = {}
-        self._color = player_type
+        self._workers = workers
+        self._type = player_type
+        self._color = ("white", "blue")[SYMBOLS.index(workers[0].symbol) // 2]
         self._w_symbols = [worker.symbol for worker in workers]
 
         self._selected_worker = None
@@ -47,42 +72,19 @@ class Strategy:
     def update_possibilities(self, workers):
         """Updates possible moves and builds for each worker on the board."""
 
+        self._workers = workers
         self._p.clear()
 
-        for worker in workers:
-            pos = worker.position
-            level = self._board.get_cell(pos).level
-            for move in self._board.get_ring(pos):
-                cell = self._board.get_cell(move)
-
-                if cell.level > 3:
-                    continue
-
-                if cell.level > level + 1:
-                    continue
-
-                if self._board.occupied(move):
-                    continue
-
-                for build in self._board.get_ring(move):
-                    cell = self._board.get_cell(build)
-
-                    if self._board.occupied(build) and build != pos:
-                        continue
-
-                    if cell.level > 3:
-                        continue
-
-                    if worker not in self._p:
-                        self._p[worker] = {}
-
-                    if move not in self._p[worker]:
-                        self._p[worker][move] = set()
-
-                    self._p[worker][move].add(build)
-
-        if len(self._p) == 0:
+        if not self._board.has_any_move(workers):
             raise Loss
+        if self._LAZY:
+            return
+
+        # Only the workers whose neighbourhood changed are listed again
+        for worker in workers:
+            moves = self._board.possibilities(worker)
+            if moves:
+                self._p[worker] = moves
 
     def _execute_steps(self):
         self._move(self._selected_move, self._selected_worker)
@@ -97,10 +99,22 @@ class Strategy:
         self._get_move()
         self._get_build()
 
+        return self.commit()
+
+    def commit(self):
+        """Plays the selected worker, move and build, returns them as in execute()."""
         self._execute_steps()
 
         return self._selected_worker.symbol, self._move_direction, self._build_direction
 
+    def report(self):
+        """Returns the strategy's counters (empty unless it searches)."""
+        return {}
+
+    def close(self):
+        """Releases what the strategy holds once its game is over."""
+        pass
+
     def _move(self, position, worker):
         worker.position = position
 
@@ -116,68 +130,80 @@ class HumanStrategy(Strategy):
         execute(self):
             Executes the entire human strategy, including worker selection, move selection, and building.
             Returns a tuple containing worker symbol, move direction, and build direction.
+        choose_worker(self, symbol), choose_move(self, direction), choose_build(self, direction):
+            Select one answer after another, raising WorkerError or MoveError when
+            it cannot be played. The prompts of s_cli (or of a server session) feed them.
     """
 
-    def _get_worker(self):
-        while True:
+    def choose_worker(self, symbol):
+        if symbol not in self._w_symbols:
+            raise WorkerError("That is not your worker")
 
-            try:
-                symbol = s_cli.select_worker()
+        worker = next((w for w in self._p if w.symbol == symbol), None)
+        if worker is None:
+            raise WorkerError("That worker cannot move")
+
+        self._selected_worker = worker
+
+    def choose_move(self, move_direction):
+        move = DirectionUtils.move_result(self._selected_worker.position, move_direction)
+
+        if move not in self._p[self._selected_worker]:
+            raise MoveError("move", move_direction)
+
+        self._selected_move = move
+        self._move_direction = move_direction
 
-                if symbol not in self._w_symbols:
-                    raise WorkerError("That is not your worker")
+    def choose_build(self, build_direction):
+        build = DirectionUtils.move_result(self._selected_move, build_direction)
 
-                for w in self._p.keys():
-                    if w.symbol == symbol:
-                        worker = w
+        if build not in self._p[self._selected_worker][self._selected_move]:
+            raise MoveError("build", build_direction)
 
-                if worker not in self._p:
-                    raise WorkerError("That worker cannot move")
+        self._selected_build = build
+        self._build_direction = build_direction
 
+    def _get_worker(self):
+        while True:
+            try:
+                self.choose_worker(s_cli.select_worker())
             except WorkerError as e:
                 s_cli.print_worker_error(e.mes)
             else:
-                self._selected_worker = worker
                 break
 
     def _get_move(self):
         while True:
             try:
-                move_direction = s_cli.get_move()
-                move = DirectionUtils.move_result(
-                    self._selected_worker.position, move_direction
-                )
-
-                if move not in self._p[self._selected_worker]:
-                    raise MoveError("move", move_direction)
-
+                self.choose_move(s_cli.get_move())
             except MoveError as e:
                 s_cli.print_invalid_move(e)
             else:
-                self._selected_move = move
-                self._move_direction = move_direction
                 break
 
     def _get_build(self):
         while True:
             try:
-                build_direction = s_cli.get_build()
-                build = DirectionUtils.move_result(self._selected_move, build_direction)
-
-                if build not in self._p[self._selected_worker][self._selected_move]:
-                    raise MoveError("build", build_direction)
-
+                self.choose_build(s_cli.get_build())
             except MoveError as e:
                 s_cli.print_invalid_move(e)
             else:
-                self._selected_build = build
-                self._build_direction = build_direction
                 break
 
 
 class HeuristicStrategy(Strategy):
     """
     Subclass of Strategy representing a heuristic-based strategy.
+    Moves and builds that let the opponent step up to level 3 next turn are
+    left out of the possibilities, unless nothing else is left.
+
+    Attributes:
+        _weights (tuple): Height, center and distance weights of a move's score,
+            (3, 2, 1) unless the `weights` option gives others as "h/c/d".
+
+    The `jobs` option is accepted like for the search strategies, but the
+    candidates are always scored in process: a whole move is scored in
+    about 0.1ms, while a round trip through a process pool takes about 0.6ms.
 
     Methods:
         execute(self):
@@ -185,31 +211,57 @@ class HeuristicStrategy(Strategy):
             Returns a tuple containing worker symbol, move direction, and build direction.
     """
 
+    def __init__(self, board, workers, player_type, weights=(3, 2, 1), jobs=1, **options):
+        super().__init__(board, workers, player_type, **options)
+        if isinstance(weights, str):
+            weights = tuple(float(weight) for weight in weights.split("/"))
+        self._weights = weights
+
+    def update_possibilities(self, workers):
+        super().update_possibilities(workers)
+
+        bitboard = self._board.bitboard()
+        bitboard.side = SYMBOLS.index(workers[0].symbol) // 2
+        safe = safe_plies(bitboard)
+        if not safe or len(safe) == sum(
+            len(builds) for moves in self._p.values() for builds in moves.values()
+        ):
+            return
+
+        by_symbol = {worker.symbol: worker for worker in self._p}
+        self._p.clear()
+        for w, _, move, build in safe:
+            moves = self._p.setdefault(by_symbol[SYMBOLS[w]], {})
+            moves.setdefault(POSITIONS[move], set()).add(POSITIONS[build])
+
     def _get_move(self):
-        best_score = -10
+        best_score = float("-inf")
         best_move = None
-        for worker in self._p:
-            for move in self._p[worker]:
-                (height, center, distance) = self._board.check_score(
-                    worker.symbol,
-                    self._color,
-                    move,
-                )
+        w_height, w_center, w_distance = self._weights
+
+        # Score every candidate move in one batch, then pick in the same order
+        candidates = [(worker, move) for worker in self._p for move in self._p[worker]]
+        # The distance score has always been asked for the player type, not
+        # the side, which scores it for blue's workers; kept as the AI plays
+        scores = self._board.check_scores(
+            [(worker.symbol, move) for worker, move in candidates], self._type
+        )
 
-                move_score = 3 * height + 2 * center + distance
+        for (worker, move), (height, center, distance) in zip(candidates, scores):
+            move_score = w_height * height + w_center * center + w_distance * distance
 
-                if self._board.get_cell(move).level == 3:
-                    move_score = 10000
+            if self._board.get_cell(move).level == 3:
+                move_score = 10000
 
-                if move_score > best_score:
+            if move_score > best_score:
+                best_move = move
+                best_score = move_score
+                self._selected_worker = worker
+            elif move_score == best_score:
+                if bool(random.getrandbits(1)):
                     best_move = move
                     best_score = move_score
                     self._selected_worker = worker
-                elif move_score == best_score:
-                    if bool(random.getrandbits(1)):
-                        best_move = move
-                        best_score = move_score
-                        self._selected_worker = worker
 
         self._selected_move = best_move
         self._move_direction = DirectionUtils.calculate_direction(
@@ -219,7 +271,12 @@ class HeuristicStrategy(Strategy):
 
 class RandomStrategy(Strategy):
     """
-    Subclass of Strategy representing a random strategy.
+    Subclass of Strategy representing a random strategy. The worker, move and
+    build are each drawn uniformly by taking the first triple of Board.moves
+    in shuffled order, so the possibilities are never listed.
+
+    Attributes:
+        _choice (tuple): The (worker, move, build) drawn by update_possibilities.
 
     Methods:
         execute(self):
@@ -227,14 +284,235 @@ class RandomStrategy(Strategy):
             Returns a tuple containing worker symbol, move direction, and build direction.
     """
 
+    def update_possibilities(self, workers):
+        # Having no first triple is the loss check
+        self._workers = workers
+        self._choice = next(self._board.moves(workers, _shuffled), None)
+        if self._choice is None:
+            raise Loss
+
     def _get_worker(self):
-        self._selected_worker = random.choice(list(self._p.keys()))
+        worker, move, build = self._choice
+
+        self._selected_worker = worker
+        self._selected_move = move
+        self._selected_build = build
 
     def _get_move(self):
-        x = self._p[self._selected_worker]
+        self._move_direction = DirectionUtils.calculate_direction(
+            original=self._selected_worker.position, new=self._selected_move
+        )
+
+    def _get_build(self):
+        self._build_direction = DirectionUtils.calculate_direction(
+            original=self._selected_move, new=self._selected_build
+        )
+
+
+class SearchStrategy(Strategy):
+    """
+    Subclass of Strategy for the searching players, which choose the worker,
+    move and build together as one bitboard ply. With the `book` option
+    (a file written by Book.py) the opening book is consulted first.
+
+    Time control: `move_time` caps the seconds of one move and `game_time`
+    is the player's clock for the whole game, of which each move may spend
+    1/MOVES_TO_GO of what is left.
+
+    Attributes:
+        _move_time (float): Seconds per move, None for no per-move limit.
+        _clock (float): Seconds left on the game clock, None without one.
+
+    Methods:
+        _search_ply(self, bitboard):
+            Returns the (worker, from, to, build) ply to play on the bitboard.
+        _budget(self):
+            Returns the seconds the next search may take, None if untimed.
+        searched(self, ply, seconds, counters):
+            Selects a ply searched elsewhere, as if the strategy had found it.
+        report(self):
+            Returns the search counters accumulated over the game.
+    """
+
+    MOVES_TO_GO = 20
+    _LAZY = True
+
+    def __init__(
+        self,
+        board,
+        workers,
+        player_type,
+        book=None,
+        move_time=None,
+        game_time=None,
+        **options,
+    ):
+        super().__init__(board, workers, player_type, **options)
+        self._stats = {"searches": 0, "seconds": 0.0}
+        self._book = OpeningBook(book) if book else None
+        self._move_time = move_time
+        self._clock = game_time
+
+    def _search_ply(self, bitboard):
+        pass
+
+    def _budget(self):
+        budget = self._move_time
+        if self._clock is not None:
+            share = max(self._clock, 0) / self.MOVES_TO_GO
+            budget = share if budget is None else min(budget, share)
+        return budget
+
+    def report(self):
+        return dict(self._stats)
+
+    def close(self):
+        # Parallel searches keep a process pool from one move to the next
+        if isinstance(self._search, (ParallelAlphaBeta, ParallelMonteCarlo)):
+            self._search.close()
+
+    def _count(self, **counters):
+        for name, value in counters.items():
+            self._stats[name] = self._stats.get(name, 0) + value
+            # Per side first, so both players of a mirror match are told apart
+            s_profiler.count(f"{self._color}.{self._type}.{name}", value)
+
+    def _get_worker(self):
+        bitboard = self._board.bitboard()
+        bitboard.side = SYMBOLS.index(self._w_symbols[0]) // 2
+
+        start = time.perf_counter()
+        ply = None
+        if self._book is not None:
+            ply = self._book.probe(bitboard)
+            self._count(book_probes=1, book_hits=ply is not None)
+
+        if ply is None:
+            searched = time.perf_counter()
+            ply = self._search_ply(bitboard)
+            self._count(searches=1, seconds=time.perf_counter() - searched)
+
+        if self._clock is not None:
+            self._clock -= time.perf_counter() - start
+
+        self._select(ply)
 
-        self._selected_move = random.choice(list(x.keys()))
+    def searched(self, ply, seconds, counters):
+        """
+        Selects a ply searched outside the strategy, e.g. by the process pool
+        of server.py, and accounts for it like _get_worker: `seconds` comes
+        off the clock and the search `counters` are added to the report.
+        """
+
+        self._count(**{**counters, "searches": 1, "seconds": seconds})
+        if self._clock is not None:
+            self._clock -= seconds
+
+        self._select(ply)
+        self._get_move()
+        self._get_build()
+
+    def _select(self, ply):
+        w, _, move, build = ply
 
+        for worker in self._workers:
+            if worker.symbol == SYMBOLS[w]:
+                self._selected_worker = worker
+        self._selected_move = POSITIONS[move]
+        self._selected_build = POSITIONS[build]
+
+    def _get_move(self):
         self._move_direction = DirectionUtils.calculate_direction(
             original=self._selected_worker.position, new=self._selected_move
         )
+
+    def _get_build(self):
+        self._build_direction = DirectionUtils.calculate_direction(
+            original=self._selected_move, new=self._selected_build
+        )
+
+
+class MinimaxStrategy(SearchStrategy):
+    """
+    Subclass of SearchStrategy searching whole (worker, move, build) plies with alpha-beta pruning.
+
+    Attributes:
+        _search (AlphaBeta): The searcher, configured with the `depth` option and
+            a transposition table of `tt_mb` megabytes (0 disables it). With
+            `jobs` above 1 (0 for every core) the root plies are split across
+            a process pool by ParallelAlphaBeta instead, unless the strategy
+            runs in a pool worker itself.
+        _max_depth (int): Under time control the search deepens one ply at a
+            time until the budget runs out, up to `depth` when it is given.
+            Timed searches always run in process, whatever `jobs` is.
+    """
+
+    def __init__(
+        self, board, workers, player_type, depth=None, tt_mb=16, jobs=1, **options
+    ):
+        super().__init__(board, workers, player_type, **options)
+        self._max_depth = depth
+        depth = depth or 3
+        jobs = (jobs or os.cpu_count() or 1) if can_start_pool() else 1
+        if jobs > 1 and self._budget() is None:
+            self._search = ParallelAlphaBeta(depth, jobs, tt_mb)
+        else:
+            table = TranspositionTable(tt_mb) if tt_mb else None
+            self._search = AlphaBeta(depth, table)
+
+    @property
+    def table(self):
+        return self._search.table
+
+    def _search_ply(self, bitboard):
+        table = self._search.table
+        if table is not None:
+            probes, hits = table.probes, table.hits
+
+        budget = self._budget()
+        if budget is None:
+            ply, _ = self._search.search(bitboard)
+        else:
+            ply, _ = self._search.deepen(bitboard, budget, self._max_depth)
+            self._count(depth=self._search.completed)
+
+        self._count(nodes=self._search.nodes)
+        if table is not None:
+            self._count(tt_probes=table.probes - probes, tt_hits=table.hits - hits)
+        return ply
+
+
+class MctsStrategy(SearchStrategy):
+    """
+    Subclass of SearchStrategy running UCT Monte Carlo tree search.
+
+    Attributes:
+        _search (MonteCarlo): The searcher, spending `move_time` seconds per move
+            (less when the `game_time` clock runs low) with "random" or
+            "heuristic" playouts (the `rollout` option). With
+            `jobs` above 1 (0 for every core) independent trees are grown in a
+            process pool by ParallelMonteCarlo, unless the strategy runs in a
+            pool worker itself.
+    """
+
+    def __init__(
+        self,
+        board,
+        workers,
+        player_type,
+        move_time=1.0,
+        rollout="random",
+        jobs=1,
+        **options,
+    ):
+        super().__init__(board, workers, player_type, move_time=move_time, **options)
+        jobs = (jobs or os.cpu_count() or 1) if can_start_pool() else 1
+        if jobs > 1:
+            self._search = ParallelMonteCarlo(move_time, rollout, jobs)
+        else:
+            self._search = MonteCarlo(move_time, rollout)
+
+    def _search_ply(self, bitboard):
+        ply = self._search.search(bitboard, self._budget())
+        self._count(playouts=self._search.playouts)
+        return ply
@@ -0,0 +1,123 @@
+from array import array
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def pack_ply(ply):
+    """Packs a (worker, from, to, build) ply into 17 bits."""
+    w, frm, to, build = ply
+    return 1 << 17 | w | frm << 2 | to << 7 | build << 12
+
+
+def unpack_ply(packed):
+    if not packed:
+        return None
+    return (packed & 3, packed >> 2 & 31, packed >> 7 & 31, packed >> 12 & 31)
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table keyed by BitBoard Zobrist hashes.
+
+    Entries live in parallel typed arrays sized from a megabyte budget and
+    grouped in buckets of two slots: the first keeps the deepest entry of the
+    current search, the second is always replaced.
+
+    _mask (int): Bucket index mask (the bucket count is a power of two).
+    _generation (int): Search counter, entries of older searches are replaceable.
+    probes, hits, stores (int): Usage counters for reporting.
+    """
+
+    # key (Q) + value (i) + ply (I) + depth (b) + flag (B) + generation (B)
+    ENTRY_BYTES = 8 + 4 + 4 + 1 + 1 + 1
+
+    def __init__(self, megabytes=16):
+        entries = max(2, int(megabytes * (1 << 20)) // self.ENTRY_BYTES)
+        buckets = 1 << ((entries // 2).bit_length() - 1)
+        size = 2 * buckets
+
+        self._mask = buckets - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._values = array("i", bytes(4 * size))
+        self._plies = array("I", bytes(4 * size))
+        self._depths = array("b", bytes(size))
+        self._flags = array("B", bytes(size))
+        self._generations = array("B", bytes(size))
+        self._generation = 1
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def new_search(self):
+        """Marks the entries stored so far as replaceable by the next search."""
+        self._generation = self._generation % 255 + 1
+
+    def clear(self):
+        size = len(self._keys)
+        self._keys = array("Q", bytes(8 * size))
+        self._generations = array("B", bytes(size))
+        self.probes = self.hits = self.stores = 0
+
+    def probe(self, key):
+        """Returns (depth, flag, value, ply) stored for a key, or None."""
+        self.probes += 1
+        slot = (key & self._mask) << 1
+
+        for i in (slot, slot + 1):
+            if self._generations[i] and self._keys[i] == key:
+                self.hits += 1
+                return (
+                    self._depths[i],
+                    self._flags[i],
+                    self._values[i],
+                    unpack_ply(self._plies[i]),
+                )
+
+        return None
+
+    def store(self, key, depth, flag, value, ply=None):
+        self.stores += 1
+        slot = (key & self._mask) << 1
+
+        # Depth-preferred slot unless it holds a deeper entry of this search
+        if self._generations[slot] != self._generation or depth >= self._depths[slot]:
+            i = slot
+        else:
+            i = slot + 1
+
+        self._keys[i] = key
+        self._values[i] = value
+        self._plies[i] = pack_ply(ply) if ply else 0
+        self._depths[i] = depth
+        self._flags[i] = flag
+        self._generations[i] = self._generation
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def memory_bytes(self):
+        return len(self._keys) * self.ENTRY_BYTES
+
+    def used(self):
+        """Fraction of the slots written by the current search."""
+        current = self._generations.count(self._generation)
+        return current / len(self._keys)
+
+    def report(self):
+        """Usage statistics for sizing the table on a given machine."""
+        return {
+            "entries": len(self._keys),
+            "memory_mb": round(self.memory_bytes() / (1 << 20), 2),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": round(self.hit_rate(), 4),
+            "stores": self.stores,
+            "used": round(self.used(), 4),
+        }
+
+    def __repr__(self):
+        return ", ".join(f"{name}: {value}" for name, value in self.report().items())
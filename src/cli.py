@@ -5,13 +5,19 @@ from exceptions import DirectionError, WorkerError
 
 
 class SantoriniCLI:
-    """Client Interaction Helper Functions."""
+    """Client Interaction Helper Functions. The prompts are shared with server.py."""
+
+    WORKER_PROMPT = "Select a worker to move\n"
+    MOVE_PROMPT = "Select a direction to move (n, ne, e, se, s, sw, w, nw)\n"
+    BUILD_PROMPT = "Select a direction to build (n, ne, e, se, s, sw, w, nw)\n"
+    MEMENTO_PROMPT = "undo, redo, or next\n"
+    RESTART_PROMPT = "Play again?\n"
 
     def select_worker(self):
         """Prompts the user to select a worker and returns the input."""
         while True:
             try:
-                worker = input("Select a worker to move\n")
+                worker = input(self.WORKER_PROMPT)
                 valid_workers = ["A", "B", "Y", "Z"]
                 if worker not in valid_workers:
                     raise WorkerError("Not a valid worker")
@@ -38,16 +44,13 @@ class SantoriniCLI:
                 return direction
 
     def get_memento(self):
-        prompt = "undo, redo, or next\n"
-        return input(prompt)
+        return input(self.MEMENTO_PROMPT)
 
     def get_move(self):
-        prompt = "Select a direction to move (n, ne, e, se, s, sw, w, nw)\n"
-        return self.get_direction(prompt)
+        return self.get_direction(self.MOVE_PROMPT)
 
     def get_build(self):
-        prompt = "Select a direction to build (n, ne, e, se, s, sw, w, nw)\n"
-        return self.get_direction(prompt)
+        return self.get_direction(self.BUILD_PROMPT)
 
     def print_board(self, board):
         print(board)
@@ -68,7 +71,7 @@ class SantoriniCLI:
         """Prints the end of the game, including the winner, and prompts for a restart by passing the function."""
 
         print(f"{winner} has won")
-        if input("Play again?\n").lower() != "yes":
+        if input(self.RESTART_PROMPT).lower() != "yes":
             exit(0)
         else:
             restart()
@@ -77,24 +80,58 @@ class SantoriniCLI:
 s_cli = SantoriniCLI()
 
 
-def parse_args():
+PLAYER_TYPES = ["human", "heuristic", "random", "minimax", "mcts"]
+
+
+def parse_options(args):
+    """
+    Splits `--name=value` options (e.g. --depth=3) from the positional arguments.
+
+    Returns:
+        tuple: The positional arguments and a dictionary of options with numeric values converted.
+    """
+
+    positional = []
+    options = {}
+
+    for arg in args:
+        if not arg.startswith("--") or "=" not in arg:
+            positional.append(arg)
+            continue
+
+        name, value = arg[2:].split("=", 1)
+        for convert in (int, float):
+            try:
+                value = convert(value)
+            except ValueError:
+                continue
+            break
+        options[name.replace("-", "_")] = value
+
+    return positional, options
+
+
+def parse_args(argv=None):
     """
-    Parses command line arguments for configuring the Santorini game.
+    Parses command line arguments (sys.argv by default) for configuring the Santorini game.
 
     Returns:
         dict: A dictionary containing configuration options for white player type, blue player type,
-              undo/redo enablement, and score display enablement.
+              undo/redo enablement, score display enablement and the strategy options
+              (e.g. --depth=N, --move-time=SECONDS, --game-time=SECONDS for a
+              whole-game clock; timed minimax players deepen iteratively) and
+              game options such as --position=NOTATION to start from a position.
     """
 
-    args = sys.argv[1:]
+    args, options = parse_options(sys.argv[1:] if argv is None else argv)
 
     white_player_type = (
-        args[0] if args and args[0] in ["human", "heuristic", "random"] else "human"
+        args[0] if args and args[0] in PLAYER_TYPES else "human"
     )
 
     blue_player_type = (
         args[1]
-        if len(args) > 1 and args[1] in ["human", "heuristic", "random"]
+        if len(args) > 1 and args[1] in PLAYER_TYPES
         else "human"
     )
 
@@ -109,4 +146,5 @@ def parse_args():
         "blue": blue_player_type,
         "undo_redo": undo_redo_enabled,
         "score_display": score_display_enabled,
+        "options": options,
     }
@@ -36,3 +36,11 @@ class Loss(Exception):
 
 class Win(Exception):
     pass
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SessionClosed(Exception):
+    pass
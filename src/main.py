@@ -6,17 +6,29 @@ from cli import s_cli, parse_args
 from Player import PlayerFactory
 from exceptions import Loss, Win
 from Memento import Originator, Caretaker, GameState
+from DirectionUtils import DirectionUtils
+from profiler import s_profiler
+from Record import GameRecord, RecordWriter, encode_ply
+from Archive import Archive
+from notation import parse, from_state
 
 
 class SantoriniGame:
     """Class representing the Santorini game."""
 
-    def __init__(self, white, blue, undo_redo, score_display):
+    def __init__(self, white, blue, undo_redo, score_display, options=None):
         self._board = Board()
-        self._args = (white, blue, undo_redo, score_display)
+        self._options = options or {}
+        self._args = (white, blue, undo_redo, score_display, self._options)
 
-        self._white = PlayerFactory.get_factory("white", white, self._board)
-        self._blue = PlayerFactory.get_factory("blue", blue, self._board)
+        # options["players"] may hold per-color strategy options overriding the shared ones
+        players = self._options.get("players", {})
+        self._white = PlayerFactory.get_factory(
+            "white", white, self._board, **{**self._options, **players.get("white", {})}
+        )
+        self._blue = PlayerFactory.get_factory(
+            "blue", blue, self._board, **{**self._options, **players.get("blue", {})}
+        )
 
         self._undo_redo = undo_redo
         self._score_display = score_display
@@ -24,96 +36,160 @@ class SantoriniGame:
         self._turn = 1
         self._current = self._white
 
-        self._originator = Originator(self._board.state)
-        self._caretaker = Caretaker(self._originator)
-
-        # Save default positions
-        self._originator.restore(self._generate_state())
-        self._caretaker.backup()
+        # --position=<notation>: start from a position written by notation.py
+        if self._options.get("position"):
+            # Records and archives hold plies replayed from the initial position only
+            if self._options.get("record") or self._options.get("archive"):
+                raise ValueError("--position cannot be combined with --record or --archive")
+            levels, positions, self._turn = parse(self._options["position"])
+            self._board.grid.levels[:] = levels
+            for worker, position in zip(self._white.workers + self._blue.workers, positions):
+                worker.position = position
+            self._current = self._white if self._turn % 2 else self._blue
+
+        # Live state shared by the board, the players and the originator
+        self._state = GameState(
+            self._turn, self._white.workers, self._blue.workers, self._board.grid
+        )
+        self._board._update_state(self._state)
 
-    def print_turn(self):
-        s_cli.print_board(self._board)
-        s_cli.print_turn(
-            self._turn,
-            str(self._current),
-            self._current.worker_string(),
+        # Undo/Redo history of per-turn deltas (with optional keyframes)
+        self._originator = Originator(self._state)
+        self._caretaker = Caretaker(
+            self._originator, self._options.get("keyframes", 0)
         )
 
-    def won(self):
+        # --archive=file [--game=G]: redo/undo step through an archived game
+        if self._options.get("archive"):
+            self._archive = Archive(self._options["archive"])
+            self._caretaker = Caretaker.browse(
+                self._originator, self._archive[self._options.get("game", 0)]
+            )
+
+        # Turns played, one byte each (--record=file appends finished games to it)
+        self._plies = bytearray()
+
+        # Opt-in instrumentation (--profile=1, or --profile=file.json to export)
+        if self._options.get("profile"):
+            s_profiler.enable()
+            s_profiler.reset()
+
+    def print_turn(self):
+        with s_profiler.phase("print_board"):
+            s_cli.print_board(self._board)
+            s_cli.print_turn(
+                self._turn,
+                str(self._current),
+                self._current.worker_string(),
+            )
+
+    def won(self, winner=None):
         self._next()
+        self.close()
+        self.print_profile()
+        self.save_record(winner or self._current.color)
         s_cli.print_end(self.restart, self._current.color)
 
-    def copy_turn(self):
-        return copy.copy(self._turn)
+    def close(self):
+        """Stops the players' search processes once the game is over."""
+        self._white.close()
+        self._blue.close()
 
-    def _generate_state(self):
-        # Generate DeepCopy of the GameState
-        turn_copy = copy.copy(self._turn)
-        white_workers = self._white.worker_deep_copy()
-        blue_workers = self._blue.worker_deep_copy()
-        grid = copy.deepcopy(self._board.grid)
+    def record(self, winner=None):
+        """The turns played so far as a GameRecord."""
+        return GameRecord.from_winner(self._plies, winner)
 
-        game_state = GameState(turn_copy, white_workers, blue_workers, grid)
-        memento = self._originator.generate(game_state)
+    def save_record(self, winner):
+        """Appends the finished game to the --record file, if one was given."""
+        path = self._options.get("record")
+        if isinstance(path, str):
+            with RecordWriter(path) as writer:
+                writer.write(self.record(winner))
 
-        return memento
+    def print_profile(self):
+        """Prints the instrumentation summary and exports it when a file was given."""
+        profile = self._options.get("profile")
+        if not profile:
+            return
+
+        print(s_profiler.summary())
+        if isinstance(profile, str):
+            s_profiler.export(profile)
+
+    def notation(self):
+        """The current position in the notation of notation.py, e.g. to replay it with --position."""
+        return from_state(self._state)
+
+    def copy_turn(self):
+        return copy.copy(self._turn)
 
     def _restore_state(self):
-        state = self._originator.save()
-        self._turn = state.get_turn()
+        # The originator updated the live state in place, only the turn is read back
+        self._turn = self._state.turn
         self._current = self._blue if (self._turn) % 2 == 0 else self._white
-        self._white.workers = state.get_white_workers()
-        self._blue.workers = state.get_blue_workers()
-        self._board.grid = state.get_grid()
+
+        # Undone turns leave the record, redone ones come back
+        if self._options.get("record"):
+            self._plies = bytearray(
+                encode_ply(
+                    delta.get_symbol(),
+                    DirectionUtils.calculate_direction(delta.get_origin(), delta.get_target()),
+                    DirectionUtils.calculate_direction(delta.get_target(), delta.get_build()),
+                )
+                for delta in self._caretaker.played()
+            )
 
     def memento_display(self):
         command = s_cli.get_memento()
 
         if command == "undo":
             # Undo the current state and move to the next
-            self._caretaker.undo()
-            self._restore_state()
+            with s_profiler.phase("undo_redo"):
+                self._caretaker.undo()
+                self._restore_state()
             return True
         elif command == "redo":
             # Similarly
-            self._caretaker.redo()
-            self._restore_state()
+            with s_profiler.phase("undo_redo"):
+                self._caretaker.redo()
+                self._restore_state()
+            return True
+        elif command == "stats" and s_profiler.enabled:
+            # Instrumentation summary on demand
+            print(s_profiler.summary())
             return True
         elif command == "next":
-            # Update the Caretaker Mementos
-            self._originator.restore(self._generate_state())
-            self._caretaker.backup()
+            # The turn is recorded by the Caretaker once it is played
             return False
         else:
             raise ValueError
 
     def restart(self):
-        (white, blue, undo_redo, score_display) = self._args
-        self.__init__(white, blue, undo_redo, score_display)
+        (white, blue, undo_redo, score_display, options) = self._args
+        self.__init__(white, blue, undo_redo, score_display, options)
         self.run()
 
     def run(self):
         """Infinite turn loop."""
         while True:
-            # Initially pass to the board (printing) last updated state
-            self._board._update_state(self._generate_state())
-
             self.print_turn()
 
             # Scores Before the Move is Executed
             if self._score_display == "on":
                 print(",", end="")
-                positions = [worker.position for worker in self.current.workers]
-                score = self._board.score(positions, self._current.color)
+                with s_profiler.phase("score"):
+                    positions = [worker.position for worker in self.current.workers]
+                    score = self._board.score(positions, self._current.color)
                 s_cli.print_score(score[0], score[1], score[2])
             print(end="\n")
 
             try:
                 # Update possibilities & check if lost
-                self._current.update_possibilities()
+                with s_profiler.phase("update_possibilities"):
+                    self._current.update_possibilities()
             except Loss:
                 self._next()
-                self.won()
+                self.won(self._current.color)
                 break
 
             # Display Memento
@@ -126,7 +202,8 @@ class SantoriniGame:
 
                 # Since we first want to check if lost, then memento updates
                 # So there should be generated new possibilities on the new state
-                self._current.update_possibilities()
+                with s_profiler.phase("update_possibilities"):
+                    self._current.update_possibilities()
 
             try:
                 # Ask for the direction strategies
@@ -142,9 +219,9 @@ class SantoriniGame:
 
             # Scores After the Move is Executed
             if self._score_display == "on":
-                self._board._update_state(self._generate_state())
-                positions = [worker.position for worker in self.current.workers]
-                score = self._board.score(positions, self._current.color)
+                with s_profiler.phase("score"):
+                    positions = [worker.position for worker in self.current.workers]
+                    score = self._board.score(positions, self._current.color)
                 s_cli.print_score(score[0], score[1], score[2])
 
             print(end="\n")
@@ -152,11 +229,33 @@ class SantoriniGame:
 
     def _next(self):
         self._turn += 1
+        self._state.turn = self._turn
         self._current = self._blue if self._turn % 2 == 0 else self._white
 
     # Memento Pattern
-    def _execute_command(self):
-        return self._current.execute()
+    def _execute_command(self, execute=None):
+        # `execute` plays a turn chosen elsewhere (server.py), by default the player picks it
+        origins = {worker.symbol: worker.position for worker in self._current.workers}
+        with s_profiler.phase("execute"):
+            symbol, move, build = (execute or self._current.execute)()
+
+        if self._options.get("record"):
+            self._plies.append(encode_ply(symbol, move, build))
+
+        if self._undo_redo == "on":
+            with s_profiler.phase("record"):
+                self._record(origins[symbol], symbol, move, build)
+
+        return symbol, move, build
+
+    def _record(self, origin, symbol, move, build):
+        """Stores the played turn as a delta memento in the Caretaker."""
+        target = DirectionUtils.move_result(origin, move)
+        self._caretaker.backup(
+            self._originator.record(
+                symbol, origin, target, DirectionUtils.move_result(target, build)
+            )
+        )
 
     @property
     def current(self):
@@ -0,0 +1,177 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import sys
+import time
+from Bitboard import SIZE, SYMBOLS
+from Board import Board, Grid
+from Memento import GameState
+from Player import Worker
+from Position import Position
+from cli import parse_options
+
+# Text notation of a position, in the spirit of chess FEN:
+#
+#     01201/01321/02001/00123/00041 A22B02Y41Z14 b 8
+#
+# - the 25 levels (0-4, 4 being a dome) row by row, rows separated by "/"
+# - every worker as its symbol, row and column, in the order A, B, Y, Z
+# - the side to move, "w" (white) or "b" (blue)
+# - the turn number, optional: it defaults to 1 for white and 2 for blue
+#
+# Fields are separated by a space or by "_", so that a position fits in one
+# command-line word (e.g. --position=00000/..._A31B13Y11Z33_w_1).
+
+START = "00000/00000/00000/00000/00000 A31B13Y11Z33 w 1"
+
+_DIGITS = "01234"
+_LEVELS = bytes.maketrans(_DIGITS.encode(), bytes(range(len(_DIGITS))))
+_TEXT = bytes.maketrans(bytes(range(len(_DIGITS))), _DIGITS.encode())
+_ORDER = "".join(SYMBOLS)
+
+# "rc" <-> (r, c) for every square
+_POSITIONS = {f"{row}{col}": (row, col) for row in range(SIZE) for col in range(SIZE)}
+_SQUARES = {position: text for text, position in _POSITIONS.items()}
+
+
+def parse(text):
+    """
+    Reads a position written in the notation.
+
+    Returns:
+        tuple: The 25 levels (bytes), the positions of A, B, Y and Z and the turn.
+
+    Raises:
+        ValueError: The text is not a valid position.
+    """
+
+    fields = text.replace("_", " ").split()
+    if len(fields) not in (3, 4):
+        raise ValueError(f"Not a valid position: {text}")
+    rows, workers, side = fields[0], fields[1], fields[2]
+
+    digits = rows.replace("/", "")
+    if len(rows) != 29 or rows[5::6] != "////" or len(digits) != 25 or digits.strip(_DIGITS):
+        raise ValueError(f"Not valid levels: {rows}")
+    levels = digits.encode().translate(_LEVELS)
+
+    if len(workers) != 12 or workers[0::3] != _ORDER:
+        raise ValueError(f"Not valid workers: {workers}")
+    try:
+        positions = tuple(_POSITIONS[workers[i : i + 2]] for i in (1, 4, 7, 10))
+    except KeyError:
+        raise ValueError(f"Not valid workers: {workers}") from None
+    if len(set(positions)) != 4:
+        raise ValueError(f"Not valid workers: {workers}")
+
+    if side not in ("w", "b"):
+        raise ValueError(f"Not a valid side: {side}")
+    if len(fields) == 3:
+        turn = 1 if side == "w" else 2
+    else:
+        turn = int(fields[3]) if fields[3].isdigit() else 0
+        if turn < 1 or (turn % 2 == 1) != (side == "w"):
+            raise ValueError(f"Not a valid turn for {side}: {fields[3]}")
+
+    return levels, positions, turn
+
+
+def dump(levels, workers, turn):
+    """Writes 25 levels, the positions of A, B, Y and Z and a turn in the notation."""
+
+    digits = bytes(levels).translate(_TEXT).decode()
+    a, b, y, z = workers
+    return (
+        f"{digits[0:5]}/{digits[5:10]}/{digits[10:15]}/{digits[15:20]}/{digits[20:25]} "
+        f"A{_SQUARES[a]}B{_SQUARES[b]}Y{_SQUARES[y]}Z{_SQUARES[z]} "
+        f"{'w' if turn % 2 else 'b'} {turn}"
+    )
+
+
+def to_state(text):
+    """A new GameState, on new workers and a new grid, of a position in the notation."""
+    levels, positions, turn = parse(text)
+    workers = [Worker(None, symbol, position) for symbol, position in zip(SYMBOLS, positions)]
+    return GameState(turn, workers[:2], workers[2:], Grid(levels))
+
+
+def to_board(text):
+    """A Board playing on a new GameState of a position in the notation."""
+    board = Board()
+    board._update_state(to_state(text))
+    return board
+
+
+def to_position(text):
+    return Position(*parse(text))
+
+
+def to_bitboard(text):
+    return to_position(text).to_bitboard()
+
+
+def from_state(state):
+    workers = [state.get_worker_by_symbol(symbol).position for symbol in SYMBOLS]
+    return dump(state.grid.levels, workers, state.turn)
+
+
+def from_board(board):
+    return from_state(board.state)
+
+
+def from_position(position):
+    return dump(position.levels, position.workers, position.turn)
+
+
+def main():
+    """
+    Command line: python notation.py [position] [--games=100] [--seed=0]
+    Prints the board of a position, or plays random games and times parsing
+    and writing every position reached, alone and as GameStates and Boards
+    (the round trip itself is checked by tests/test_notation.py).
+    """
+
+    args, options = parse_options(sys.argv[1:])
+    if args:
+        text = " ".join(args)
+        board = to_board(text)
+        print(board)
+        print(from_board(board))
+        return
+
+    rng = random.Random(options.get("seed", 0))
+    positions = []
+    for _ in range(options.get("games", 100)):
+        position = to_position(START)
+        while True:
+            bitboard = position.to_bitboard()
+            plies = bitboard.plies()
+            if not plies or bitboard.has_won(bitboard.side ^ 1):
+                break
+            w, _, to, build = rng.choice(plies)
+            position = position.play(SYMBOLS[w], divmod(to, SIZE), divmod(build, SIZE))
+            positions.append(position)
+
+    texts = [from_position(position) for position in positions]
+    print(f"{len(texts)} positions")
+
+    parsed = [parse(text) for text in texts]
+    states = [to_state(text) for text in texts]
+    for name, run in (
+        ("parse", lambda: [parse(text) for text in texts]),
+        ("dump", lambda: [dump(*fields) for fields in parsed]),
+        ("to_state", lambda: [to_state(text) for text in texts]),
+        ("from_state", lambda: [from_state(state) for state in states]),
+        ("to_board", lambda: [to_board(text) for text in texts]),
+    ):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name}: {elapsed / len(texts) * 1e6:.2f}us per position, "
+            f"{len(texts) / elapsed * 60 / 1e6:.1f}M positions per minute"
+        )
+
+
+if __name__ == "__main__":
+    main()
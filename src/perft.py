@@ -0,0 +1,305 @@
+# Anton Melnychuk & Oliver Li
+
+import gc
+import random
+import statistics
+import sys
+import time
+from Bitboard import _PLY_RUNS, BITS, SIDE_WORKERS, SIZE, SYMBOLS, squares
+from Board import Board
+from Memento import GameState
+from Player import PlayerFactory
+from cli import parse_options
+from exceptions import Loss
+from notation import START, from_position, parse, to_bitboard, to_position, to_state
+
+# (name, position in the notation of notation.py, expected counts by depth)
+# Counts were taken from the original object-graph move generator.
+REFERENCE_POSITIONS = [
+    (
+        "start",
+        "00000/00000/00000/00000/00000 A31B13Y11Z33 w",
+        {1: 80, 2: 6176, 3: 426384, 4: 29096316},
+    ),
+    (
+        "midgame",
+        "01201/01321/02001/00123/00041 A22B02Y41Z14 b",
+        {1: 50, 2: 2560, 3: 96594},
+    ),
+    (
+        "climb",
+        "12300/02100/40000/32100/00012 A01B23Y00Z44 w",
+        {1: 73, 2: 1649, 3: 94642},
+    ),
+    (
+        "domed",
+        "44404/44104/40224/01341/00001 A31B32Y03Z43 w",
+        {1: 42, 2: 625, 3: 21041, 4: 295799},
+    ),
+    (
+        "cornered",
+        "44444/41404/44444/11144/04004 A11B33Y22Z00 w",
+        {1: 8, 2: 36, 3: 99, 4: 608},
+    ),
+    (
+        "trapped",
+        "04040/44044/00000/00000/00000 A00B04Y22Z33 w",
+        {1: 0, 2: 0},
+    ),
+]
+
+
+def perft(bitboard, depth):
+    """
+    Counts the (worker, move, build) sequences of `depth` plies from a position.
+    A ply stepping up to level 3 ends the game and is counted as a leaf.
+    """
+
+    if depth == 1:
+        # Bulk count: every legal move contributes one ply per legal build
+        count = 0
+        for w in SIDE_WORKERS[bitboard.side]:
+            for to in squares(bitboard.move_mask(w)):
+                count += bitboard.build_mask(w, to).bit_count()
+        return count
+
+    count = 0
+    top = bitboard.planes[2]
+    for ply in bitboard.plies():
+        if top & BITS[ply[2]]:
+            count += 1
+            continue
+        bitboard.make(ply)
+        count += perft(bitboard, depth - 1)
+        bitboard.unmake(ply)
+
+    return count
+
+
+def divide(bitboard, depth):
+    """Perft count below each root ply, for narrowing down a mismatch."""
+    counts = {}
+    top = bitboard.planes[2]
+    for ply in bitboard.plies():
+        if depth == 1 or top & BITS[ply[2]]:
+            counts[ply] = 1
+            continue
+        bitboard.make(ply)
+        counts[ply] = perft(bitboard, depth - 1)
+        bitboard.unmake(ply)
+    return counts
+
+
+def strategy_count(position):
+    """
+    Counts the plies of a position through Strategy.update_possibilities,
+    the path the game itself uses, built from real Board and Worker objects.
+    The lazy Board.moves enumeration and the Board.count_moves fast path
+    must agree with it, otherwise -1 is returned.
+    """
+
+    # Human players keep the full possibility map (random ones enumerate lazily)
+    board = Board()
+    white = PlayerFactory.get_factory("white", "human", board)
+    blue = PlayerFactory.get_factory("blue", "human", board)
+
+    levels, positions, turn = parse(position)
+    for worker, worker_position in zip(white.workers + blue.workers, positions):
+        worker.position = worker_position
+    board.grid.levels[:] = levels
+
+    board._update_state(GameState(turn, white.workers, blue.workers, board.grid))
+    player = white if turn % 2 else blue
+
+    try:
+        player.update_possibilities()
+    except Loss:
+        return 0
+
+    possibilities = player.strategy._p
+    count = sum(len(builds) for moves in possibilities.values() for builds in moves.values())
+
+    lazy = sum(1 for _ in board.moves(player.workers))
+    if lazy != count or board.count_moves(player.workers) != count:
+        return -1
+    return count
+
+
+def object_graph_plies(board, workers):
+    """
+    The move generator the game used before BitBoard: {worker: {move: set(builds)}}
+    built by walking the rings of Cells and looking every square up in the
+    GameState. Kept only as the baseline of compare().
+    """
+
+    p = {}
+    for worker in workers:
+        pos = worker.position
+        level = board.get_cell(pos).level
+        for move in board.get_ring(pos):
+            cell = board.get_cell(move)
+            if cell.level > 3 or cell.level > level + 1 or board.occupied(move):
+                continue
+
+            for build in board.get_ring(move):
+                if board.occupied(build) and build != pos:
+                    continue
+                if board.get_cell(build).level > 3:
+                    continue
+                p.setdefault(worker, {}).setdefault(move, set()).add(build)
+
+    return p
+
+
+def compare(games=20, seed=0, repeat=11):
+    """
+    Times object_graph_plies() against BitBoard.plies() on every position of
+    `games` random games over `repeat` rounds, after checking that both find
+    the same plies.
+
+    Returns:
+        tuple: The number of positions, the seconds per position of every
+               round for the object graph, for the first and for the second
+               BitBoard.plies() pass, and the number of positions where the
+               counts differ.
+    """
+
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        position = to_position(START)
+        while True:
+            bitboard = position.to_bitboard()
+            plies = bitboard.plies()
+            if not plies or bitboard.has_won(bitboard.side ^ 1):
+                break
+            positions.append(position)
+            w, _, to, build = rng.choice(plies)
+            position = position.play(SYMBOLS[w], divmod(to, SIZE), divmod(build, SIZE))
+
+    boards, bitboards = [], []
+    for position in positions:
+        board = Board()
+        state = to_state(from_position(position))
+        board._update_state(state)
+        workers = state.white_workers if position.turn % 2 else state.blue_workers
+        boards.append((board, workers))
+        bitboards.append(position.to_bitboard())
+
+    mismatches = 0
+    for (board, workers), bitboard in zip(boards, bitboards):
+        p = object_graph_plies(board, workers)
+        count = sum(len(builds) for moves in p.values() for builds in moves.values())
+        mismatches += count != len(bitboard.plies())
+
+    # Rounds alternate between the generators so a change in machine load hits both,
+    # with the garbage collector off as in timeit. BitBoard.plies() is timed on a
+    # first pass that starts without cached ply runs and on a second pass
+    old, first, second = [], [], []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for board, workers in boards:
+                object_graph_plies(board, workers)
+            old.append((time.perf_counter() - start) / len(positions))
+
+            _PLY_RUNS.clear()
+            for passes in (first, second):
+                start = time.perf_counter()
+                for bitboard in bitboards:
+                    bitboard.plies()
+                passes.append((time.perf_counter() - start) / len(positions))
+    finally:
+        if enabled:
+            gc.enable()
+
+    return len(positions), old, first, second, mismatches
+
+
+def check(max_depth=None, min_rate=None):
+    """
+    Runs every reference position and compares the counts with the expected ones.
+    With min_rate, searches of at least 10000 nodes slower than that many
+    nodes/second are reported too, to catch throughput regressions.
+    Returns the list of mismatches as (name, depth, expected, found).
+    """
+
+    failures = []
+    for name, position, expected in REFERENCE_POSITIONS:
+        found = strategy_count(position)
+        if found != expected[1]:
+            failures.append((name, "strategy", expected[1], found))
+
+        for depth, count in sorted(expected.items()):
+            if max_depth and depth > max_depth:
+                continue
+
+            bitboard = to_bitboard(position)
+            start = time.perf_counter()
+            found = perft(bitboard, depth)
+            elapsed = time.perf_counter() - start
+
+            status = "ok" if found == count else f"FAILED (expected {count})"
+            rate = found / elapsed if elapsed else 0.0
+            print(f"{name} depth {depth}: {found} {status} {elapsed:.3f}s {rate:.0f} nodes/s")
+
+            if found != count:
+                failures.append((name, depth, count, found))
+            elif min_rate and found >= 10000 and rate < min_rate:
+                failures.append((name, depth, f">= {min_rate} nodes/s", f"{rate:.0f}"))
+
+    return failures
+
+
+def main():
+    """
+    Command line: python perft.py [depth] [--position=name|notation] [--divide=1]
+    or python perft.py --check [--max-depth=N] [--min-rate=NODES] to verify the
+    reference positions, or python perft.py --compare [--games=20] [--seed=0]
+    [--repeat=11] to time the old object-graph move generator against BitBoard.plies.
+    """
+
+    args, options = parse_options(sys.argv[1:])
+
+    if "--compare" in args:
+        count, old, first, second, mismatches = compare(
+            options.get("games", 20), options.get("seed", 0), options.get("repeat", 11)
+        )
+        print(f"{count} positions, {mismatches} ply count mismatches, medians of {len(old)} rounds")
+        print(f"object graph: {statistics.median(old) * 1e6:.1f}us per position")
+        for name, passes in (("first pass", first), ("second pass", second)):
+            ratios = sorted(o / n for o, n in zip(old, passes))
+            print(
+                f"BitBoard.plies {name}: {statistics.median(passes) * 1e6:.1f}us per position, "
+                f"speedup {statistics.median(ratios):.1f}x ({ratios[0]:.1f}x to {ratios[-1]:.1f}x)"
+            )
+        sys.exit(1 if mismatches else 0)
+
+    if "--check" in args:
+        failures = check(options.get("max_depth"), options.get("min_rate"))
+        for failure in failures:
+            print("Mismatch: %s depth %s expected %s found %s" % failure)
+        sys.exit(1 if failures else 0)
+
+    depth = int(args[0]) if args else 3
+    # --position is a reference position's name or a position in the notation
+    positions = {name: position for name, position, _ in REFERENCE_POSITIONS}
+    position = options.get("position", "start")
+    bitboard = to_bitboard(positions.get(position, position))
+
+    if options.get("divide"):
+        for (w, frm, to, build), count in divide(bitboard, depth).items():
+            print(f"{SYMBOLS[w]} {frm}->{to} +{build}: {count}")
+
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        count = perft(bitboard, d)
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else 0.0
+        print(f"depth {d}: {count} nodes {elapsed:.3f}s {rate:.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Anton Melnychuk & Oliver Li
+
+import json
+import time
+
+# Counters that are not work done while searching, so they get no per-second rate
+UNTIMED = ("seconds", "searches", "book_probes", "book_hits", "depth")
+
+
+class _Phase:
+    """Context manager adding the wall time of a block to a profiler phase."""
+
+    __slots__ = ("_entry", "_start")
+
+    def __init__(self, entry):
+        self._entry = entry
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._entry[0] += 1
+        self._entry[1] += time.perf_counter() - self._start
+        return False
+
+
+class _NullPhase:
+    """Shared do-nothing context manager used while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Profiler:
+    """
+    Opt-in per-phase timing and counters for the game loop and the strategies.
+
+    _phases (dict): Phase name -> [calls, seconds].
+    _counters (dict): Counter name -> total, e.g. "white.minimax.nodes".
+
+    While disabled, phase() returns a shared no-op context manager and count()
+    returns immediately, so instrumented code costs next to nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._phases = {}
+        self._counters = {}
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        self._phases = {}
+        self._counters = {}
+
+    def phase(self, name):
+        """Times a block: `with s_profiler.phase("execute"): ...`."""
+        if not self.enabled:
+            return _NULL_PHASE
+
+        entry = self._phases.get(name)
+        if entry is None:
+            entry = self._phases[name] = [0, 0.0]
+        return _Phase(entry)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def data(self):
+        """Plain dictionary of the recorded phases, counters and derived rates."""
+
+        rates = {}
+        for name, value in self._counters.items():
+            prefix, _, counter = name.rpartition(".")
+            seconds = self._counters.get(f"{prefix}.seconds") if prefix else None
+
+            if counter.endswith("_hits"):
+                probes = self._counters.get(name[: -len("_hits")] + "_probes")
+                if probes:
+                    rates[name[: -len("_hits")] + "_hit_rate"] = value / probes
+            elif counter == "depth":
+                searches = self._counters.get(f"{prefix}.searches")
+                if searches:
+                    rates[f"{prefix}.mean_depth"] = value / searches
+            elif seconds and counter not in UNTIMED:
+                rates[f"{name}_per_second"] = value / seconds
+
+        return {
+            "phases": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self._phases.items()
+            },
+            "counters": dict(self._counters),
+            "rates": rates,
+        }
+
+    def merge(self, data):
+        """Adds the phases and counters of another profiler's data()."""
+
+        for name, phase in data["phases"].items():
+            entry = self._phases.setdefault(name, [0, 0.0])
+            entry[0] += phase["calls"]
+            entry[1] += phase["seconds"]
+
+        for name, value in data["counters"].items():
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def summary(self):
+        """Human readable table of the recorded data."""
+
+        data = self.data()
+        lines = ["Phase                     calls     total(s)   mean(ms)"]
+        for name, phase in sorted(
+            data["phases"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            calls, seconds = phase["calls"], phase["seconds"]
+            mean = seconds / calls * 1000 if calls else 0.0
+            lines.append(f"{name:<24}{calls:>7}{seconds:>13.4f}{mean:>11.3f}")
+
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"{name}: {value:.4g}" if isinstance(value, float) else f"{name}: {value}")
+        for name, value in sorted(data["rates"].items()):
+            lines.append(f"{name}: {value:.4g}")
+
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Writes data() as JSON."""
+        with open(path, "w") as file:
+            json.dump(self.data(), file, indent=2)
+
+
+s_profiler = Profiler()
@@ -0,0 +1,368 @@
+# Anton Melnychuk & Oliver Li
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Bitboard import BitBoard, SYMBOLS
+from Board import Board
+from DirectionUtils import DirectionUtils
+from Player import PlayerFactory
+from Strategy import HumanStrategy, SearchStrategy
+from cli import SantoriniCLI, parse_args, parse_options
+from exceptions import Loss, MoveError, SessionClosed, Win, WorkerError
+from main import SantoriniGame
+
+OPTIONS_PROMPT = "Game options (white blue undo_redo score_display --name=value ...)\n"
+
+# The only options a client may set: the others name files on the server
+# (record, archive, book) or start processes (jobs) and are dropped
+CLIENT_OPTIONS = ("depth", "move_time", "game_time", "position")
+
+# Options that are not the searcher's: the time control is sent with every search
+_SESSION_OPTIONS = ("move_time", "game_time", "position", "profile")
+
+# Searching strategies of a pool process, one per player type and options,
+# kept from one search to the next like the transposition tables of Parallel.py
+_strategies = {}
+
+
+def _search_turn(color, player_type, options, budget, packed):
+    """
+    Searches an AI turn in a pool process, on a packed BitBoard.
+
+    Returns:
+        tuple: The (worker, from, to, build) ply and the counters the search
+               added to the strategy's report (nodes, tt_probes, ...).
+    """
+
+    key = (color, player_type, options)
+    strategy = _strategies.get(key)
+    if strategy is None:
+        player = PlayerFactory.get_factory(color, player_type, Board(), **dict(options))
+        strategy = _strategies[key] = player.strategy
+
+    # The session keeps the clock, a search only gets its budget
+    strategy._move_time, strategy._clock = budget, None
+    before = strategy.report()
+    ply = strategy._search_ply(BitBoard.unpack(packed))
+    counters = {name: value - before.get(name, 0) for name, value in strategy.report().items()}
+    return ply, counters
+
+
+class GameSession(SantoriniGame):
+    """
+    SantoriniGame played over a stream connection instead of the terminal.
+
+    The lines sent are the ones the CLI prints and prompts with, and every
+    answer is one line from the client. Each session owns its board, players
+    and history, so sessions never share game state. Human turns wait for
+    the client without blocking the event loop. Searches run in the process
+    pool on a packed BitBoard and only the ply comes back, while the random
+    and heuristic players, which take well under a millisecond, play on the
+    event loop.
+
+    Profiling is off in sessions: the profiler is one per process, so it
+    would add up the counters of every session, and the pool processes'
+    phases never reach it.
+
+    _reader (StreamReader): Lines from the client.
+    _writer (StreamWriter): Lines to the client.
+    _executor (ProcessPoolExecutor): Runs the searches.
+    _search_options (tuple): Sorted (name, value) options of the searches.
+    _timeout (float): Seconds to wait for an answer before closing the session.
+    """
+
+    def __init__(self, reader, writer, executor, timeout, white, blue, undo_redo, score_display, options=None):
+        options = options or {}
+        self._search_options = tuple(
+            sorted((name, value) for name, value in options.items() if name not in _SESSION_OPTIONS)
+        )
+        # The players here never search, so they need no transposition table
+        super().__init__(white, blue, undo_redo, score_display, {**options, "profile": None, "tt_mb": 0})
+        self._reader = reader
+        self._writer = writer
+        self._executor = executor
+        self._timeout = timeout
+
+    async def send(self, text):
+        self._writer.write(text.encode())
+        await self._writer.drain()
+
+    async def ask(self, prompt):
+        """Sends a prompt and returns the client's answer line."""
+        await self.send(prompt)
+        line = await asyncio.wait_for(self._reader.readline(), self._timeout)
+        if not line:
+            raise SessionClosed
+        return line.decode().strip()
+
+    def _score_text(self):
+        positions = [worker.position for worker in self._current.workers]
+        score = self._board.score(positions, self._current.color)
+        return f" ({score[0]}, {score[1]}, {score[2]})"
+
+    def _turn_text(self):
+        text = f"{self._board}\nTurn: {self._turn}, {self._current} ({self._current.worker_string()})"
+        if self._score_display == "on":
+            text += "," + self._score_text()
+        return text + "\n"
+
+    def _opponent(self):
+        return self._white if self._current is self._blue else self._blue
+
+    async def _search(self, strategy):
+        """Has the pool search the current player's turn and selects the ply found."""
+
+        bitboard = self._board.bitboard()
+        bitboard.side = SYMBOLS.index(self._current.workers[0].symbol) // 2
+
+        start = time.perf_counter()
+        ply, counters = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            _search_turn,
+            self._current.color,
+            strategy._type,
+            self._search_options,
+            strategy._budget(),
+            bitboard.pack(),
+        )
+        strategy.searched(ply, time.perf_counter() - start, counters)
+
+    async def _choose(self, strategy):
+        """Asks for a worker, a move and a build until the human strategy accepts them."""
+
+        while True:
+            symbol = await self.ask(SantoriniCLI.WORKER_PROMPT)
+            try:
+                if symbol not in SYMBOLS:
+                    raise WorkerError("Not a valid worker")
+                strategy.choose_worker(symbol)
+            except WorkerError as e:
+                await self.send(f"{e.mes}\n")
+            else:
+                break
+
+        for prompt, choose in (
+            (SantoriniCLI.MOVE_PROMPT, strategy.choose_move),
+            (SantoriniCLI.BUILD_PROMPT, strategy.choose_build),
+        ):
+            while True:
+                direction = await self.ask(prompt)
+                try:
+                    if direction not in DirectionUtils.DIRECTIONS:
+                        await self.send("Not a valid direction\n")
+                        continue
+                    choose(direction)
+                except MoveError as e:
+                    await self.send(f"Cannot {e.move_type} {e.direction}\n")
+                else:
+                    break
+
+    async def play(self):
+        """Plays the game to the end like SantoriniGame.run, returns the winning color."""
+
+        while True:
+            await self.send(self._turn_text())
+
+            try:
+                self._current.update_possibilities()
+            except Loss:
+                return self._opponent().color
+
+            if self._undo_redo == "on":
+                command = await self.ask(SantoriniCLI.MEMENTO_PROMPT)
+                if command in ("undo", "redo"):
+                    getattr(self._caretaker, command)()
+                    self._restore_state()
+                    continue
+                if command != "next":
+                    await self.send("Not a valid command\n")
+                    continue
+                self._current.update_possibilities()
+
+            try:
+                self._board.check_win(self._blue)
+                self._board.check_win(self._white)
+            except Win:
+                return self._opponent().color
+
+            strategy = self._current.strategy
+            if isinstance(strategy, HumanStrategy):
+                await self._choose(strategy)
+                symbol, move, build = self._execute_command(strategy.commit)
+            elif isinstance(strategy, SearchStrategy):
+                await self._search(strategy)
+                symbol, move, build = self._execute_command(strategy.commit)
+            else:
+                symbol, move, build = self._execute_command()
+
+            text = f"{symbol},{move},{build}"
+            if self._score_display == "on":
+                text += self._score_text()
+            await self.send(text + "\n")
+            self._next()
+
+
+class GameServer:
+    """
+    Hosts independent GameSessions, one per connection, on a TCP or Unix socket.
+
+    A client first answers OPTIONS_PROMPT with the arguments main.py takes on
+    the command line (e.g. "human minimax on off --depth=3"), then plays with
+    the CLI prompts. After a game it is asked to play again.
+
+    _executor (ProcessPoolExecutor): Shared by the sessions for searches,
+        which run on as many cores as it has processes. A session waits
+        for its search without holding up the others.
+    _timeout (float): Seconds a session may wait for its client.
+    _max_depth (int): Deepest search a client may ask for.
+    _max_move_time (float): Longest search per move a client may ask for,
+        the game clock is capped to MOVES_TO_GO such moves.
+    _slots (Semaphore): Bounds the number of sessions served at once.
+    _backlog (int): Listen queue length, as long as the session bound.
+    sessions (int): Sessions currently connected.
+    """
+
+    def __init__(self, workers=None, timeout=600.0, max_sessions=1000, max_depth=3, max_move_time=1.0):
+        self._executor = ProcessPoolExecutor(workers or os.cpu_count() or 1)
+        self._timeout = timeout
+        self._max_depth = max_depth
+        self._max_move_time = max_move_time
+        self._slots = asyncio.Semaphore(max_sessions)
+        self._backlog = max_sessions
+        self.sessions = 0
+
+    async def start(self, host="127.0.0.1", port=7777, unix=None):
+        """Starts listening, on the Unix socket path `unix` when given. Returns the asyncio server."""
+        # A burst of clients connecting at once must not overflow the listen queue
+        if unix:
+            return await asyncio.start_unix_server(self.handle, path=unix, backlog=self._backlog)
+        return await asyncio.start_server(self.handle, host, port, backlog=self._backlog)
+
+    async def handle(self, reader, writer):
+        if self._slots.locked():
+            writer.write(b"Server is full\n")
+            writer.close()
+            return
+
+        async with self._slots:
+            self.sessions += 1
+            try:
+                await self._serve(reader, writer)
+            except (SessionClosed, asyncio.TimeoutError, ConnectionError):
+                pass
+            finally:
+                self.sessions -= 1
+                writer.close()
+
+    async def _serve(self, reader, writer):
+        writer.write(OPTIONS_PROMPT.encode())
+        line = await asyncio.wait_for(reader.readline(), self._timeout)
+        if not line:
+            return
+
+        args = parse_args(line.decode().split())
+        args["options"] = self.client_options(args["options"], (args["white"], args["blue"]))
+
+        while True:
+            try:
+                game = GameSession(reader, writer, self._executor, self._timeout, **args)
+            except ValueError as e:
+                writer.write(f"{e}\n".encode())
+                return
+            try:
+                winner = await game.play()
+            finally:
+                game.close()
+            game.save_record(winner)
+
+            await game.send(f"{winner} has won\n")
+            if (await game.ask(SantoriniCLI.RESTART_PROMPT)).lower() != "yes":
+                return
+
+    def client_options(self, options, player_types=()):
+        """
+        The options of CLIENT_OPTIONS a client sent, with the search limits
+        capped. Searches the client leaves unlimited get the server's limits:
+        minimax players search --max-depth plies and MCTS players
+        --max-move-time seconds.
+        """
+
+        limits = {
+            "depth": self._max_depth,
+            "move_time": self._max_move_time,
+            "game_time": self._max_move_time * SearchStrategy.MOVES_TO_GO,
+        }
+
+        allowed = {}
+        for name in CLIENT_OPTIONS:
+            value = options.get(name)
+            if name in limits:
+                # Limits that are not positive numbers are left to the defaults
+                if isinstance(value, (int, float)) and value > 0:
+                    allowed[name] = min(value, limits[name])
+            elif value is not None:
+                allowed[name] = value
+
+        allowed.setdefault("depth", self._max_depth)
+        if "mcts" in player_types:
+            allowed.setdefault("move_time", self._max_move_time)
+        return allowed
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(
+    host="127.0.0.1",
+    port=7777,
+    unix=None,
+    workers=None,
+    timeout=600.0,
+    max_sessions=1000,
+    max_depth=3,
+    max_move_time=1.0,
+):
+    game_server = GameServer(workers, timeout, max_sessions, max_depth, max_move_time)
+    server = await game_server.start(host, port, unix)
+    where = unix or f"{host}:{port}"
+    print(f"Serving Santorini on {where}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    """
+    Command line: python server.py [--host=127.0.0.1] [--port=7777] [--unix=path]
+    [--workers=N] [--timeout=600] [--max-sessions=1000] [--max-depth=3]
+    [--max-move-time=1]
+    Searches run on --workers processes (one per core by default). Clients may
+    only set the options of CLIENT_OPTIONS, and their searches are limited to
+    --max-depth plies and --max-move-time seconds per move.
+    """
+
+    _, options = parse_options(sys.argv[1:])
+    try:
+        asyncio.run(
+            serve(
+                options.get("host", "127.0.0.1"),
+                options.get("port", 7777),
+                options.get("unix"),
+                options.get("workers"),
+                options.get("timeout", 600.0),
+                options.get("max_sessions", 1000),
+                options.get("max_depth", 3),
+                options.get("max_move_time", 1.0),
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# Anton Melnychuk & Oliver Li
+
+import os
+import json
+import sys
+import random
+import time
+from multiprocessing import Pool
+from main import SantoriniGame
+from cli import parse_options, PLAYER_TYPES
+from exceptions import Loss
+from profiler import s_profiler, Profiler, UNTIMED
+from Record import RecordWriter
+
+
+class HeadlessGame(SantoriniGame):
+    """SantoriniGame that plays two AI strategies to the end without any terminal I/O."""
+
+    def __init__(self, white, blue, options=None):
+        super().__init__(white, blue, "off", "off", options)
+
+    def play(self):
+        """
+        Plays the game to completion.
+
+        Returns:
+            tuple: The winning color, the number of turns played and the
+                   per-move execution times of each color.
+        """
+
+        timings = {"white": [], "blue": []}
+
+        while True:
+            bitboard = self._board.bitboard()
+
+            # The previous mover stepped up to level 3
+            for color, side in (("white", 0), ("blue", 1)):
+                if bitboard.has_won(side):
+                    return color, self._turn, timings
+
+            try:
+                with s_profiler.phase("update_possibilities"):
+                    self._current.update_possibilities()
+            except Loss:
+                self._next()
+                return self._current.color, self._turn, timings
+
+            start = time.perf_counter()
+            self._execute_command()
+            timings[self._current.color].append(time.perf_counter() - start)
+
+            self._next()
+
+    def reports(self):
+        """Search counters of both players' strategies (see Strategy.report)."""
+        return {
+            "white": self._white.strategy.report(),
+            "blue": self._blue.strategy.report(),
+        }
+
+
+def play_game(spec):
+    """Plays one seeded game, spec = (seed, white type, blue type, options)."""
+
+    seed, white, blue, options = spec
+    random.seed(seed)
+
+    game = HeadlessGame(white, blue, options)
+    try:
+        winner, turns, timings = game.play()
+    except Exception as e:
+        # Enough to replay the failing turn alone with --position
+        raise RuntimeError(
+            f"Game {seed} ({white} vs {blue}) failed in position {game.notation()}"
+        ) from e
+    finally:
+        game.close()
+
+    return {
+        "seed": seed,
+        "white": white,
+        "blue": blue,
+        "winner": winner,
+        "winner_type": white if winner == "white" else blue,
+        "turns": turns,
+        "timings": timings,
+        "reports": game.reports(),
+        "profile": s_profiler.data() if s_profiler.enabled else None,
+        "record": game.record(winner) if options.get("record") else None,
+    }
+
+
+def summarize(results, first, second):
+    """Aggregates per-game results into win rates, game lengths and move timings."""
+
+    games = len(results)
+    turns = [result["turns"] for result in results]
+    summary = {"games": games, "wins": {}, "win_rate": {}, "white_win_rate": 0.0}
+
+    # A mirror match only has meaningful per-color results
+    for player_type in dict.fromkeys((first, second)):
+        wins = sum(1 for result in results if result["winner_type"] == player_type)
+        summary["wins"][player_type] = wins
+        summary["win_rate"][player_type] = wins / games if games else 0.0
+
+    white_wins = sum(1 for result in results if result["winner"] == "white")
+    summary["white_win_rate"] = white_wins / games if games else 0.0
+
+    summary["turns"] = {
+        "mean": sum(turns) / games if games else 0.0,
+        "min": min(turns, default=0),
+        "max": max(turns, default=0),
+    }
+
+    move_times = {}
+    for result in results:
+        for color, times in result["timings"].items():
+            move_times.setdefault(result[color], []).extend(times)
+
+    summary["move_time"] = {
+        player_type: {
+            "moves": len(times),
+            "mean": sum(times) / len(times) if times else 0.0,
+            "max": max(times, default=0.0),
+        }
+        for player_type, times in move_times.items()
+    }
+
+    # Search counters per player type, with per-second rates (e.g. playouts/s)
+    counters = {}
+    for result in results:
+        for color, report in result["reports"].items():
+            totals = counters.setdefault(result[color], {})
+            for name, value in report.items():
+                totals[name] = totals.get(name, 0) + value
+
+    for totals in counters.values():
+        seconds = totals.get("seconds", 0.0)
+        for name in [name for name in totals if name not in UNTIMED]:
+            totals[f"{name}_per_second"] = totals[name] / seconds if seconds else 0.0
+
+    summary["search"] = counters
+
+    # Instrumentation recorded in the worker processes (--profile)
+    profiler = Profiler()
+    for result in results:
+        if result["profile"]:
+            profiler.merge(result["profile"])
+    summary["profile"] = profiler.data() if any(r["profile"] for r in results) else None
+    summary["profile_summary"] = profiler.summary() if summary["profile"] else None
+
+    return summary
+
+
+def simulate(first, second, games=100, pool=None, seed=0, swap=True, **options):
+    """
+    Plays `games` games between two PlayerFactory strategy types across a
+    pool of `pool` processes (every core by default). The strategy options
+    include their own `jobs`, which only take effect with pool=1: the games
+    of a pool run in daemonic processes that cannot start pools of their own.
+
+    Game i uses seed + i, so any game can be replayed on its own. With swap,
+    odd games give `first` the blue workers to cancel the first-move advantage.
+    With record=path, every game is appended to that record file as it finishes.
+
+    Returns:
+        tuple: The aggregate summary and the list of per-game results.
+    """
+
+    # Records replay from the initial position, checked before the file is opened
+    if options.get("position") and options.get("record"):
+        raise ValueError("--position cannot be combined with --record")
+
+    specs = []
+    for i in range(games):
+        white, blue = (second, first) if swap and i % 2 else (first, second)
+        specs.append((seed + i, white, blue, options))
+
+    jobs = pool or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    path = options.get("record")
+    writer = RecordWriter(path) if isinstance(path, str) else None
+
+    pool = Pool(processes=jobs) if jobs > 1 else None
+    if pool:
+        stream = pool.imap(play_game, specs, chunksize=max(1, games // (4 * jobs)))
+    else:
+        stream = map(play_game, specs)
+
+    # Results arrive in game order, so records are written as soon as they are ready
+    results = []
+    for result in stream:
+        results.append(result)
+        if writer:
+            writer.write(result["record"])
+
+    if pool:
+        pool.close()
+        pool.join()
+    if writer:
+        writer.close()
+
+    summary = summarize(results, first, second)
+    summary["wall_time"] = time.perf_counter() - start
+
+    return summary, results
+
+
+def main():
+    """
+    Command line: python simulate.py <type> <type> [--games=N] [--pool=N] [--seed=N]
+    [--swap=0] [--record=file] plus any strategy options (e.g. --depth=3, or
+    --jobs=N with --pool=1 for the search strategies' own process pools).
+    """
+
+    args, options = parse_options(sys.argv[1:])
+    first = args[0] if args and args[0] in PLAYER_TYPES else "heuristic"
+    second = args[1] if len(args) > 1 and args[1] in PLAYER_TYPES else "random"
+
+    if "human" in (first, second):
+        raise ValueError("Simulations need two AI player types")
+
+    games = options.pop("games", 100)
+    pool = options.pop("pool", None)
+    seed = options.pop("seed", 0)
+    swap = bool(options.pop("swap", 1))
+
+    summary, _ = simulate(first, second, games, pool, seed, swap, **options)
+
+    print(f"{summary['games']} games in {summary['wall_time']:.2f}s")
+    for player_type, wins in summary["wins"].items():
+        print(f"{player_type}: {wins} wins ({summary['win_rate'][player_type]:.1%})")
+    print(f"white win rate: {summary['white_win_rate']:.1%}")
+    print(
+        f"turns: mean {summary['turns']['mean']:.1f}, "
+        f"min {summary['turns']['min']}, max {summary['turns']['max']}"
+    )
+    for player_type, stats in summary["move_time"].items():
+        print(
+            f"{player_type} move time: mean {stats['mean'] * 1000:.2f}ms, "
+            f"max {stats['max'] * 1000:.2f}ms over {stats['moves']} moves"
+        )
+    for player_type, totals in summary["search"].items():
+        rates = [
+            f"{name[: -len('_per_second')]}/s {value:.0f}"
+            for name, value in totals.items()
+            if name.endswith("_per_second")
+        ]
+        if rates:
+            print(f"{player_type} search: " + ", ".join(rates))
+
+    if summary["profile"]:
+        print(summary["profile_summary"])
+        if isinstance(options.get("profile"), str):
+            with open(options["profile"], "w") as file:
+                json.dump(summary["profile"], file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import sys
+import time
+from Bitboard import BitBoard, BITS, CELLS, POSITIONS, SIZE
+from DirectionUtils import DirectionUtils
+from cli import parse_options
+
+_LAST = SIZE - 1
+
+# The 8 symmetries of the square board as (row, col) -> (row, col)
+_TRANSFORMS = (
+    lambda r, c: (r, c),  # identity
+    lambda r, c: (c, _LAST - r),  # rotate 90 clockwise
+    lambda r, c: (_LAST - r, _LAST - c),  # rotate 180
+    lambda r, c: (_LAST - c, r),  # rotate 270 clockwise
+    lambda r, c: (r, _LAST - c),  # mirror left-right
+    lambda r, c: (_LAST - r, c),  # mirror top-bottom
+    lambda r, c: (c, r),  # transpose
+    lambda r, c: (_LAST - c, _LAST - r),  # anti-transpose
+)
+IDENTITY = 0
+
+# SQUARE_MAPS[t][sq] is the square sq is sent to by transform t
+SQUARE_MAPS = tuple(
+    tuple(row * SIZE + col for row, col in (f(r, c) for r, c in POSITIONS))
+    for f in _TRANSFORMS
+)
+
+# INVERSE[t] undoes transform t
+INVERSE = tuple(
+    next(
+        u
+        for u in range(8)
+        if all(SQUARE_MAPS[u][SQUARE_MAPS[t][sq]] == sq for sq in range(CELLS))
+    )
+    for t in range(8)
+)
+
+
+def _map_direction(f, direction):
+    # The center is fixed by every transform, so follow one step away from it
+    row, col = f(*DirectionUtils.move_result((2, 2), direction))
+    return DirectionUtils.get_direction((row - 2, col - 2))
+
+
+# DIRECTION_MAPS[t][direction] is the direction a move in `direction` becomes
+DIRECTION_MAPS = tuple(
+    {direction: _map_direction(f, direction) for direction in DirectionUtils.DIRECTIONS}
+    for f in _TRANSFORMS
+)
+
+# _ROW_MAPS[t][row][bits]: the transformed mask of the 5 bits of one board row,
+# so a whole 25-bit plane is transformed with 5 lookups
+_ROW_MAPS = tuple(
+    tuple(
+        tuple(
+            sum(
+                BITS[SQUARE_MAPS[t][row * SIZE + col]]
+                for col in range(SIZE)
+                if bits >> col & 1
+            )
+            for bits in range(1 << SIZE)
+        )
+        for row in range(SIZE)
+    )
+    for t in range(8)
+)
+
+
+def transform_mask(t, mask):
+    r0, r1, r2, r3, r4 = _ROW_MAPS[t]
+    return (
+        r0[mask & 31]
+        | r1[mask >> 5 & 31]
+        | r2[mask >> 10 & 31]
+        | r3[mask >> 15 & 31]
+        | r4[mask >> 20]
+    )
+
+
+def transform_ply(t, ply):
+    """Maps a (worker, from, to, build) ply through transform t."""
+    squares = SQUARE_MAPS[t]
+    w, frm, to, build = ply
+    return w, squares[frm], squares[to], squares[build]
+
+
+def restore_ply(bitboard, t, ply):
+    """
+    Maps a ply of the canonical position (see canonical) back onto the original
+    bitboard. The worker is found by its square, since canonical keys do not
+    tell apart the two workers of a side.
+    """
+    w, frm, to, build = transform_ply(INVERSE[t], ply)
+    return bitboard.workers.index(frm), frm, to, build
+
+
+def transform_direction(t, direction):
+    """Maps a DirectionUtils direction ("n", "ne", ...) through transform t."""
+    return DIRECTION_MAPS[t][direction]
+
+
+def transform(bitboard, t):
+    """A new BitBoard holding the position seen through transform t."""
+    squares = SQUARE_MAPS[t]
+    return BitBoard(
+        [transform_mask(t, plane) for plane in bitboard.planes],
+        [squares[sq] for sq in bitboard.workers],
+        bitboard.side,
+    )
+
+
+def _key(planes, workers, side):
+    p0, p1, p2, p3 = planes
+    w0, w1, w2, w3 = workers
+    # The two workers of a side are interchangeable
+    if w0 > w1:
+        w0, w1 = w1, w0
+    if w2 > w3:
+        w2, w3 = w3, w2
+    return (
+        ((p3 << 75 | p2 << 50 | p1 << 25 | p0) << 20 | w0 << 15 | w1 << 10 | w2 << 5 | w3) << 1
+        | side
+    )
+
+
+def canonical(bitboard):
+    """
+    Canonical key of a position up to the 8 board symmetries.
+
+    The key packs levels, worker squares (each side's pair in square order)
+    and side to move into one int and is the smallest over all transforms,
+    so symmetric positions share it.
+
+    Returns:
+        tuple: (key, t) where transform t maps the position onto the
+               canonical one; restore_ply(bitboard, t, ply) maps plies back.
+    """
+
+    planes = bitboard.planes
+    workers = bitboard.workers
+    side = bitboard.side
+
+    best, best_t = None, IDENTITY
+    for t in range(8):
+        r0, r1, r2, r3, r4 = _ROW_MAPS[t]
+        squares = SQUARE_MAPS[t]
+        key = _key(
+            [
+                r0[p & 31]
+                | r1[p >> 5 & 31]
+                | r2[p >> 10 & 31]
+                | r3[p >> 15 & 31]
+                | r4[p >> 20]
+                for p in planes
+            ],
+            [squares[sq] for sq in workers],
+            side,
+        )
+        if best is None or key < best:
+            best, best_t = key, t
+
+    return best, best_t
+
+
+def main():
+    """
+    Command line: python symmetry.py [--positions=N] [--seed=N]
+    Times canonical() on positions from random games and reports how many
+    distinct positions two plies from the start collapse to.
+    """
+
+    _, options = parse_options(sys.argv[1:])
+    rng = random.Random(options.get("seed", 0))
+
+    positions = []
+    while len(positions) < options.get("positions", 10000):
+        bitboard = BitBoard()
+        while True:
+            plies = bitboard.plies()
+            if not plies or bitboard.has_won(bitboard.side ^ 1):
+                break
+            positions.append(bitboard.copy())
+            bitboard.make(rng.choice(plies))
+
+    start = time.perf_counter()
+    for bitboard in positions:
+        canonical(bitboard)
+    elapsed = time.perf_counter() - start
+    print(
+        f"canonical(): {elapsed / len(positions) * 1e6:.2f}us per call "
+        f"over {len(positions)} positions"
+    )
+
+    raw, reduced = set(), set()
+    root = BitBoard()
+    for first in root.plies():
+        root.make(first)
+        for second in root.plies():
+            root.make(second)
+            raw.add(root.hash)
+            reduced.add(canonical(root)[0])
+            root.unmake(second)
+        root.unmake(first)
+    print(f"positions after 2 plies: {len(raw)} distinct, {len(reduced)} up to symmetry")
+
+
+if __name__ == "__main__":
+    main()
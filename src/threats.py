@@ -0,0 +1,142 @@
+# Anton Melnychuk & Oliver Li
+
+from Bitboard import BITS, NEIGHBOURS, SIDE_WORKERS, squares
+
+
+def winning_moves(bitboard, side=None):
+    """Mask of the level 3 squares the side can step up onto right now."""
+    side = bitboard.side if side is None else side
+    w1, w2 = SIDE_WORKERS[side]
+    return (bitboard.move_mask(w1) | bitboard.move_mask(w2)) & bitboard.planes[2]
+
+
+def winning_workers(bitboard, side=None):
+    """Indices of the side's workers that can step up to level 3 right now."""
+    side = bitboard.side if side is None else side
+    top = bitboard.planes[2]
+    return tuple(w for w in SIDE_WORKERS[side] if bitboard.move_mask(w) & top)
+
+
+def climbing(bitboard, side):
+    """
+    Mask of the squares next to the side's workers standing on level 2 or
+    higher: only there can a level 3 square become a winning move for it.
+    """
+    workers = bitboard.workers
+    high = bitboard.planes[1]
+    mask = 0
+    for w in SIDE_WORKERS[side]:
+        if high & BITS[workers[w]]:
+            mask |= NEIGHBOURS[workers[w]]
+    return mask
+
+
+def safe_builds(bitboard, w):
+    """
+    Builds that leave the opponent without a winning move, for worker w that
+    has just stepped onto its square (BitBoard.step) and has not built yet.
+
+    An existing threat is blocked by doming its square, two threats cannot
+    be blocked, and raising a level 2 square next to a climbing opponent
+    worker would create one.
+    """
+
+    to = bitboard.workers[w]
+    planes = bitboard.planes
+    builds = NEIGHBOURS[to] & ~(bitboard.occupied | planes[3])
+
+    opponent = (w >> 1) ^ 1
+    danger = climbing(bitboard, opponent)
+    if not danger:
+        return builds
+
+    threats = winning_moves(bitboard, opponent)
+    if threats:
+        return builds & threats if not threats & (threats - 1) else 0
+
+    return builds & ~(planes[1] & ~planes[2] & danger)
+
+
+def blocking_builds(bitboard):
+    """Squares the side to move can build on to dome one of the opponent's winning squares."""
+    threats = winning_moves(bitboard, bitboard.side ^ 1)
+    if not threats:
+        return 0
+
+    reachable = 0
+    for w in SIDE_WORKERS[bitboard.side]:
+        for to in squares(bitboard.move_mask(w)):
+            reachable |= bitboard.build_mask(w, to)
+    return reachable & threats
+
+
+def safe_plies(bitboard, plies=None):
+    """
+    The plies after which the opponent cannot win on its next move; plies
+    stepping up to level 3 win at once and are always kept.
+    """
+
+    plies = bitboard.plies() if plies is None else plies
+    if not climbing(bitboard, bitboard.side ^ 1):
+        return plies
+
+    top = bitboard.planes[2]
+    masks = {}
+    ans = []
+    for ply in plies:
+        w, frm, to, build = ply
+        if top & BITS[to]:
+            ans.append(ply)
+            continue
+
+        mask = masks.get((w, to))
+        if mask is None:
+            bitboard.step(w, to)
+            mask = masks[(w, to)] = safe_builds(bitboard, w)
+            bitboard.step(w, frm)
+
+        if mask & BITS[build]:
+            ans.append(ply)
+
+    return ans
+
+
+def forced_win(bitboard, plies=3):
+    """
+    A ply forcing a win for the side to move within `plies` plies (1 to 3),
+    or None:
+        1: step up to level 3 now.
+        2: leave the opponent without a move.
+        3: leave the opponent no winning move, and a win after every reply.
+    """
+
+    side = bitboard.side
+    wins = winning_moves(bitboard, side)
+    if wins:
+        to = (wins & -wins).bit_length() - 1
+        for w in SIDE_WORKERS[side]:
+            if bitboard.move_mask(w) & BITS[to]:
+                build = bitboard.build_mask(w, to)
+                return w, bitboard.workers[w], to, (build & -build).bit_length() - 1
+
+    if plies < 2:
+        return None
+
+    candidates = safe_plies(bitboard) if plies >= 3 else bitboard.plies()
+    for ply in candidates:
+        bitboard.make(ply)
+        won = not bitboard.has_moves()
+        if not won and plies >= 3:
+            won = all(_wins_after(bitboard, reply, side) for reply in bitboard.plies())
+        bitboard.unmake(ply)
+        if won:
+            return ply
+
+    return None
+
+
+def _wins_after(bitboard, reply, side):
+    bitboard.make(reply)
+    won = bool(winning_moves(bitboard, side))
+    bitboard.unmake(reply)
+    return won
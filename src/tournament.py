@@ -0,0 +1,247 @@
+# Anton Melnychuk & Oliver Li
+
+import json
+import math
+import os
+import random
+import sys
+import time
+from itertools import combinations
+from multiprocessing import Pool
+from cli import parse_options, PLAYER_TYPES
+from simulate import HeadlessGame
+
+# Elo points per factor of 10 in the odds of winning
+ELO_SCALE = 400
+
+
+def parse_entrant(spec):
+    """
+    Parses an entrant "type" or "type:name=value,..." (e.g. "minimax:depth=2"
+    or "heuristic:weights=1/1/1") into (name, player type, strategy options).
+    The whole spec is the entrant's name, so variants of a type are told apart.
+    """
+
+    player_type, _, params = spec.partition(":")
+    if player_type not in PLAYER_TYPES or player_type == "human":
+        raise ValueError(f"Not an AI player type: {player_type}")
+
+    _, options = parse_options([f"--{param}" for param in params.split(",") if param])
+    return spec, player_type, options
+
+
+def schedule(entrants, games=2, seed=0):
+    """
+    Every pairing with both color assignments, `games` times each.
+
+    Returns:
+        list: (key, seed, white entrant, blue entrant) per game, where key
+              "white|blue|round" identifies the game in the results file.
+    """
+
+    specs = []
+    for first, second in combinations(entrants, 2):
+        for white, blue in ((first, second), (second, first)):
+            for index in range(games):
+                key = f"{white[0]}|{blue[0]}|{index}"
+                specs.append((key, seed + len(specs), white, blue))
+    return specs
+
+
+def play_match(spec):
+    """Plays one scheduled game with each entrant's own strategy options."""
+
+    key, seed, (white, white_type, white_options), (blue, blue_type, blue_options) = spec
+    random.seed(seed)
+
+    game = HeadlessGame(
+        white_type, blue_type, {"players": {"white": white_options, "blue": blue_options}}
+    )
+    start = time.perf_counter()
+    try:
+        winner, turns, _ = game.play()
+    finally:
+        game.close()
+
+    return {
+        "key": key,
+        "seed": seed,
+        "white": white,
+        "blue": blue,
+        "winner": white if winner == "white" else blue,
+        "turns": turns,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def load_results(path):
+    """Results already in the file, keyed by game. A line cut short by a crash is skipped."""
+
+    results = {}
+    if not path or not os.path.exists(path):
+        return results
+
+    with open(path) as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            results[result["key"]] = result
+    return results
+
+
+def run(entrants, games=2, jobs=None, seed=0, path=None):
+    """
+    Plays every scheduled game that `path` does not hold yet across a
+    process pool, appending each result to `path` as soon as it arrives,
+    so an interrupted run picks up where it stopped.
+
+    Returns:
+        list: The results of every scheduled game.
+    """
+
+    specs = schedule(entrants, games, seed)
+    done = load_results(path)
+
+    # Start a crash-truncated file on a fresh line
+    if path and os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb+") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+
+    pending = [spec for spec in specs if spec[0] not in done]
+    jobs = jobs or os.cpu_count() or 1
+
+    output = open(path, "a") if path else None
+    pool = Pool(processes=jobs) if jobs > 1 and len(pending) > 1 else None
+    try:
+        stream = pool.imap_unordered(play_match, pending) if pool else map(play_match, pending)
+        for result in stream:
+            done[result["key"]] = result
+            if output:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if pool:
+            pool.terminate()
+        if output:
+            output.close()
+
+    return [done[spec[0]] for spec in specs if spec[0] in done]
+
+
+def _strengths(names, results, prior=1.0):
+    """
+    Bradley-Terry strengths by the MM algorithm. `prior` drawn games against
+    every other entrant keep an entrant that never lost (or won) finite.
+    """
+
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    wins = [prior * (n - 1) / 2] * n
+    played = [[prior if i != j else 0.0 for j in range(n)] for i in range(n)]
+
+    for result in results:
+        white, blue = index[result["white"]], index[result["blue"]]
+        played[white][blue] += 1
+        played[blue][white] += 1
+        wins[index[result["winner"]]] += 1
+
+    strengths = [1.0] * n
+    for _ in range(1000):
+        updated = [
+            wins[i]
+            / sum(played[i][j] / (strengths[i] + strengths[j]) for j in range(n) if j != i)
+            for i in range(n)
+        ]
+        scale = math.exp(sum(math.log(s) for s in updated) / n)
+        updated = [s / scale for s in updated]
+        converged = max(abs(a - b) for a, b in zip(updated, strengths)) < 1e-9
+        strengths = updated
+        if converged:
+            break
+    return strengths
+
+
+def elo(names, results, resamples=200, confidence=0.95, seed=0):
+    """
+    Elo ratings (mean 0) fitted to the results, with confidence intervals from
+    resampling the games with replacement.
+
+    Returns:
+        dict: name -> (rating, low, high).
+    """
+
+    def ratings(sample):
+        return [ELO_SCALE * math.log10(s) for s in _strengths(names, sample)]
+
+    point = ratings(results)
+    rng = random.Random(seed)
+    samples = [ratings(rng.choices(results, k=len(results))) for _ in range(resamples)]
+
+    tail = (1 - confidence) / 2
+    ans = {}
+    for i, name in enumerate(names):
+        values = sorted(sample[i] for sample in samples) or [point[i]]
+        low = values[int(tail * (len(values) - 1))]
+        high = values[int((1 - tail) * (len(values) - 1))]
+        ans[name] = (point[i], low, high)
+    return ans
+
+
+def standings(names, results):
+    """Games, wins and mean turns per entrant."""
+    table = {name: {"games": 0, "wins": 0, "turns": 0} for name in names}
+    for result in results:
+        for name in (result["white"], result["blue"]):
+            table[name]["games"] += 1
+            table[name]["turns"] += result["turns"]
+        table[result["winner"]]["wins"] += 1
+    return table
+
+
+def main():
+    """
+    Command line: python tournament.py <entrant> <entrant> ... [--games=2] [--jobs=N]
+    [--seed=0] [--results=file.jsonl] [--resamples=200]
+    An entrant is a player type, optionally with strategy options:
+    random heuristic "heuristic:weights=1/1/1" "minimax:depth=2" "mcts:move_time=0.1".
+    Every pairing plays --games games with each color assignment. With --results
+    the games are saved as they finish, and rerunning the command resumes.
+    """
+
+    args, options = parse_options(sys.argv[1:])
+    entrants = [parse_entrant(spec) for spec in args]
+    if len(entrants) < 2:
+        raise ValueError("A tournament needs at least two entrants")
+
+    start = time.perf_counter()
+    results = run(
+        entrants,
+        options.get("games", 2),
+        options.get("jobs"),
+        options.get("seed", 0),
+        options.get("results"),
+    )
+    names = [name for name, _, _ in entrants]
+    print(f"{len(results)} games in {time.perf_counter() - start:.2f}s")
+
+    ratings = elo(names, results, options.get("resamples", 200), seed=options.get("seed", 0))
+    table = standings(names, results)
+
+    width = max(len(name) for name in names)
+    print(f"{'entrant':<{width}}  games  wins  score    elo   95% interval")
+    for name in sorted(names, key=lambda name: -ratings[name][0]):
+        rating, low, high = ratings[name]
+        row = table[name]
+        score = row["wins"] / row["games"] if row["games"] else 0.0
+        print(
+            f"{name:<{width}}  {row['games']:>5}  {row['wins']:>4}  {score:>5.1%}  "
+            f"{rating:>5.0f}   [{low:.0f}, {high:.0f}]"
+        )
+
+
+if __name__ == "__main__":
+    main()
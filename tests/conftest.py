@@ -0,0 +1,36 @@
+# Anton Melnychuk & Oliver Li
+
+import os
+import random
+import sys
+
+# The modules in src/ import each other by their plain names
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from Bitboard import SIZE, SYMBOLS  # noqa: E402
+from notation import START, to_position  # noqa: E402
+
+
+def random_games(games, seed=0):
+    """
+    Plays `games` random games from the start with Position.play.
+
+    Returns:
+        list: The Positions of every game, from the start to the end.
+    """
+
+    rng = random.Random(seed)
+    played = []
+    for _ in range(games):
+        position = to_position(START)
+        positions = [position]
+        while True:
+            bitboard = position.to_bitboard()
+            plies = bitboard.plies()
+            if not plies or bitboard.has_won(bitboard.side ^ 1):
+                break
+            w, _, to, build = rng.choice(plies)
+            position = position.play(SYMBOLS[w], divmod(to, SIZE), divmod(build, SIZE))
+            positions.append(position)
+        played.append(positions)
+    return played
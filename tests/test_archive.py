@@ -0,0 +1,147 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import pytest
+from Archive import Archive, ArchiveWriter, build
+from Bitboard import POSITIONS, SIZE, SYMBOLS
+from Board import Board
+from Memento import Caretaker, GameState, Originator
+from Player import PlayerFactory
+from Position import Position
+from Record import GameRecord, RecordWriter, encode_squares
+from notation import START, to_position
+
+
+def _random_game(rng):
+    """
+    Plays a random game with Position.play.
+
+    Returns:
+        tuple: The GameRecord, its plies and the Position after every turn.
+    """
+
+    position = to_position(START)
+    positions, plies = [position], []
+    while True:
+        bitboard = position.to_bitboard()
+        moves = bitboard.plies()
+        if not moves or bitboard.has_won(bitboard.side ^ 1):
+            break
+        ply = rng.choice(moves)
+        w, _, to, square = ply
+        position = position.play(SYMBOLS[w], divmod(to, SIZE), divmod(square, SIZE))
+        positions.append(position)
+        plies.append(ply)
+
+    winner = ("white", "blue")[bitboard.side ^ 1]
+    record = GameRecord.from_winner(bytes(encode_squares(*ply) for ply in plies), winner)
+    return record, plies, positions
+
+
+@pytest.fixture(scope="module")
+def games():
+    rng = random.Random(0)
+    played = [_random_game(rng) for _ in range(12)]
+    played.append((GameRecord(b""), [], [to_position(START)]))
+    return played
+
+
+@pytest.mark.parametrize("interval", [1, 3, 16])
+def test_random_access_round_trip(tmp_path, games, interval):
+    path = str(tmp_path / "games.sa")
+    with ArchiveWriter(path, interval) as writer:
+        for record, _, _ in games:
+            writer.write(record)
+
+    rng = random.Random(interval)
+    with Archive(path) as archive:
+        assert len(archive) == len(games)
+        assert archive.interval == interval
+
+        order = list(range(len(games)))
+        rng.shuffle(order)
+        for g in order:
+            record, plies, positions = games[g]
+            game = archive[g]
+            assert len(game) == len(plies)
+            assert game.winner == record.winner
+            assert game.record().plies == record.plies
+
+            # Turns in any order, backwards and past the end as well
+            turns = list(range(len(positions))) + [len(positions) + 5]
+            rng.shuffle(turns)
+            for turn in turns:
+                expected = positions[min(turn, len(plies))]
+                assert game.bitboard(turn) == expected.to_bitboard()
+                assert game.memento(turn).get_position() == expected
+
+            for i, (w, frm, to, square) in enumerate(plies):
+                delta = game[i]
+                assert delta.get_turn() == i + 1
+                assert delta.get_symbol() == SYMBOLS[w]
+                assert delta.get_origin() == POSITIONS[frm]
+                assert delta.get_target() == POSITIONS[to]
+                assert delta.get_build() == POSITIONS[square]
+            if plies:
+                assert repr(game[-1]) == repr(game[len(plies) - 1])
+                assert [repr(d) for d in game[1:4]] == [repr(game[i]) for i in range(1, min(4, len(plies)))]
+            with pytest.raises(IndexError):
+                game[len(plies)]
+
+            keyframes = game.keyframes()
+            assert list(keyframes) == list(range(0, len(plies) + 1, interval))
+            assert len(keyframes) == len(list(keyframes))
+
+        with pytest.raises(IndexError):
+            archive[len(games)]
+
+
+def test_build_from_a_record_file(tmp_path, games):
+    records = str(tmp_path / "games.rec")
+    with RecordWriter(records) as writer:
+        for record, _, _ in games:
+            writer.write(record)
+
+    path = str(tmp_path / "games.sa")
+    assert build(records, path, 4) == len(games)
+    with Archive(path) as archive:
+        assert [game.record().plies for game in archive] == [record.plies for record, _, _ in games]
+
+
+def test_caretaker_browses_an_archived_game(tmp_path, games):
+    path = str(tmp_path / "games.sa")
+    with ArchiveWriter(path, 4) as writer:
+        for record, _, _ in games:
+            writer.write(record)
+
+    g = max(range(len(games)), key=lambda g: len(games[g][1]))
+    _, plies, positions = games[g]
+    with Archive(path) as archive:
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+
+        caretaker = Caretaker.browse(Originator(state), archive[g])
+        assert len(caretaker) == len(plies)
+        assert Position.from_state(state) == positions[0]
+
+        rng = random.Random(1)
+        for turn in rng.sample(range(len(positions)), len(positions)):
+            caretaker.goto(turn)
+            assert caretaker.cursor == turn
+            assert Position.from_state(state) == positions[turn]
+
+        caretaker.goto(len(plies))
+        caretaker.undo()
+        assert Position.from_state(state) == positions[-2]
+        caretaker.redo()
+        assert Position.from_state(state) == positions[-1]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.sa"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        Archive(str(path))
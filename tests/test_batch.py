@@ -0,0 +1,44 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+import Batch
+from Batch import BatchEngine
+from Bitboard import BitBoard
+from Record import RecordReader, RecordWriter, decode_squares
+
+
+def _replay(path):
+    """Replays every recorded game, checking each ply is legal and the winner right."""
+    games = 0
+    for record in RecordReader(path):
+        bitboard = BitBoard()
+        for code in record.plies:
+            ply = decode_squares(code, bitboard.workers)
+            assert ply in bitboard.plies()
+            bitboard.make(ply)
+        mover = bitboard.side ^ 1
+        if bitboard.has_won(mover):
+            assert record.result == mover
+        else:
+            assert not bitboard.has_moves() and record.result == mover
+        games += 1
+    return games
+
+
+@pytest.mark.parametrize("white, blue", [("random", "random"), ("heuristic", "random")])
+def test_python_games_are_legal(tmp_path, monkeypatch, white, blue):
+    monkeypatch.setattr(Batch, "np", None)
+    path = str(tmp_path / "batch.rec")
+    with RecordWriter(path) as writer:
+        engine = BatchEngine(64, white, blue, seed=1)
+        assert engine.run(writer) == sum(engine.plies)
+    assert _replay(path) == 64
+
+
+@pytest.mark.parametrize("white, blue", [("random", "random"), ("heuristic", "heuristic")])
+def test_numpy_games_are_legal(tmp_path, white, blue):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "batch.rec")
+    with RecordWriter(path) as writer:
+        BatchEngine(64, white, blue, seed=1).run(writer)
+    assert _replay(path) == 64
@@ -0,0 +1,57 @@
+# Anton Melnychuk & Oliver Li
+
+import Bitboard
+from Bitboard import BitBoard, RING_SQUARES, RINGS, BITS, squares
+from conftest import random_games
+from perft import compare
+
+
+def _bitboards(games, seed=0):
+    return [position.to_bitboard() for positions in random_games(games, seed) for position in positions]
+
+
+def test_object_graph_generator_agrees():
+    _, _, _, _, mismatches = compare(games=3, repeat=1)
+    assert mismatches == 0
+
+
+def test_plies_match_the_masks():
+    for bitboard in _bitboards(10):
+        for side in (0, 1):
+            expected = [
+                (w, bitboard.workers[w], to, build)
+                for w in (2 * side, 2 * side + 1)
+                for to in RINGS[bitboard.workers[w]]
+                if bitboard.move_mask(w) & BITS[to]
+                for build in RINGS[to]
+                if bitboard.build_mask(w, to) & BITS[build]
+            ]
+            assert bitboard.plies(side) == expected
+            assert list(bitboard.iter_plies(side)) == expected
+            assert bitboard.count_plies(side) == len(expected)
+
+
+def test_plies_after_the_ply_runs_are_cleared(monkeypatch):
+    monkeypatch.setattr(Bitboard, "PLY_RUNS_SIZE", 4)
+    bitboards = _bitboards(2, seed=1)
+    expected = [list(bitboard.iter_plies()) for bitboard in bitboards]
+    assert [bitboard.plies() for bitboard in bitboards] == expected
+    assert len(Bitboard._PLY_RUNS) <= 4 + 16
+
+
+def test_ring_squares_lists_every_subset_in_ring_order():
+    for sq, ring in enumerate(RINGS):
+        assert len(RING_SQUARES[sq]) == 1 << len(ring)
+        for mask, chosen in RING_SQUARES[sq].items():
+            assert chosen == tuple(n for n in ring if mask & BITS[n])
+            assert tuple(sorted(squares(mask))) == tuple(sorted(chosen))
+
+
+def test_make_and_unmake_keep_the_hash_incremental():
+    for bitboard in _bitboards(5, seed=2):
+        before = bitboard.pack(), bitboard.hash
+        for ply in bitboard.plies():
+            bitboard.make(ply)
+            assert bitboard.hash == BitBoard.unpack(bitboard.pack()).hash
+            bitboard.unmake(ply)
+            assert (bitboard.pack(), bitboard.hash) == before
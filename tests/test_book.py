@@ -0,0 +1,93 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+from Book import BookBuilder, OpeningBook
+from Bitboard import BitBoard
+from Record import GameRecord, encode_squares
+from Search import AlphaBeta
+from symmetry import canonical, transform
+
+
+def _children(bitboard):
+    children = []
+    for ply in bitboard.plies():
+        child = bitboard.copy()
+        child.make(ply)
+        children.append(child)
+    return children
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("book") / "openings.book")
+    builder = BookBuilder()
+    builder.search_openings(plies=1, depth=2, tt_mb=0)
+    assert builder.write(path) == len(builder)
+    return OpeningBook(path)
+
+
+def test_search_book_holds_every_opening_up_to_symmetry(book):
+    root = BitBoard()
+    classes = {canonical(child)[0] for child in _children(root)}
+    assert len(book) == 1 + len(classes)
+
+
+def test_probe_hits_the_searched_positions(book):
+    root = BitBoard()
+    for bitboard in [root] + _children(root)[::7]:
+        _, score = AlphaBeta(2).search(bitboard)
+        for t in range(8):
+            image = transform(bitboard, t)
+            ply, found, games, wins = book.lookup(image)
+            # The stored ply is mapped back onto the position it was asked for
+            assert ply in image.plies()
+            assert book.probe(image) == ply
+            assert found == score
+            assert (games, wins) == (0, 0)
+
+
+def test_probe_misses_positions_outside_the_book(book, tmp_path):
+    deeper = _children(_children(BitBoard())[0])[0]
+    assert book.lookup(deeper) is None
+    assert book.probe(deeper) is None
+
+    # A position no deeper than the book that was never stored
+    path = str(tmp_path / "root.book")
+    builder = BookBuilder()
+    builder.add_search(BitBoard(), depth=1)
+    child = _children(BitBoard())[0]
+    builder.add_search(child, depth=1)
+    assert builder.write(path) == 2
+
+    only = OpeningBook(path)
+    stored = {canonical(child)[0]}
+    missing = next(c for c in _children(BitBoard()) if canonical(c)[0] not in stored)
+    assert only.probe(child) is not None
+    assert only.lookup(missing) is None
+
+
+def test_self_play_book_keeps_the_best_win_rate(tmp_path):
+    root = BitBoard()
+    first, second = root.plies()[0], root.plies()[-1]
+
+    builder = BookBuilder()
+    # White (result 0) wins twice out of three with the first ply, never with the second
+    for ply, result in ((first, 0), (first, 0), (first, 1), (second, 1)):
+        builder.add_record(GameRecord(bytes([encode_squares(*ply)]), result), plies=1)
+
+    path = str(tmp_path / "games.book")
+    assert builder.write(path) == 1
+    assert builder.write(path, min_games=4) == 0
+    builder.write(path)
+
+    ply, score, games, wins = OpeningBook(path).lookup(root)
+    assert ply == first
+    assert (score, games, wins) == (0, 3, 2)
+
+
+def test_opened_on_the_first_probe(tmp_path):
+    path = tmp_path / "bad.book"
+    path.write_bytes(b"\x00" * 32)
+    book = OpeningBook(str(path))
+    with pytest.raises(ValueError):
+        book.probe(BitBoard())
@@ -0,0 +1,113 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import pytest
+from Bitboard import SIZE, SYMBOLS
+from Board import Board
+from Memento import Caretaker, GameState, Originator
+from MoveSet import _full
+from Player import PlayerFactory
+from Position import Position
+
+
+def _played(seed, interval):
+    """
+    A random game recorded by a Caretaker, with the Position after every
+    turn read from the live state as it was played.
+    """
+
+    rng = random.Random(seed)
+    board = Board()
+    white = PlayerFactory.get_factory("white", "random", board)
+    blue = PlayerFactory.get_factory("blue", "random", board)
+    state = GameState(1, white.workers, blue.workers, board.grid)
+    board._update_state(state)
+    originator = Originator(state)
+    caretaker = Caretaker(originator, interval)
+
+    positions = [Position.from_state(state)]
+    while True:
+        bitboard = board.bitboard()
+        plies = bitboard.plies()
+        if not plies or bitboard.has_won(bitboard.side ^ 1):
+            break
+        w, frm, to, build = rng.choice(plies)
+        origin, move, build = divmod(frm, SIZE), divmod(to, SIZE), divmod(build, SIZE)
+        state.get_worker_by_symbol(SYMBOLS[w]).position = move
+        board.build(build)
+        caretaker.backup(originator.record(SYMBOLS[w], origin, move, build))
+        positions.append(Position.from_state(state))
+
+    return state, caretaker, positions
+
+
+def _check(state, positions, index):
+    position = Position.from_state(state)
+    assert position == positions[index]
+    assert position.turn == positions[index].turn == index + 1
+    assert state.key() == positions[index].key
+    for w in range(4):
+        assert state.moves.possibilities(w) == _full(state, w)
+    for symbol in SYMBOLS:
+        worker = state.get_worker_by_symbol(symbol)
+        assert state.get_worker_by_position(worker.position) is worker
+
+
+@pytest.mark.parametrize("interval", [0, 1, 4])
+def test_undo_and_redo_walk_back_and_forth(interval):
+    state, caretaker, positions = _played(0, interval)
+    last = len(positions) - 1
+
+    while caretaker.cursor:
+        caretaker.undo()
+        _check(state, positions, caretaker.cursor)
+    caretaker.undo()
+    _check(state, positions, 0)
+
+    while caretaker.cursor < last:
+        caretaker.redo()
+        _check(state, positions, caretaker.cursor)
+    caretaker.redo()
+    _check(state, positions, last)
+
+
+@pytest.mark.parametrize("interval", [0, 3, 8])
+def test_goto_reaches_every_turn(interval):
+    rng = random.Random(interval)
+    state, caretaker, positions = _played(1, interval)
+    for index in [rng.randrange(len(positions)) for _ in range(40)] + [0, len(positions) - 1]:
+        caretaker.goto(index)
+        assert caretaker.cursor == index
+        _check(state, positions, index)
+
+
+def test_keyframes_hold_the_positions_played():
+    state, caretaker, positions = _played(2, 4)
+    assert set(caretaker._keyframes) == set(range(0, len(positions), 4))
+    for index, keyframe in caretaker._keyframes.items():
+        assert keyframe.get_position() == positions[index]
+        assert keyframe.get_turn() == index + 1
+
+
+def test_a_new_turn_discards_the_undone_ones():
+    state, caretaker, positions = _played(3, 4)
+    caretaker.goto(5)
+    symbol = SYMBOLS[0 if state.turn % 2 else 2]
+    worker = state.get_worker_by_symbol(symbol)
+    origin = worker.position
+    move, builds = next(iter(state.moves.possibilities(SYMBOLS.index(symbol)).items()))
+    build = sorted(builds)[0]
+
+    worker.position = move
+    state.grid.get_cell(build).upgrade()
+    state.built(build)
+    caretaker.backup(caretaker._originator.record(symbol, origin, move, build))
+    played = Position.from_state(state)
+
+    assert len(caretaker) == caretaker.cursor == 6
+    assert set(caretaker._keyframes) <= {0, 4}
+    caretaker.redo()
+    assert Position.from_state(state) == played
+    caretaker.goto(0)
+    caretaker.goto(6)
+    assert Position.from_state(state) == played
@@ -0,0 +1,63 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import pytest
+from Bitboard import POSITIONS, SYMBOLS
+from conftest import random_games
+from notation import from_position, to_board
+from perft import REFERENCE_POSITIONS, strategy_count
+
+
+@pytest.mark.parametrize(
+    "name, position, expected", REFERENCE_POSITIONS, ids=[p[0] for p in REFERENCE_POSITIONS]
+)
+def test_strategy_count_matches_bitboard(name, position, expected):
+    # -1 would mean the lazy enumeration or count_moves disagreed with the map
+    assert strategy_count(position) == expected[1]
+
+
+def test_lazy_plies_match_the_list():
+    rng = random.Random(0)
+    for game in random_games(4):
+        for position in game[::3]:
+            bitboard = position.to_bitboard()
+            for side in (0, 1):
+                plies = bitboard.plies(side)
+                assert sorted(bitboard.iter_plies(side)) == sorted(plies)
+                assert bitboard.count_plies(side) == len(plies)
+
+                # The order is followed: here every worker, destination and build reversed
+                reverse = bitboard.iter_plies(side, lambda items: items[::-1])
+                assert list(reverse) == sorted(plies, reverse=True)
+
+                shuffled = list(bitboard.iter_plies(side, lambda items: rng.sample(items, len(items))))
+                assert sorted(shuffled) == sorted(plies)
+
+
+def test_board_moves_match_the_bitboard():
+    for game in random_games(3, seed=1):
+        for position in game[::4]:
+            board = to_board(from_position(position))
+            bitboard = position.to_bitboard()
+            state = board.state
+            for side, workers in enumerate((state.white_workers, state.blue_workers)):
+                expected = sorted(
+                    (w, POSITIONS[to], POSITIONS[build]) for w, _, to, build in bitboard.plies(side)
+                )
+                moves = sorted(
+                    (SYMBOLS.index(worker.symbol), move, build)
+                    for worker, move, build in board.moves(workers)
+                )
+                assert moves == expected
+                assert board.count_moves(workers) == len(expected)
+                assert board.has_any_move(workers) == bool(expected)
+
+
+def test_lazy_moves_can_be_taken_one_at_a_time():
+    board = to_board(from_position(random_games(1)[0][4]))
+    workers = board.state.white_workers
+    moves = board.moves(workers)
+    worker, move, build = next(moves)
+    assert worker in workers
+    assert build in board.possibilities(worker)[move]
+    moves.close()
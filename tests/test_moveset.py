@@ -0,0 +1,67 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+from Bitboard import BitBoard, SYMBOLS
+from Board import Board
+from Memento import Caretaker, GameState, Originator
+from MoveSet import _full
+from Player import PlayerFactory
+
+
+def test_incremental_possibilities_match_full_rebuild():
+    """
+    Random games through GameState and the Originator, undoing, redoing and
+    jumping back through keyframes now and then: the incremental MoveSet and
+    its bitboard must match a full rebuild every turn.
+    """
+
+    rng = random.Random(0)
+    for _ in range(30):
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+        originator = Originator(state)
+        caretaker = Caretaker(originator, keyframe_interval=8)
+        moves = state.moves
+
+        while True:
+            side = 0 if state.turn % 2 else 1
+            found = [moves.possibilities(w) for w in (2 * side, 2 * side + 1)]
+            assert found == [_full(state, w) for w in (2 * side, 2 * side + 1)]
+
+            packed = BitBoard.from_grid(
+                state.grid, state.white_workers, state.blue_workers, state.turn
+            )
+            mirror = board.bitboard()
+            assert mirror == packed
+            assert mirror.hash == packed.hash
+            assert moves.count(side) == sum(
+                len(builds) for possibilities in found for builds in possibilities.values()
+            )
+
+            if not any(found) or mirror.has_won(side ^ 1):
+                break
+
+            if caretaker.cursor and rng.random() < 0.2:
+                chance = rng.random()
+                if chance < 0.2:
+                    caretaker.goto(rng.randrange(caretaker.cursor))
+                else:
+                    caretaker.undo()
+                    if chance < 0.6:
+                        caretaker.redo()
+                continue
+
+            w = 2 * side + rng.randrange(2)
+            if not found[w % 2]:
+                w ^= 1
+            worker = state.get_worker_by_symbol(SYMBOLS[w])
+            origin = worker.position
+            move = rng.choice(sorted(found[w % 2]))
+            build = rng.choice(sorted(found[w % 2][move]))
+
+            worker.position = move
+            board.build(build)
+            caretaker.backup(originator.record(SYMBOLS[w], origin, move, build))
@@ -0,0 +1,72 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+from Bitboard import SYMBOLS, square
+from conftest import random_games
+from notation import (
+    START,
+    dump,
+    from_board,
+    from_position,
+    from_state,
+    parse,
+    to_bitboard,
+    to_board,
+    to_position,
+    to_state,
+)
+
+
+def test_start_position():
+    levels, positions, turn = parse(START)
+    assert levels == bytes(25)
+    assert positions == ((3, 1), (1, 3), (1, 1), (3, 3))
+    assert turn == 1
+    assert dump(levels, positions, turn) == START
+
+
+def test_separators_and_default_turn():
+    assert parse("01201/01321/02001/00123/00041_A22B02Y41Z14_b") == parse(
+        "01201/01321/02001/00123/00041 A22B02Y41Z14 b 2"
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "00000/00000/00000/00000/0000 A31B13Y11Z33 w",
+        "00000/00000/00000/00000/00005 A31B13Y11Z33 w",
+        "00000/00000/00000/00000/00000 B31A13Y11Z33 w",
+        "00000/00000/00000/00000/00000 A31B31Y11Z33 w",
+        "00000/00000/00000/00000/00000 A31B13Y11Z53 w",
+        "00000/00000/00000/00000/00000 A31B13Y11Z33 x",
+        "00000/00000/00000/00000/00000 A31B13Y11Z33 w 2",
+        "00000/00000/00000/00000/00000 A31B13Y11Z33 b 0",
+    ],
+)
+def test_invalid_positions(text):
+    with pytest.raises(ValueError):
+        parse(text)
+
+
+def test_round_trip_of_played_positions():
+    for positions in random_games(20):
+        for position in positions:
+            text = from_position(position)
+            assert to_position(text) == position
+            assert to_position(text).turn == position.turn
+            assert from_state(to_state(text)) == text
+            assert from_board(to_board(text)) == text
+
+
+def test_state_and_bitboard_agree():
+    for positions in random_games(5, seed=1):
+        for position in positions:
+            text = from_position(position)
+            state = to_state(text)
+            bitboard = to_bitboard(text)
+            assert bitboard.hash == state.key()
+            assert list(bitboard.workers) == [
+                square(state.get_worker_by_symbol(symbol).position) for symbol in SYMBOLS
+            ]
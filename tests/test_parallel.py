@@ -0,0 +1,50 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+from conftest import random_games
+from notation import to_bitboard
+from Parallel import ParallelAlphaBeta
+from perft import REFERENCE_POSITIONS
+from Search import AlphaBeta
+from simulate import simulate
+from Strategy import MinimaxStrategy
+
+
+def _positions():
+    # The reference positions a side can move in, and positions from random games
+    fixed = [to_bitboard(position) for _, position, expected in REFERENCE_POSITIONS if expected[1]]
+    played = [p.to_bitboard() for positions in random_games(3, seed=5) for p in positions[2:-1:5]]
+    return fixed + played
+
+
+@pytest.mark.parametrize("depth", [2, 3])
+def test_parallel_and_serial_alpha_beta_agree(depth):
+    search = ParallelAlphaBeta(depth, jobs=2, tt_mb=1)
+    try:
+        for bitboard in _positions():
+            expected = AlphaBeta(depth).score(bitboard, depth, -10 * AlphaBeta.WIN, 10 * AlphaBeta.WIN)
+            ply, score = search.search(bitboard)
+            if abs(expected) >= AlphaBeta.WIN:
+                assert (score > 0) == (expected > 0)
+            else:
+                assert score == expected
+                bitboard.make(ply)
+                assert -AlphaBeta(depth).score(bitboard, depth - 1, -10 * AlphaBeta.WIN, 10 * AlphaBeta.WIN) == score
+                bitboard.unmake(ply)
+    finally:
+        search.close()
+    assert search._pool is None
+
+
+def test_simulate_passes_jobs_to_the_strategies(monkeypatch):
+    created = []
+    init = MinimaxStrategy.__init__
+
+    def spy(self, *args, **options):
+        created.append(options.get("jobs"))
+        init(self, *args, **options)
+
+    monkeypatch.setattr(MinimaxStrategy, "__init__", spy)
+    summary, _ = simulate("minimax", "heuristic", games=1, pool=1, depth=1, jobs=1)
+    assert summary["games"] == 1
+    assert created and set(created) == {1}
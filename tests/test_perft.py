@@ -0,0 +1,34 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+from notation import to_bitboard
+from perft import REFERENCE_POSITIONS, divide, perft
+
+# Deeper counts take seconds each, they are left to python perft.py --check
+MAX_NODES = 500000
+
+CASES = [
+    (name, position, depth, count)
+    for name, position, expected in REFERENCE_POSITIONS
+    for depth, count in sorted(expected.items())
+    if count <= MAX_NODES
+]
+
+
+@pytest.mark.parametrize("name, position, depth, count", CASES, ids=[f"{c[0]}-{c[2]}" for c in CASES])
+def test_perft_matches_reference_counts(name, position, depth, count):
+    assert perft(to_bitboard(position), depth) == count
+
+
+@pytest.mark.parametrize(
+    "name, position, expected", REFERENCE_POSITIONS[:3], ids=[p[0] for p in REFERENCE_POSITIONS[:3]]
+)
+def test_divide_sums_to_perft(name, position, expected):
+    assert sum(divide(to_bitboard(position), 2).values()) == expected[2]
+
+
+def test_board_unchanged_by_perft():
+    bitboard = to_bitboard(REFERENCE_POSITIONS[1][1])
+    before = bitboard.pack(), bitboard.hash
+    perft(bitboard, 3)
+    assert (bitboard.pack(), bitboard.hash) == before
@@ -0,0 +1,53 @@
+# Anton Melnychuk & Oliver Li
+
+import pickle
+import random
+from Bitboard import SIZE, SYMBOLS
+from Board import Board
+from Memento import GameState
+from Player import PlayerFactory
+from Position import Position
+
+
+def test_play_matches_the_played_state():
+    rng = random.Random(0)
+    for _ in range(30):
+        board = Board()
+        white = PlayerFactory.get_factory("white", "random", board)
+        blue = PlayerFactory.get_factory("blue", "random", board)
+        state = GameState(1, white.workers, blue.workers, board.grid)
+        board._update_state(state)
+        position = Position.from_state(state)
+
+        while True:
+            side = 0 if state.turn % 2 else 1
+            plies = board.bitboard().plies(side)
+            if not plies or board.bitboard().has_won(side ^ 1):
+                break
+
+            w, _, to, build = rng.choice(plies)
+            move, build = divmod(to, SIZE), divmod(build, SIZE)
+            child = position.play(SYMBOLS[w], move, build)
+
+            state.get_worker_by_symbol(SYMBOLS[w]).position = move
+            board.build(build)
+            state.turn += 1
+
+            expected = Position.from_state(state)
+            assert child == expected
+            assert hash(child) == hash(expected)
+            assert child.turn == expected.turn
+            assert child.key == state.key()
+            assert pickle.loads(pickle.dumps(child)) == child
+            assert Position.from_state(child.to_state()) == child
+            position = child
+
+
+def test_parent_is_unchanged_by_play():
+    position = Position(bytes(25), ((3, 1), (1, 3), (1, 1), (3, 3)), 1)
+    child = position.play("A", (2, 1), (2, 2))
+    assert position.workers[0] == (3, 1)
+    assert bytes(position.levels) == bytes(25)
+    assert child.workers[0] == (2, 1)
+    assert child.levels[12] == 1
+    assert child != position
@@ -0,0 +1,98 @@
+# Anton Melnychuk & Oliver Li
+
+import random
+import pytest
+from Bitboard import POSITIONS, SYMBOLS
+from DirectionUtils import DirectionUtils
+from Record import (
+    MAGIC,
+    UNFINISHED,
+    GameRecord,
+    RecordReader,
+    RecordWriter,
+    decode_ply,
+    decode_squares,
+    encode_ply,
+    encode_squares,
+)
+from notation import START, to_bitboard
+
+
+def _random_record(rng):
+    """Plays a random game on a BitBoard, returning its record and its plies."""
+    bitboard = to_bitboard(START)
+    plies = []
+    while True:
+        if bitboard.has_won(bitboard.side ^ 1):
+            winner = ("white", "blue")[bitboard.side ^ 1]
+            break
+        moves = bitboard.plies()
+        if not moves:
+            winner = ("white", "blue")[bitboard.side ^ 1]
+            break
+        ply = rng.choice(moves)
+        bitboard.make(ply)
+        plies.append(ply)
+    return GameRecord.from_winner(bytes(encode_squares(*ply) for ply in plies), winner), plies
+
+
+def test_every_byte_round_trips():
+    for code in range(256):
+        assert encode_ply(*decode_ply(code)) == code
+
+
+def test_squares_and_directions_agree():
+    # Two steps from the centre never leave the board
+    centre = [12] * 4
+    for w, symbol in enumerate(SYMBOLS):
+        for move in DirectionUtils.DIRECTIONS:
+            for build in DirectionUtils.DIRECTIONS:
+                code = encode_ply(symbol, move, build)
+                _, frm, to, square = decode_squares(code, centre)
+                target = DirectionUtils.move_result(POSITIONS[frm], move)
+                assert POSITIONS[to] == target
+                assert POSITIONS[square] == DirectionUtils.move_result(target, build)
+                assert encode_squares(w, frm, to, square) == code
+
+
+def test_winner():
+    assert GameRecord.from_winner(b"", "blue").winner == "blue"
+    assert GameRecord.from_winner(b"").result == UNFINISHED
+    assert GameRecord.from_winner(b"").winner is None
+
+
+def test_file_round_trip_replays_the_games(tmp_path):
+    rng = random.Random(0)
+    games = [_random_record(rng) for _ in range(20)]
+    games.append((GameRecord(b""), []))
+
+    path = str(tmp_path / "games.rec")
+    with RecordWriter(path) as writer:
+        for record, _ in games[:10]:
+            writer.write(record)
+    # A second writer appends to the same file without a second header
+    with RecordWriter(path) as writer:
+        for record, _ in games[10:]:
+            writer.write(record)
+
+    with open(path, "rb") as file:
+        assert file.read(len(MAGIC)) == MAGIC
+
+    read = list(RecordReader(path, buffer_size=64))
+    assert len(read) == len(games)
+    for found, (record, plies) in zip(read, games):
+        assert found.plies == record.plies
+        assert found.result == record.result
+
+        bitboard = to_bitboard(START)
+        for code, ply in zip(found.plies, plies):
+            assert decode_squares(code, bitboard.workers) == ply
+            bitboard.make(ply)
+
+
+@pytest.mark.parametrize("data", [b"", b"NOPE!", MAGIC + b"\x05", MAGIC + b"\x05\x00\x00\x01"])
+def test_invalid_files(tmp_path, data):
+    path = tmp_path / "bad.rec"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        list(RecordReader(str(path)))
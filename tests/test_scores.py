@@ -0,0 +1,57 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+import Board as board_module
+from Board import ScoreCalculator
+from conftest import random_games
+from notation import from_position, to_board
+
+COLORS = ("white", "blue", "heuristic")
+
+
+def _baseline(board, symbol, color, position):
+    """check_score as it was: the worker is moved, scored and moved back."""
+    state = board.state
+    workers_positions = state.get_workers_pos_by_symbol(symbol)
+    worker = state.get_worker_by_symbol(symbol)
+    previous = worker.position
+    worker.position = position
+    try:
+        return board._score.score(workers_positions, color)
+    finally:
+        worker.position = previous
+
+
+def _cases(games, seed):
+    """(board, candidates) of the side to move in positions of random games."""
+    for positions in random_games(games, seed):
+        for position in positions[:-1]:
+            board = to_board(from_position(position))
+            workers = board.state.white_workers if position.turn % 2 else board.state.blue_workers
+            candidates = [
+                (worker.symbol, move) for worker in workers for move in board.possibilities(worker)
+            ]
+            if candidates:
+                yield board, candidates
+
+
+def _check(games, seed):
+    compared = 0
+    for board, candidates in _cases(games, seed):
+        for color in COLORS:
+            expected = [_baseline(board, symbol, color, move) for symbol, move in candidates]
+            assert board.check_scores(candidates, color) == expected
+            compared += len(candidates)
+    return compared
+
+
+def test_lookup_scores_match_the_baseline(monkeypatch):
+    monkeypatch.setattr(board_module, "np", None)
+    assert _check(10, 0) > 1000
+
+
+def test_numpy_scores_match_the_baseline(monkeypatch):
+    pytest.importorskip("numpy")
+    # Every batch, not only the large ones, goes through NumPy
+    monkeypatch.setattr(ScoreCalculator, "NUMPY_MIN_BATCH", 1)
+    assert _check(10, 1) > 1000
@@ -0,0 +1,145 @@
+# Anton Melnychuk & Oliver Li
+
+import time
+import pytest
+from Bitboard import BITS
+from conftest import random_games
+from main import SantoriniGame
+from notation import to_bitboard
+from Search import AlphaBeta
+from threats import safe_plies
+from Transposition import TranspositionTable
+
+WIN = AlphaBeta.WIN
+INFINITY = 10 * WIN
+
+
+def _negamax(frontier, bitboard, depth):
+    """
+    Full-width negamax on the node rules of AlphaBeta._negamax: no window,
+    no transposition table and no move ordering. The frontier is scored by
+    AlphaBeta._frontier with an infinite window, which never cuts off.
+    """
+
+    if depth == 1:
+        return frontier._frontier(bitboard, -INFINITY, INFINITY)
+
+    plies = bitboard.plies()
+    if not plies:
+        return -WIN - depth
+    top = bitboard.planes[2]
+    if any(top & BITS[ply[2]] for ply in plies):
+        return WIN + depth
+    plies = safe_plies(bitboard, plies)
+    if not plies:
+        return -WIN - depth + 1
+
+    best = -INFINITY
+    for ply in plies:
+        bitboard.make(ply)
+        best = max(best, -_negamax(frontier, bitboard, depth - 1))
+        bitboard.unmake(ply)
+    return best
+
+
+def _positions(games, seed, step):
+    # Positions from the middle of random games, where a search has choices
+    return [
+        position.to_bitboard()
+        for positions in random_games(games, seed)
+        for position in positions[2:-1:step]
+    ]
+
+
+@pytest.mark.parametrize("depth, games", [(2, 6), (3, 2)])
+@pytest.mark.parametrize("tt_mb", [0, 1])
+def test_alpha_beta_matches_full_width_negamax(depth, games, tt_mb):
+    table = TranspositionTable(tt_mb) if tt_mb else None
+    search = AlphaBeta(depth, table)
+    for bitboard in _positions(games, depth, 4):
+        expected = _negamax(AlphaBeta(depth), bitboard.copy(), depth)
+        before = bitboard.pack(), bitboard.hash
+
+        # score() searches the full depth at once, win distances included
+        assert search.score(bitboard, depth, -INFINITY, INFINITY) == expected
+
+        # search() deepens and stops at the first proven win or loss
+        ply, score = search.search(bitboard)
+        if abs(expected) >= WIN:
+            assert abs(score) >= WIN and (score > 0) == (expected > 0)
+        else:
+            assert score == expected
+            bitboard.make(ply)
+            assert -_negamax(AlphaBeta(depth), bitboard, depth - 1) == expected
+            bitboard.unmake(ply)
+        assert (bitboard.pack(), bitboard.hash) == before
+
+
+def test_nodes_count_the_root():
+    bitboard = to_bitboard("01201/01321/02001/00123/00041 A22B02Y41Z14 b")
+    search = AlphaBeta(1)
+    search.search(bitboard)
+    # The root and one depth 0 node per root ply searched
+    assert search.nodes == 1 + len(safe_plies(bitboard, bitboard.plies()) or bitboard.plies())
+
+
+def test_no_move_and_immediate_win():
+    trapped = to_bitboard("04040/44044/00000/00000/00000 A00B04Y22Z33 w")
+    assert AlphaBeta(3).search(trapped) == (None, -WIN)
+
+    climb = to_bitboard("12300/02100/40000/32100/00012 A01B23Y00Z44 w")
+    ply, score = AlphaBeta(3).search(climb)
+    assert climb.planes[2] & BITS[ply[2]]
+    assert score == WIN + 3
+
+
+@pytest.mark.parametrize("tt_mb", [0, 16])
+def test_minimax_strategy_plays_the_winning_climb(tt_mb):
+    game = SantoriniGame(
+        "minimax",
+        "random",
+        "off",
+        "off",
+        {"position": "12300/02100/40000/32100/00012 A01B23Y00Z44 w", "depth": 3, "tt_mb": tt_mb},
+    )
+    game._current.update_possibilities()
+    game._execute_command()
+    assert game._board.bitboard().has_won(0)
+    report = game._white.strategy.report()
+    assert report["nodes"] >= 1
+
+
+def test_deepen_always_completes_depth_one():
+    search = AlphaBeta(4, TranspositionTable(1))
+    for bitboard in _positions(2, 5, 6):
+        before = bitboard.pack()
+        ply, score = search.deepen(bitboard, 0)
+        assert search.completed == 1
+        assert ply in bitboard.plies()
+        assert score == AlphaBeta(1).search(bitboard)[1]
+        assert bitboard.pack() == before
+
+
+@pytest.mark.parametrize("seconds", [0.05, 0.2])
+def test_deepen_respects_the_budget(seconds):
+    # Open enough that depth 8 takes far longer than the budget
+    bitboard = to_bitboard("01201/01021/02001/00120/00001 A22B02Y41Z14 w")
+    search = AlphaBeta(8, TranspositionTable(1))
+    before = bitboard.pack(), bitboard.hash
+
+    start = time.perf_counter()
+    ply, _ = search.deepen(bitboard, seconds)
+    elapsed = time.perf_counter() - start
+
+    # An iteration gives up at its next node past the deadline
+    assert elapsed < seconds + 0.25
+    assert 1 <= search.completed < 8
+    assert ply in bitboard.plies()
+    assert (bitboard.pack(), bitboard.hash) == before
+
+
+def test_deepen_stops_at_max_depth():
+    bitboard = to_bitboard("01201/01021/02001/00120/00001 A22B02Y41Z14 w")
+    search = AlphaBeta(2)
+    assert search.deepen(bitboard, 60, 2) == AlphaBeta(2).search(bitboard)
+    assert search.completed == 2
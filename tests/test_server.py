@@ -0,0 +1,70 @@
+# Anton Melnychuk & Oliver Li
+
+import asyncio
+import server
+from cli import SantoriniCLI
+from notation import START, to_bitboard
+from profiler import s_profiler
+from server import OPTIONS_PROMPT, GameServer, _search_turn
+
+
+async def _play(path, options):
+    """Plays one game as a client that only ever answers the restart prompt, returns the lines sent."""
+
+    reader, writer = await asyncio.open_unix_connection(path)
+    assert (await reader.readline()).decode() == OPTIONS_PROMPT
+    writer.write(f"{options}\n".encode())
+
+    lines = []
+    while True:
+        line = (await asyncio.wait_for(reader.readline(), 30)).decode()
+        assert line, "the server closed the session"
+        lines.append(line)
+        if line == SantoriniCLI.RESTART_PROMPT:
+            writer.write(b"no\n")
+            break
+
+    await writer.drain()
+    writer.close()
+    return lines
+
+
+def test_sessions_search_in_the_process_pool(tmp_path):
+    path = str(tmp_path / "santorini.sock")
+
+    async def run():
+        game_server = GameServer(workers=2, timeout=60, max_depth=2)
+        listener = await game_server.start(unix=path)
+        try:
+            async with listener:
+                # Two sessions at once, one searching with minimax and one timed by MCTS
+                return await asyncio.gather(
+                    _play(path, "minimax random off off --depth=1 --profile=1"),
+                    _play(path, "random mcts off off --move-time=0.01"),
+                )
+        finally:
+            game_server.close()
+
+    for lines in asyncio.run(run()):
+        assert lines[-2].endswith(" has won\n")
+        assert any(line.count(",") == 2 for line in lines)
+
+    # A client cannot turn the server's profiler on
+    assert not s_profiler.enabled
+
+
+def test_search_turn_keeps_a_strategy_per_options():
+    server._strategies.clear()
+    bitboard = to_bitboard(START)
+    options = (("depth", 2),)
+
+    ply, counters = _search_turn("white", "minimax", options, None, bitboard.pack())
+    assert ply in bitboard.plies()
+    assert counters["nodes"] > 0
+
+    # Timed by the budget sent along, on the same strategy and its table
+    ply, counters = _search_turn("white", "minimax", options, 0.01, bitboard.pack())
+    assert ply in bitboard.plies()
+    assert counters["depth"] >= 1
+    assert counters["tt_probes"] > 0
+    assert len(server._strategies) == 1
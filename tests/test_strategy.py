@@ -0,0 +1,61 @@
+# Anton Melnychuk & Oliver Li
+
+from Board import ScoreCalculator
+from profiler import s_profiler
+from simulate import HeadlessGame
+
+
+def test_counters_are_keyed_by_side_and_type():
+    s_profiler.reset()
+    game = HeadlessGame("minimax", "minimax", {"depth": 1, "profile": 1})
+    try:
+        game.play()
+    finally:
+        game.close()
+        s_profiler.enable(False)
+
+    counters = s_profiler.data()["counters"]
+    assert counters["white.minimax.searches"] + counters["blue.minimax.searches"] > 0
+    assert counters["white.minimax.nodes"] == game.reports()["white"]["nodes"]
+    assert counters["blue.minimax.nodes"] == game.reports()["blue"]["nodes"]
+
+
+def test_heuristic_scores_distances_as_the_baseline(monkeypatch):
+    colors = []
+    check_scores = ScoreCalculator.check_scores
+
+    def spy(self, candidates, color):
+        colors.append(color)
+        return check_scores(self, candidates, color)
+
+    monkeypatch.setattr(ScoreCalculator, "check_scores", spy)
+    game = HeadlessGame("heuristic", "heuristic")
+    game.play()
+    assert colors and set(colors) == {"heuristic"}
+
+
+def test_search_budget_follows_the_clock():
+    game = HeadlessGame("minimax", "random", {"move_time": 0.05, "game_time": 0.4})
+    strategy = game._white.strategy
+    assert strategy._budget() == 0.4 / strategy.MOVES_TO_GO
+
+    strategy._clock = 30.0
+    assert strategy._budget() == 0.05
+    strategy._clock = -1.0
+    assert strategy._budget() == 0.0
+
+    untimed = HeadlessGame("minimax", "random", {"depth": 1})
+    assert untimed._white.strategy._budget() is None
+
+
+def test_timed_search_spends_the_clock():
+    game = HeadlessGame("minimax", "random", {"move_time": 0.02, "game_time": 2.0})
+    strategy = game._white.strategy
+    game._current.update_possibilities()
+    game._execute_command()
+
+    report = strategy.report()
+    assert report["searches"] == 1
+    assert report["depth"] >= 1
+    assert 2.0 - strategy._clock >= report["seconds"]
+    assert strategy._clock > 2.0 - 0.02 - 0.25
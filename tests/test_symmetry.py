@@ -0,0 +1,90 @@
+# Anton Melnychuk & Oliver Li
+
+import pytest
+from Bitboard import BitBoard, BITS, CELLS, POSITIONS, SIZE
+from DirectionUtils import DirectionUtils
+from conftest import random_games
+from symmetry import (
+    IDENTITY,
+    INVERSE,
+    SQUARE_MAPS,
+    canonical,
+    restore_ply,
+    transform,
+    transform_direction,
+    transform_mask,
+    transform_ply,
+)
+
+
+def _unordered(bitboard):
+    a, b, y, z = bitboard.workers
+    return tuple(bitboard.planes), frozenset((a, b)), frozenset((y, z)), bitboard.side
+
+
+@pytest.fixture(scope="module")
+def bitboards():
+    return [position.to_bitboard() for game in random_games(6) for position in game]
+
+
+def test_square_maps_are_the_eight_symmetries():
+    assert len(set(SQUARE_MAPS)) == 8
+    assert SQUARE_MAPS[IDENTITY] == tuple(range(CELLS))
+    for t in range(8):
+        assert sorted(SQUARE_MAPS[t]) == list(range(CELLS))
+        assert [SQUARE_MAPS[INVERSE[t]][sq] for sq in SQUARE_MAPS[t]] == list(range(CELLS))
+        # Neighbours stay neighbours
+        for sq, (row, col) in enumerate(POSITIONS):
+            for direction in DirectionUtils.DIRECTIONS:
+                target = DirectionUtils.move_result((row, col), direction)
+                if not (0 <= target[0] < SIZE and 0 <= target[1] < SIZE):
+                    continue
+                mapped = POSITIONS[SQUARE_MAPS[t][target[0] * SIZE + target[1]]]
+                moved = DirectionUtils.move_result(POSITIONS[SQUARE_MAPS[t][sq]], transform_direction(t, direction))
+                assert mapped == moved
+
+
+def test_transform_mask_moves_every_bit():
+    for t in range(8):
+        for sq in range(CELLS):
+            assert transform_mask(t, BITS[sq]) == BITS[SQUARE_MAPS[t][sq]]
+        assert transform_mask(t, (1 << CELLS) - 1) == (1 << CELLS) - 1
+
+
+def test_all_eight_images_share_the_canonical_key(bitboards):
+    for bitboard in bitboards:
+        key, t = canonical(bitboard)
+        images = [transform(bitboard, u) for u in range(8)]
+        assert {canonical(image)[0] for image in images} == {key}
+
+        # The transform returned maps the position onto the canonical one
+        assert canonical(images[t]) == (key, IDENTITY)
+        assert transform(images[t], INVERSE[t]) == bitboard
+
+
+def test_swapped_workers_share_the_key(bitboards):
+    for bitboard in bitboards[:50]:
+        a, b, y, z = bitboard.workers
+        swapped = BitBoard(list(bitboard.planes), [b, a, z, y], bitboard.side)
+        assert canonical(swapped)[0] == canonical(bitboard)[0]
+
+
+def test_different_positions_have_different_keys(bitboards):
+    keys = {}
+    for bitboard in bitboards:
+        images = {_unordered(transform(bitboard, t)) for t in range(8)}
+        key = canonical(bitboard)[0]
+        keys.setdefault(key, images)
+        assert keys[key] == images
+
+
+def test_plies_map_onto_the_image_and_back(bitboards):
+    for bitboard in bitboards[::5]:
+        plies = bitboard.plies()
+        for t in range(8):
+            image = transform(bitboard, t)
+            assert sorted(transform_ply(t, ply) for ply in plies) == sorted(image.plies())
+
+        _, t = canonical(bitboard)
+        image = transform(bitboard, t)
+        assert sorted(restore_ply(bitboard, t, ply) for ply in image.plies()) == sorted(plies)
@@ -0,0 +1,141 @@
+# Anton Melnychuk & Oliver Li
+
+from Bitboard import BITS, NEIGHBOURS, square
+from conftest import random_games
+from notation import START, to_bitboard
+from threats import (
+    blocking_builds,
+    climbing,
+    forced_win,
+    safe_builds,
+    safe_plies,
+    winning_moves,
+    winning_workers,
+)
+
+# Blue's Y stands on level 2 next to a level 3 square: white has to dome it
+THREAT = "23000/00000/00000/00000/00000 A12B44Y00Z40 w"
+
+# Y threatens two level 3 squares at once: no build can stop both
+DOUBLE_THREAT = "23000/30000/00000/00000/00000 A22B44Y00Z40 w"
+
+# Y could climb onto a level 2 square that a build would raise to level 3
+RAISE = "20000/02000/00000/00000/00000 A22B44Y00Z40 w"
+
+# Moving A next to Y boxes in the last blue worker that could still move
+STALEMATE = "04000/40000/00000/00044/00040 A22B20Y00Z44 w"
+
+# Stepping A up to level 2 threatens a level 3 square blue cannot reach
+CLIMB = "00000/00003/00120/00002/00000 A22B40Y00Z42 w"
+
+# Z can dome that square, unless A also raises the level 2 square next to it
+DEFENDED = "00000/00003/00120/00002/00000 A22B40Y00Z24 w"
+BLOCKED = "00000/00003/00120/00000/00000 A22B40Y00Z24 w"
+
+
+def _safe_builds_after(bitboard, w, to):
+    frm = bitboard.step(w, to)
+    mask = safe_builds(bitboard, w)
+    bitboard.step(w, frm)
+    return mask
+
+
+def test_climbing():
+    bitboard = to_bitboard(THREAT)
+    assert climbing(bitboard, 1) == NEIGHBOURS[square((0, 0))]
+    assert climbing(bitboard, 0) == 0
+    assert climbing(to_bitboard(START), 0) == climbing(to_bitboard(START), 1) == 0
+    assert climbing(to_bitboard(CLIMB), 0) == 0
+
+
+def test_threat_must_be_blocked():
+    bitboard = to_bitboard(THREAT)
+    threat = BITS[square((0, 1))]
+    assert winning_moves(bitboard, 1) == threat
+    assert winning_workers(bitboard, 1) == (2,)
+    assert blocking_builds(bitboard) == threat
+
+    # Only a move next to the threat can dome it
+    assert _safe_builds_after(bitboard, 0, square((1, 1))) == threat
+    assert _safe_builds_after(bitboard, 0, square((2, 2))) == 0
+
+    plies = safe_plies(bitboard)
+    assert plies
+    assert {ply[3] for ply in plies} == {square((0, 1))}
+    assert set(plies) == {ply for ply in bitboard.plies() if ply[3] == square((0, 1))}
+    assert forced_win(bitboard) is None
+
+
+def test_move_with_no_safe_build():
+    bitboard = to_bitboard(DOUBLE_THREAT)
+    for to in (square((1, 1)), square((2, 1)), square((3, 3))):
+        assert _safe_builds_after(bitboard, 0, to) == 0
+    assert bitboard.plies()
+    assert safe_plies(bitboard) == []
+
+    # Without a threat yet, only raising the level 2 square next to Y is unsafe
+    bitboard = to_bitboard(RAISE)
+    to = square((2, 1))
+    builds = bitboard.build_mask(0, to)
+    assert _safe_builds_after(bitboard, 0, to) == builds & ~BITS[square((1, 1))]
+    assert all(ply[3] != square((1, 1)) for ply in safe_plies(bitboard))
+    assert len(safe_plies(bitboard)) < len(bitboard.plies())
+
+
+def test_safe_plies_keep_every_ply_without_a_climbing_opponent():
+    for position in random_games(3)[0][:10]:
+        bitboard = position.to_bitboard()
+        if not climbing(bitboard, bitboard.side ^ 1):
+            assert safe_plies(bitboard) == bitboard.plies()
+
+
+def test_safe_plies_keep_the_opponent_from_winning():
+    for game in random_games(10, seed=1):
+        for position in game:
+            bitboard = position.to_bitboard()
+            if bitboard.has_won(bitboard.side ^ 1):
+                continue
+            side = bitboard.side
+            top = bitboard.planes[2]
+            safe = set(safe_plies(bitboard))
+            for ply in bitboard.plies():
+                bitboard.make(ply)
+                # A ply is safe exactly when it wins or leaves the opponent no winning move
+                assert (ply in safe) == bool(top & BITS[ply[2]] or not winning_moves(bitboard, side ^ 1))
+                bitboard.unmake(ply)
+
+
+def test_forced_win_in_one():
+    bitboard = to_bitboard("00000/00000/00230/00000/00000 A22B40Y00Z44 w")
+    w, frm, to, build = forced_win(bitboard, 1)
+    assert (w, frm, to) == (0, square((2, 2)), square((2, 3)))
+    assert BITS[build] & bitboard.build_mask(w, to)
+
+
+def test_forced_win_in_two():
+    bitboard = to_bitboard(STALEMATE)
+    assert forced_win(bitboard, 1) is None
+    ply = forced_win(bitboard, 2)
+    assert ply[2] == square((1, 1))
+    bitboard.make(ply)
+    assert not bitboard.has_moves()
+
+
+def test_forced_win_in_three_found():
+    bitboard = to_bitboard(CLIMB)
+    assert forced_win(bitboard, 1) is None
+    assert forced_win(bitboard, 2) is None
+    ply = forced_win(bitboard)
+    assert ply[:3] == (0, square((2, 2)), square((2, 3)))
+
+    # With Z next to the threat, only the second threat of a double one wins
+    bitboard = to_bitboard(DEFENDED)
+    assert forced_win(bitboard) == (0, square((2, 2)), square((2, 3)), square((3, 4)))
+
+
+def test_forced_win_not_found():
+    for text in (BLOCKED, START, THREAT, DOUBLE_THREAT):
+        bitboard = to_bitboard(text)
+        before = bitboard.pack()
+        assert forced_win(bitboard) is None
+        assert bitboard.pack() == before
@@ -0,0 +1,89 @@
+# Anton Melnychuk & Oliver Li
+
+from conftest import random_games
+from Transposition import EXACT, LOWER, UPPER, TranspositionTable, pack_ply, unpack_ply
+
+
+def _small():
+    """A table of two buckets: even keys share bucket 0."""
+    table = TranspositionTable(0.0001)
+    assert len(table) == 4
+    return table
+
+
+def test_shallower_entries_of_the_same_search_go_to_the_always_replace_slot():
+    table = _small()
+    table.store(2, 5, EXACT, 10, (0, 1, 2, 3))
+    table.store(4, 3, LOWER, 20)
+    assert table.probe(2) == (5, EXACT, 10, (0, 1, 2, 3))
+    assert table.probe(4) == (3, LOWER, 20, None)
+
+    # The second slot is always replaced, the deeper entry stays
+    table.store(6, 1, UPPER, 30)
+    assert table.probe(4) is None
+    assert table.probe(6) == (1, UPPER, 30, None)
+    assert table.probe(2) == (5, EXACT, 10, (0, 1, 2, 3))
+
+
+def test_as_deep_entries_take_the_depth_preferred_slot():
+    table = _small()
+    table.store(2, 5, EXACT, 10)
+    table.store(4, 5, EXACT, 20)
+    assert table.probe(2) is None
+    assert table.probe(4) == (5, EXACT, 20, None)
+
+
+def test_new_search_makes_old_entries_replaceable():
+    table = _small()
+    table.store(2, 5, EXACT, 10)
+    table.store(4, 4, EXACT, 20)
+
+    # Still found, but a shallow entry of the next search replaces the deep one
+    table.new_search()
+    assert table.probe(2) == (5, EXACT, 10, None)
+    table.store(6, 1, EXACT, 30)
+    assert table.probe(2) is None
+    assert table.probe(6) == (1, EXACT, 30, None)
+    assert table.probe(4) == (4, EXACT, 20, None)
+
+
+def test_generations_wrap_without_reaching_the_empty_marker():
+    table = _small()
+    for _ in range(600):
+        table.new_search()
+        table.store(2, 1, EXACT, 7)
+        assert table.probe(2) == (1, EXACT, 7, None)
+    assert table.used() == 0.25
+
+
+def test_pack_ply_round_trip():
+    assert unpack_ply(0) is None
+    assert pack_ply((0, 0, 0, 0)) != 0
+    for positions in random_games(5):
+        for position in positions:
+            for ply in position.to_bitboard().plies():
+                assert unpack_ply(pack_ply(ply)) == ply
+                assert pack_ply(ply) < 1 << 18
+
+
+def test_counters_memory_and_report():
+    table = TranspositionTable(1)
+    assert table.hit_rate() == 0.0
+    assert table.memory_bytes() == len(table) * TranspositionTable.ENTRY_BYTES <= 1 << 20
+    assert len(table) & (len(table) - 1) == 0
+
+    table.store(12345, 2, EXACT, 1)
+    table.probe(12345)
+    table.probe(54321)
+    table.probe(12345)
+
+    report = table.report()
+    assert report["entries"] == len(table)
+    assert report["memory_mb"] == round(table.memory_bytes() / (1 << 20), 2)
+    assert (report["probes"], report["hits"], report["stores"]) == (3, 2, 1)
+    assert report["hit_rate"] == round(2 / 3, 4)
+    assert report["used"] == round(1 / len(table), 4)
+
+    table.clear()
+    assert (table.probes, table.hits, table.stores) == (0, 0, 0)
+    assert table.probe(12345) is None